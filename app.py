@@ -15,9 +15,11 @@ import zipfile
 # Import the existing photometry modules
 from src.beautiful_photometry.beautiful_photometry.spectrum import import_spd, normalize_spd, create_colour_spd, reshape
 from src.beautiful_photometry.beautiful_photometry.plot import plot_spectrum, plot_multi_spectrum, generate_color_spectrum
-from src.beautiful_photometry.beautiful_photometry.human_circadian import melanopic_ratio, melanopic_response, melanopic_lumens, melanopic_photopic_ratio
-from src.beautiful_photometry.beautiful_photometry.human_visual import scotopic_photopic_ratio
 from src.beautiful_photometry.beautiful_photometry.photometer import uprtek_import_spectrum
+from src.beautiful_photometry.batch import SpectrumBatch
+from src.beautiful_photometry.metrics import compute_all_metrics, metrics_to_dicts
+from src.beautiful_photometry.readers import detect_format
+from src.beautiful_photometry.spectrum import reshape_wavelengths
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'your-secret-key-here'
@@ -53,45 +55,26 @@ def create_plot_image(plot_func, dpi=300, *args, **kwargs):
 def detect_file_format(filepath):
     """Detect if file is UPRtek format or manual CSV format"""
     try:
-        with open(filepath, 'r', encoding='utf-8-sig') as f:
-            first_line = f.readline().strip()
-            
-            # Check for UPRtek format - tab-delimited with "Model Name" in first column
-            if '\t' in first_line:
-                parts = first_line.split('\t')
-                if len(parts) >= 2 and 'model' in parts[0].lower():
-                    # It's a UPRtek file
-                    return 'uprtek'
-            
-            # Check if it's a manual CSV with wavelength,intensity format
-            # Try to parse the first line as numbers
-            if ',' in first_line:
-                parts = first_line.split(',')
-                if len(parts) >= 2:
-                    try:
-                        # Try to convert both parts to numbers
-                        float(parts[0])
-                        float(parts[1])
-                        return None  # It's a manual CSV
-                    except ValueError:
-                        # Not numbers, might be headers - check second line
-                        second_line = f.readline().strip()
-                        if second_line and ',' in second_line:
-                            parts = second_line.split(',')
-                            if len(parts) >= 2:
-                                try:
-                                    float(parts[0])
-                                    float(parts[1])
-                                    return None  # Manual CSV with headers
-                                except ValueError:
-                                    pass
-            
-            # Default to manual CSV format
-            return None
-    except Exception as e:
+        detected = detect_format(filepath)
+    except (OSError, ValueError) as e:
         print(f"Error detecting file format: {e}")
         return None
 
+    # the legacy importer reads every other format as a CSV with photometer=None
+    return 'uprtek' if detected == 'uprtek' else None
+
+def calculate_metrics(spds):
+    """Calculate the display metrics for a list of SPDs in a single pass.
+
+    Each SPD is placed on the 360-780 nm analysis grid with zeros outside its measured
+    range, so that, like the original per-SPD functions, only the overlap with the
+    reference curves contributes.
+    """
+    wavelengths = reshape_wavelengths()
+    values = [np.interp(wavelengths, spd.wavelengths, spd.values, left=0, right=0) for spd in spds]
+    batch = SpectrumBatch(values, wavelengths, [spd.name for spd in spds])
+    return metrics_to_dicts(compute_all_metrics(batch))
+
 def process_uploaded_file(file, spd_name=None, weight=1.0, normalize=False, photometer=None):
     """Process an uploaded file and return an SPD object"""
     if not spd_name:
@@ -162,13 +145,7 @@ def upload_file():
         print(f"Processed SPD: {spd.name}, wavelengths: {len(spd.wavelengths)}, shape: {spd.shape}")
         
         # Calculate metrics
-        metrics = {
-            'name': spd.name,
-            'melanopic_ratio': round(melanopic_ratio(spd), 3),
-            'melanopic_response': round(melanopic_response(spd), 1),
-            'scotopic_photopic_ratio': round(scotopic_photopic_ratio(spd), 3),
-            'melanopic_photopic_ratio': round(melanopic_photopic_ratio(spd), 3)
-        }
+        metrics = calculate_metrics([spd])[0]
         print(f"Calculated metrics: {metrics}")
         
         # Create plot
@@ -271,15 +248,7 @@ def compare_spectra():
         plot_image = create_plot_image(plot_multi_spectrum, **plot_options)
         
         # Calculate metrics for each SPD
-        metrics = []
-        for spd in spds:
-            metrics.append({
-                'name': spd.name,
-                'melanopic_ratio': round(melanopic_ratio(spd), 3),
-                'melanopic_response': round(melanopic_response(spd), 1),
-                'scotopic_photopic_ratio': round(scotopic_photopic_ratio(spd), 3),
-                'melanopic_photopic_ratio': round(melanopic_photopic_ratio(spd), 3)
-            })
+        metrics = calculate_metrics(spds)
         
         return jsonify({
             'success': True,
@@ -372,13 +341,7 @@ def analyze_spd():
         spd = create_colour_spd(sorted_spd_data, spd_name)
         
         # Calculate metrics
-        metrics = {
-            'name': spd.name,
-            'melanopic_ratio': round(melanopic_ratio(spd), 3),
-            'melanopic_response': round(melanopic_response(spd), 1),
-            'scotopic_photopic_ratio': round(scotopic_photopic_ratio(spd), 3),
-            'melanopic_photopic_ratio': round(melanopic_photopic_ratio(spd), 3)
-        }
+        metrics = calculate_metrics([spd])[0]
         
         # Get X-axis limits from options
         x_min = options.get('x_min')
@@ -0,0 +1,68 @@
+"""
+Benchmark: per-SPD metric functions vs. SpectrumBatch metric functions
+
+Run with:
+python benchmarks/bench_batch_metrics.py [N]
+"""
+import sys
+import time
+
+import numpy as np
+
+from beautiful_photometry.batch import SpectrumBatch
+from beautiful_photometry.human_circadian import (
+    melanopic_ratio,
+    melanopic_response,
+    melanopic_ratio_batch,
+    melanopic_response_batch,
+)
+from beautiful_photometry.human_visual import (
+    scotopic_photopic_ratio,
+    scotopic_photopic_ratio_batch,
+)
+from beautiful_photometry.weighting import channel_responses
+
+
+def make_batch(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return SpectrumBatch(rng.random((n, 421)))
+
+
+def run_scalar(spds):
+    for spd in spds:
+        melanopic_response(spd)
+        melanopic_ratio(spd)
+        scotopic_photopic_ratio(spd)
+
+
+def run_batch(batch):
+    # one weighting-matrix product, every metric derived from it
+    responses = channel_responses(batch)
+    melanopic_response_batch(batch, responses=responses)
+    melanopic_ratio_batch(batch, responses=responses)
+    scotopic_photopic_ratio_batch(batch, responses=responses)
+
+
+def main(n=10000):
+    batch = make_batch(n)
+    spds = list(batch)
+
+    # warm up the reference spectra
+    run_batch(batch[:1])
+
+    start = time.perf_counter()
+    run_scalar(spds)
+    scalar = time.perf_counter() - start
+
+    start = time.perf_counter()
+    run_batch(batch)
+    batched = time.perf_counter() - start
+
+    print(f'{n} SPDs')
+    print(f'  scalar: {scalar:.3f} s ({n / scalar:,.0f} SPDs/s)')
+    print(f'  batch:  {batched:.4f} s ({n / batched:,.0f} SPDs/s)')
+    print(f'  speedup: {scalar / batched:.0f}x')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
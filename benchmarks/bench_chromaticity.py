@@ -0,0 +1,46 @@
+"""
+Benchmark: per-spectrum colour CCT/Duv vs. cct_duv_batch
+
+Computes the CCT and Duv of N synthetic SPDs on the reshape() grid, with colour's
+sd_to_XYZ and Ohno (2013) solver for the first 200 and with cct_duv_batch for all N.
+
+Run with:
+python benchmarks/bench_chromaticity.py [N]
+"""
+import sys
+import time
+
+import numpy as np
+from colour import SpectralDistribution, XYZ_to_xy, sd_to_XYZ, xy_to_UCS_uv
+from colour.temperature import uv_to_CCT_Ohno2013
+
+from beautiful_photometry.chromaticity import cct_duv_batch
+from beautiful_photometry.spectrum import reshape_wavelengths
+
+
+def main(n=100000, reference=200):
+    wavelengths = reshape_wavelengths()
+    values = np.random.default_rng(0).random((n, len(wavelengths))) + 0.1
+
+    start = time.perf_counter()
+    expected = []
+    for row in values[:reference]:
+        XYZ = sd_to_XYZ(SpectralDistribution(row, wavelengths))
+        expected.append(uv_to_CCT_Ohno2013(xy_to_UCS_uv(XYZ_to_xy(XYZ))))
+    colour_rate = reference / (time.perf_counter() - start)
+
+    cct_duv_batch(values[:1])  # compile the CMF matrix and Planckian table
+    start = time.perf_counter()
+    cct, duv = cct_duv_batch(values)
+    seconds = time.perf_counter() - start
+    batch_rate = n / seconds
+
+    error = np.abs(cct[:reference] - np.array(expected)[:, 0]).max()
+    print(f'{n} SPDs')
+    print(f'  colour:          {colour_rate:>12,.0f} SPDs/s')
+    print(f'  cct_duv_batch:   {batch_rate:>12,.0f} SPDs/s ({seconds:.2f} s, '
+          f'{batch_rate / colour_rate:,.0f}x, max CCT diff {error:.2f} K)')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,42 @@
+"""
+Benchmark: streaming exposure integration
+
+Streams DAYS days of spectra logged every 5 s through an ExposureAccumulator in
+chunks of 10000, as a wearable log would be read, and reports the throughput.
+
+Run with:
+python benchmarks/bench_exposure.py [DAYS]
+"""
+import sys
+import time
+
+import numpy as np
+
+from beautiful_photometry.exposure import ExposureAccumulator
+from beautiful_photometry.spectrum import reshape_wavelengths
+
+
+def main(days=21, chunk=10000):
+    wavelengths = reshape_wavelengths()
+    shape = np.exp(-0.5 * ((wavelengths - 500) / 80) ** 2) * 0.01
+    times = np.arange(0, days * 86400, 5.0)
+    n = len(times)
+    accumulator = ExposureAccumulator(window=3600, resolution=60, photopic_thresholds=(100, 1000))
+    rng = np.random.default_rng(0)
+
+    seconds = 0
+    for start in range(0, n, chunk):
+        stop = min(start + chunk, n)
+        values = rng.random((stop - start, 1)) * shape
+        begin = time.perf_counter()
+        accumulator.update(times[start:stop], values)
+        seconds += time.perf_counter() - begin
+
+    summary = accumulator.summary(True)
+    print(f'{n:,} spectra over {days} days')
+    print(f'  ExposureAccumulator: {n / seconds:>12,.0f} spectra/s ({seconds:.2f} s)')
+    print(f'  melanopic dose:      {summary["melanopic_dose"]:>12,.1f} lx·h')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 21)
@@ -0,0 +1,46 @@
+"""
+Benchmark: metrics of product spectra vs. filter_table
+
+Evaluates S random sources through F random filters with filter_table, and times
+building the product spectra and calling the batch metric functions on them for
+comparison.
+
+Run with:
+python benchmarks/bench_filters.py [SOURCES] [FILTERS]
+"""
+import sys
+import time
+
+import numpy as np
+
+from beautiful_photometry.filters import filter_spectra, filter_table
+from beautiful_photometry.human_circadian import melanopic_photopic_ratio_batch
+from beautiful_photometry.human_visual import photopic_response_batch
+from beautiful_photometry.spectrum import reshape_wavelengths
+
+
+def main(sources=2000, filters=500):
+    wavelengths = reshape_wavelengths()
+    rng = np.random.default_rng(0)
+    source_values = np.exp(-0.5 * ((wavelengths - rng.uniform(420, 650, (sources, 1))) / 40) ** 2)
+    filter_values = 1 / (1 + np.exp(-(wavelengths - rng.uniform(400, 600, (filters, 1))) / 10))
+    pairs = sources * filters
+
+    start = time.perf_counter()
+    spds = filter_spectra(source_values[:200], filter_values)
+    photopic_response_batch(spds, False)
+    melanopic_photopic_ratio_batch(spds, False)
+    spectra_rate = len(spds) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    filter_table(source_values, filter_values)
+    seconds = time.perf_counter() - start
+    table_rate = pairs / seconds
+
+    print(f'{sources:,} sources x {filters:,} filters ({pairs:,} pairs)')
+    print(f'  product spectra: {spectra_rate:>12,.0f} pairs/s')
+    print(f'  filter_table:    {table_rate:>12,.0f} pairs/s ({seconds:.2f} s, {table_rate / spectra_rate:,.0f}x)')
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:3]])
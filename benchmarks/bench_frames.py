@@ -0,0 +1,62 @@
+"""
+Benchmark: averaging repeated frames in memory vs. streaming them
+
+Writes N synthetic 1 nm frames to a temporary directory, then averages them by
+importing every frame as its own SPD and stacking them, as a notebook would, and with
+accumulate_frames, and reports the time and the peak traced memory of each.
+
+Run with:
+python benchmarks/bench_frames.py [N]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from beautiful_photometry.frames import accumulate_frames
+from beautiful_photometry.spectrum import import_spd, reshape_wavelengths
+
+
+def run(function):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function()
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, seconds, peak
+
+
+def main(n=500):
+    wavelengths = reshape_wavelengths()
+    shape = np.exp(-0.5 * ((wavelengths - 550) / 40) ** 2)
+    rng = np.random.default_rng(0)
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for i in range(n):
+            path = os.path.join(directory, 'frame{:05d}.csv'.format(i))
+            np.savetxt(path, np.column_stack([wavelengths, shape + rng.normal(0, 0.01, len(wavelengths))]),
+                       delimiter=',')
+            paths.append(path)
+
+        def stacked():
+            spds = [import_spd(path, method='linear') for path in paths]
+            values = np.vstack([spd.values for spd in spds])
+            return values.mean(axis=0), values.std(axis=0, ddof=1) / np.sqrt(len(values))
+
+        (mean, uncertainty), stacked_time, stacked_peak = run(stacked)
+        accumulator, stream_time, stream_peak = run(lambda: accumulate_frames(directory, method='linear'))
+
+    error = max(np.abs(accumulator.mean - mean).max(), np.abs(accumulator.uncertainty - uncertainty).max())
+    print(f'{n} frames')
+    print(f'  import_spd + stack:  {stacked_time:.3f} s, {stacked_peak / 1e6:.1f} MB peak')
+    print(f'  accumulate_frames:   {stream_time:.3f} s, {stream_peak / 1e6:.1f} MB peak '
+          f'({stacked_time / stream_time:.1f}x, max abs diff {error:.1e})')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
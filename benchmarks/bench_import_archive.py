@@ -0,0 +1,58 @@
+"""
+Benchmark: importing a zipped campaign directly vs. extracting it first
+
+Writes N synthetic 1 nm SPD CSVs into a zip and a tar.gz archive, then times
+extracting each to a temporary directory and importing that, against importing the
+archive directly with import_spd_batch.
+
+Run with:
+python benchmarks/bench_import_archive.py [N]
+"""
+import os
+import shutil
+import sys
+import tarfile
+import tempfile
+import time
+import zipfile
+
+from beautiful_photometry.spectrum import import_spd_batch
+
+from bench_import_batch import write_tree
+
+
+def main(n=2000):
+    with tempfile.TemporaryDirectory() as directory:
+        tree = os.path.join(directory, 'tree')
+        write_tree(tree, n)
+        files = [os.path.relpath(os.path.join(root, name), tree)
+                 for root, _, names in os.walk(tree) for name in names]
+
+        archives = {'zip': os.path.join(directory, 'tree.zip'), 'tar.gz': os.path.join(directory, 'tree.tar.gz')}
+        with zipfile.ZipFile(archives['zip'], 'w', zipfile.ZIP_DEFLATED) as archive:
+            for file in files:
+                archive.write(os.path.join(tree, file), file)
+        with tarfile.open(archives['tar.gz'], 'w:gz') as archive:
+            archive.add(tree, arcname='.')
+
+        print(f'{n} files')
+        for kind, path in archives.items():
+            extracted = os.path.join(directory, 'extracted')
+            start = time.perf_counter()
+            shutil.unpack_archive(path, extracted)
+            spds = import_spd_batch(extracted, printNames=False, recursive=True)
+            extract_seconds = time.perf_counter() - start
+            shutil.rmtree(extracted)
+            assert len(spds) == n
+
+            start = time.perf_counter()
+            spds = import_spd_batch(path, printNames=False, recursive=True)
+            seconds = time.perf_counter() - start
+            assert len(spds) == n
+
+            print(f'  {kind:>6}: extract + import {extract_seconds:6.2f} s, direct {seconds:6.2f} s '
+                  f'({n / seconds:,.0f} files/s)')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,53 @@
+"""
+Benchmark: import_spd_batch throughput vs. number of worker processes
+
+Writes N synthetic 1 nm SPD CSVs into nested campaign folders in a temporary
+directory, then imports them recursively with 1, 2, 4, ... workers up to the
+number of CPUs.
+
+Run with:
+python benchmarks/bench_import_batch.py [N]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from beautiful_photometry.spectrum import import_spd_batch
+
+
+def write_tree(directory, n, folders=8):
+    wavelengths = np.arange(380, 781)
+    rng = np.random.default_rng(0)
+    for i in range(n):
+        folder = os.path.join(directory, f'campaign_{i % folders}')
+        os.makedirs(folder, exist_ok=True)
+        np.savetxt(os.path.join(folder, f'{i:06d}.csv'),
+                   np.column_stack([wavelengths, rng.random(len(wavelengths))]),
+                   delimiter=',', fmt='%.6f')
+
+
+def main(n=2000):
+    cpus = os.cpu_count() or 1
+    counts = sorted({1, cpus} | {2 ** k for k in range(1, 6) if 2 ** k < cpus})
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_tree(directory, n)
+        print(f'{n} files, {cpus} CPUs')
+
+        baseline = None
+        for workers in counts:
+            start = time.perf_counter()
+            spds = import_spd_batch(directory, printNames=False, recursive=True, workers=workers)
+            seconds = time.perf_counter() - start
+            assert len(spds) == n
+
+            baseline = baseline or seconds
+            print(f'  {workers:>3} workers: {seconds:7.2f} s {n / seconds:>9,.0f} files/s '
+                  f'{baseline / seconds:5.1f}x')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
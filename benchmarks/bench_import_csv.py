@@ -0,0 +1,81 @@
+"""
+Benchmark: row-by-row csv.reader import vs. the vectorized spectral CSV parser
+
+Writes synthetic [nm, intensity] files with sub-nanometre steps to a temporary
+directory and reports rows/s for each parser. Whole-nanometre wavelengths are written
+as integers, so the legacy parser accepts them and skips the fractional ones, and
+import_spectral_csv is checked to return the same dict.
+
+Run with:
+python benchmarks/bench_import_csv.py
+"""
+import csv
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from beautiful_photometry.spectrum import import_spectral_csv, read_spectral_csv
+
+SIZES = (1000, 100000, 1000000)
+
+
+def legacy_import_spectral_csv(filename):
+    """The csv.reader implementation that read_spectral_csv replaced, verbatim."""
+    spd = {}
+    with open(filename, mode='r', encoding='utf-8-sig') as csvFile:
+        reader = csv.reader(csvFile, delimiter=',')
+        for count, row in enumerate(reader):
+            if not row or len(row) < 2:
+                continue  # skip empty or malformed lines
+            try:
+                spd[int(row[0])] = float(row[1])
+            except Exception:
+                continue  # skip lines that can't be parsed
+    return spd
+
+
+def write_file(directory, n, header=False):
+    wavelengths = np.linspace(200, 1100, n)
+    intensities = np.random.default_rng(n).random(n)
+    filename = os.path.join(directory, f'{n}{"_header" if header else ""}.csv')
+    with open(filename, 'w', encoding='utf-8') as f:
+        if header:
+            f.write('Wavelength (nm),Intensity\n')
+        np.savetxt(f, np.column_stack([wavelengths, intensities]), delimiter=',', fmt=('%.10g', '%.6f'))
+    return filename
+
+
+def best_of(fn, filename, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(filename)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parsers = [
+        ('csv.reader (legacy)', legacy_import_spectral_csv),
+        ('read_spectral_csv', read_spectral_csv),
+        ('import_spectral_csv', import_spectral_csv),
+    ]
+
+    with tempfile.TemporaryDirectory() as directory:
+        for header in (False, True):
+            print(f'\n{"with" if header else "without"} header row')
+            for n in SIZES:
+                filename = write_file(directory, n, header)
+                if import_spectral_csv(filename) != legacy_import_spectral_csv(filename):
+                    raise AssertionError('import_spectral_csv differs from the legacy parser')
+                results = {name: best_of(fn, filename) for name, fn in parsers}
+                legacy = results['csv.reader (legacy)']
+                for name, seconds in results.items():
+                    print(f'  {n:>9,} rows  {name:<22} {seconds * 1000:9.1f} ms '
+                          f'{n / seconds:>14,.0f} rows/s  {legacy / seconds:5.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""
+Benchmark: metrics of mixed spectra vs. ChannelMixer.evaluate
+
+Evaluates every combination of 4 channels at 32 drive levels (~10^6 mixes) with
+ChannelMixer, and times building the mixed spectra and calling the batch metric
+functions on the first 10000 for comparison.
+
+Run with:
+python benchmarks/bench_mixing.py [LEVELS]
+"""
+import sys
+import time
+
+import numpy as np
+
+from beautiful_photometry.chromaticity import cct_duv_batch
+from beautiful_photometry.human_circadian import melanopic_ratio_batch
+from beautiful_photometry.mixing import ChannelMixer, drive_level_grid
+from beautiful_photometry.spectrum import reshape_wavelengths
+
+
+def main(levels=32, reference=10000):
+    wavelengths = reshape_wavelengths()
+    peaks = np.array([[450], [530], [590], [630]])
+    mixer = ChannelMixer(np.exp(-0.5 * ((wavelengths - peaks) / 15) ** 2))
+    drive_levels = drive_level_grid(len(mixer), levels)
+    n = len(drive_levels)
+
+    start = time.perf_counter()
+    spds = mixer.mix(drive_levels[:reference])
+    melanopic_ratio_batch(spds, False)
+    cct_duv_batch(spds)
+    spectra_rate = reference / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    mixer.evaluate(drive_levels)
+    seconds = time.perf_counter() - start
+    mixer_rate = n / seconds
+
+    print(f'{n:,} mixes of {len(mixer)} channels')
+    print(f'  mixed spectra:   {spectra_rate:>12,.0f} mixes/s')
+    print(f'  ChannelMixer:    {mixer_rate:>12,.0f} mixes/s ({seconds:.2f} s, {mixer_rate / spectra_rate:,.0f}x)')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 32)
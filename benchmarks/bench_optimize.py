@@ -0,0 +1,54 @@
+"""
+Benchmark: optimize_schedule with and without warm starts
+
+Minimizes the M/P ratio of a 5-channel tunable source (blue, cyan, phosphor white,
+amber and red) over a day-long schedule of N CCTs, from 6500 K at noon down to
+1800 K at night and back, with and without a CRI Ra floor. The cold-start runs
+solve every point from scratch.
+
+Run with:
+python benchmarks/bench_optimize.py [N]
+"""
+import sys
+import time
+
+import numpy as np
+
+from beautiful_photometry.mixing import ChannelMixer
+from beautiful_photometry.optimize import optimize_mix, optimize_schedule
+from beautiful_photometry.spectrum import reshape_wavelengths
+
+
+def channels():
+    wavelengths = reshape_wavelengths()
+
+    def band(peak, width):
+        return np.exp(-0.5 * ((wavelengths - peak) / width) ** 2)
+
+    return ChannelMixer(np.vstack([band(450, 10), band(495, 15), 0.6 * band(450, 10) + band(560, 45),
+                                   band(590, 8), band(630, 10)]),
+                        names=['blue', 'cyan', 'white', 'amber', 'red'])
+
+
+def main(n=200):
+    mixer = channels()
+    cct = 4150 + 2350 * np.cos(np.linspace(0, 2 * np.pi, n))
+    print(f'{n} schedule points, {len(mixer)} channels')
+
+    for ra_min in (None, 80):
+        start = time.perf_counter()
+        warm = optimize_schedule(mixer, cct, maximize=False, ra_min=ra_min, seed=0)
+        warm_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        cold = [optimize_mix(mixer, t, maximize=False, ra_min=ra_min, seed=0) for t in cct]
+        cold_time = time.perf_counter() - start
+
+        label = 'no Ra floor' if ra_min is None else f'Ra >= {ra_min}'
+        print(f'  {label}:')
+        print(f'    warm starts: {warm_time:6.2f} s, {warm["feasible"].mean():.0%} feasible')
+        print(f'    cold starts: {cold_time:6.2f} s, {np.mean([c["feasible"] for c in cold]):.0%} feasible')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
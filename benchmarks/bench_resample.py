@@ -0,0 +1,70 @@
+"""
+Benchmark: per-SPD reshape() vs. cached resampling matrices
+
+Resamples N synthetic UPRtek-style SPDs (1 nm, 380-780) onto the reshape() grid, then
+bins N synthetic 4096-pixel array spectrometer SPDs with the sparse and the dense
+'bin' weights.
+
+Run with:
+python benchmarks/bench_resample.py [N]
+"""
+import sys
+import time
+
+import numpy as np
+from colour import SpectralDistribution
+
+from beautiful_photometry.resample import binning_matrix, resample, resampling_matrix
+from beautiful_photometry.spectrum import reshape, reshape_wavelengths
+
+
+def main(n=2000):
+    source = np.arange(380, 781, 1.0)
+    target = reshape_wavelengths()
+    values = np.random.default_rng(0).random((n, len(source)))
+    spds = [SpectralDistribution(row, source) for row in values]
+
+    start = time.perf_counter()
+    expected = np.vstack([reshape(spd.copy()).values for spd in spds])
+    colour_time = time.perf_counter() - start
+    print(f'{n} SPDs')
+    print(f'  reshape():           {colour_time:.3f} s')
+
+    for method in ('colour', 'linear'):
+        start = time.perf_counter()
+        resampling_matrix(source, target, method)
+        compile_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        resampled = resample(values, source, target, method)
+        apply_time = time.perf_counter() - start
+
+        error = np.abs(resampled - expected).max()
+        print(f'  {method + ":":<20} {apply_time:.4f} s + {compile_time:.3f} s compile '
+              f'({colour_time / apply_time:,.0f}x, max abs diff {error:.1e})')
+
+    pixels = np.arange(4096)
+    source = 340 + 0.17 * pixels - 2e-6 * pixels ** 2
+    values = np.random.default_rng(1).random((n, len(source)))
+
+    start = time.perf_counter()
+    data = binning_matrix(source, target)[0]
+    compile_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    binned = resample(values, source, target, 'bin')
+    sparse_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expected = values @ resampling_matrix(source, target, 'bin').T
+    dense_time = time.perf_counter() - start
+
+    error = np.abs(binned - expected).max()
+    print(f'{n} SPDs, {len(source)} pixels, {len(data):,} of {len(source) * len(target):,} weights non-zero')
+    print(f'  bin (sparse):        {sparse_time:.4f} s + {compile_time:.3f} s compile')
+    print(f'  bin (dense):         {dense_time:.4f} s (sparse {dense_time / sparse_time:.1f}x faster, '
+          f'max abs diff {error:.1e})')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
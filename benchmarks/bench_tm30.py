@@ -0,0 +1,59 @@
+"""
+Benchmark: colour's single-spectrum TM-30 vs. tm30_batch
+
+Scores N synthetic LED-like SPDs on the reshape() grid (a blue pump plus a broad
+phosphor band with random positions and widths), with colour's
+colour_fidelity_index_ANSIIESTM3018 for the first 20 and with tm30_batch for all N.
+
+Run with:
+python benchmarks/bench_tm30.py [N]
+"""
+import sys
+import time
+import warnings
+
+import numpy as np
+from colour import SpectralDistribution
+from colour.quality import colour_fidelity_index_ANSIIESTM3018
+
+from beautiful_photometry.spectrum import reshape_wavelengths
+from beautiful_photometry.tm30 import tm30_batch
+
+
+def led_spectra(n):
+    wavelengths = reshape_wavelengths()
+    rng = np.random.default_rng(0)
+    pump = rng.uniform(440, 460, (n, 1))
+    phosphor = rng.uniform(540, 620, (n, 1))
+    width = rng.uniform(40, 70, (n, 1))
+    return (rng.uniform(0.2, 0.8, (n, 1)) * np.exp(-0.5 * ((wavelengths - pump) / 10) ** 2)
+            + np.exp(-0.5 * ((wavelengths - phosphor) / width) ** 2))
+
+
+def main(n=10000, reference=20):
+    wavelengths = reshape_wavelengths()
+    values = led_spectra(n)
+
+    start = time.perf_counter()
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        expected = [colour_fidelity_index_ANSIIESTM3018(SpectralDistribution(row, wavelengths), True)
+                    for row in values[:reference]]
+    colour_rate = reference / (time.perf_counter() - start)
+
+    tm30_batch(values[:1])  # compile the matrices
+    start = time.perf_counter()
+    results = tm30_batch(values)
+    seconds = time.perf_counter() - start
+    batch_rate = n / seconds
+
+    rf_error = np.abs(results['Rf'][:reference] - [s.R_f for s in expected]).max()
+    rg_error = np.abs(results['Rg'][:reference] - [s.R_g for s in expected]).max()
+    print(f'{n} SPDs')
+    print(f'  colour:        {colour_rate:>10,.0f} SPDs/s')
+    print(f'  tm30_batch:    {batch_rate:>10,.0f} SPDs/s ({seconds:.2f} s, {batch_rate / colour_rate:,.0f}x, '
+          f'max Rf diff {rf_error:.1e}, max Rg diff {rg_error:.1e})')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -14,14 +14,66 @@ __license__ = "MIT"
 from .spectrum import (
     import_spd,
     import_spd_batch,
+    iter_spds,
+    iter_spd_chunks,
+    find_spectral_files,
     import_spectral_csv,
+    read_spectral_csv,
+    parse_spectral_csv,
+    sort_wavelengths,
     normalize_spd,
     weight_spd,
     create_colour_spd,
     reshape,
+    reshape_wavelengths,
     get_reference_spectrum,
+    reference_registry,
+    ReferenceSpectrumRegistry,
 )
 
+from .batch import SpectrumBatch
+
+from .resample import binning_matrix, resample, resampling_matrix
+
+from .metrics import compute_all_metrics, metrics_to_dicts, register_metric
+
+from .alpha_opic import (
+    alpha_opic_batch,
+    alpha_opic_irradiance_batch,
+    alpha_opic_edi_batch,
+    alpha_opic_der_batch,
+    melanopic_edi,
+    melanopic_der,
+)
+
+from .chromaticity import (
+    XYZ_batch,
+    cct_duv_to_uv,
+    uv_to_cct_duv,
+    cct_duv_batch,
+    cct,
+    duv,
+)
+
+from .cri import (
+    cri_batch,
+    r_values_batch,
+    color_rendering_index,
+    cri_r_values,
+)
+
+from .tm30 import tm30_batch, tm30_rf, tm30_rg
+
+from .mixing import ChannelMixer, drive_level_grid
+
+from .filters import filter_responses, filter_spectra, filter_table
+
+from .exposure import ExposureAccumulator, exposure_levels
+
+from .frames import FrameAccumulator, accumulate_frames
+
+from .optimize import optimize_mix, optimize_schedule
+
 from .plot import (
     plot_spectrum,
     plot_multi_spectrum,
@@ -31,21 +83,34 @@ from .plot import (
 )
 
 from .photometer import (
+    UprtekMeasurement,
+    uprtek_import,
     uprtek_import_spectrum,
     uprtek_import_r_vals,
     uprtek_file_import,
 )
 
+from .readers import READERS, detect_format, read_spectrum, register_reader
+
 from .human_circadian import (
     melanopic_ratio,
     melanopic_response,
     melanopic_lumens,
     melanopic_photopic_ratio,
     get_melanopic_curve,
+    melanopic_response_batch,
+    melanopic_ratio_batch,
+    melanopic_photopic_ratio_batch,
+    melanopic_lumens_batch,
+    spectral_g_index,
+    spectral_g_index_batch,
 )
 
 from .human_visual import (
     scotopic_photopic_ratio,
+    photopic_response_batch,
+    scotopic_response_batch,
+    scotopic_photopic_ratio_batch,
 )
 
 # Web application
@@ -64,12 +129,58 @@ __all__ = [
     # Core spectrum functions
     "import_spd",
     "import_spd_batch", 
+    "iter_spds",
+    "iter_spd_chunks",
+    "find_spectral_files",
     "import_spectral_csv",
+    "read_spectral_csv",
+    "parse_spectral_csv",
+    "sort_wavelengths",
     "normalize_spd",
     "weight_spd",
     "create_colour_spd",
     "reshape",
+    "reshape_wavelengths",
     "get_reference_spectrum",
+    "reference_registry",
+    "ReferenceSpectrumRegistry",
+    "SpectrumBatch",
+    "resample",
+    "resampling_matrix",
+    "binning_matrix",
+    "compute_all_metrics",
+    "metrics_to_dicts",
+    "register_metric",
+    "alpha_opic_batch",
+    "alpha_opic_irradiance_batch",
+    "alpha_opic_edi_batch",
+    "alpha_opic_der_batch",
+    "melanopic_edi",
+    "melanopic_der",
+    "XYZ_batch",
+    "cct_duv_to_uv",
+    "uv_to_cct_duv",
+    "cct_duv_batch",
+    "cct",
+    "duv",
+    "cri_batch",
+    "r_values_batch",
+    "color_rendering_index",
+    "cri_r_values",
+    "tm30_batch",
+    "tm30_rf",
+    "tm30_rg",
+    "ChannelMixer",
+    "drive_level_grid",
+    "optimize_mix",
+    "optimize_schedule",
+    "filter_responses",
+    "filter_spectra",
+    "filter_table",
+    "ExposureAccumulator",
+    "exposure_levels",
+    "FrameAccumulator",
+    "accumulate_frames",
     
     # Plotting functions
     "plot_spectrum",
@@ -79,9 +190,15 @@ __all__ = [
     "plot_melanopic_curve",
     
     # Photometer functions
+    "UprtekMeasurement",
+    "uprtek_import",
     "uprtek_import_spectrum",
     "uprtek_import_r_vals",
     "uprtek_file_import",
+    "READERS",
+    "detect_format",
+    "read_spectrum",
+    "register_reader",
     
     # Human response functions
     "melanopic_ratio",
@@ -90,6 +207,15 @@ __all__ = [
     "melanopic_photopic_ratio",
     "get_melanopic_curve",
     "scotopic_photopic_ratio",
+    "melanopic_response_batch",
+    "melanopic_ratio_batch",
+    "melanopic_photopic_ratio_batch",
+    "melanopic_lumens_batch",
+    "spectral_g_index",
+    "spectral_g_index_batch",
+    "photopic_response_batch",
+    "scotopic_response_batch",
+    "scotopic_photopic_ratio_batch",
     
     # Web and CLI
     "create_app",
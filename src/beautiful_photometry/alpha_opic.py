@@ -0,0 +1,183 @@
+"""
+CIE S 026 alpha-opic quantities for batches of light sources
+
+For spectral irradiances E(λ) in W/m²/nm on the reshape() grid, computes, for each of
+the five photoreceptor channels α:
+
+    * alpha-opic irradiance         E_α = Σ E(λ) s_α(λ) Δλ                      (W/m²)
+    * alpha-opic EDI                E_α / K_α,v^D65                            (lx)
+    * alpha-opic DER                E_α / E_v / K_α,v^D65
+
+where E_v = 683.002 lm/W × Σ E(λ) V(λ) Δλ is the illuminance, s_α are the peak-normalized
+action spectra and K_α,v^D65 are the efficacies of D65 given in CIE S 026:2018. The action
+spectra and V(λ) are stacked into one (6, W) matrix, so every quantity of a batch comes
+from a single matrix product.
+
+The rhodopic (V'(λ)) and melanopic curves come from source_illuminants.csv. V(λ) is
+colour's CIE 1924 photopic luminous efficiency function, the definition of the lux: the
+Photopic column of source_illuminants.csv weights D65 0.58% higher, which would put the
+DERs of D65 at 0.994 instead of 1. S 026 defines the cone channels with the CIE 2006 10° cone fundamentals, which colour
+ships as the Stockman & Sharpe 10 degree cone fundamentals; the L/M/S cone curves in
+source_illuminants.csv are a different (2°) set, so they are not used here.
+"""
+import numpy as np
+from colour import MSDS_CMFS, SDS_LEFS
+
+from .batch import as_batch_values
+from .spectrum import reference_registry, reshape_wavelengths, WAVELENGTH_INTERVAL
+from .utils import round_output, round_output_array
+
+# The S 026 channels, in the order of the columns of every result
+ALPHA_OPIC_CHANNELS = ('s_cone_opic', 'm_cone_opic', 'l_cone_opic', 'rhodopic', 'melanopic')
+S_CONE_OPIC, M_CONE_OPIC, L_CONE_OPIC, RHODOPIC, MELANOPIC = range(len(ALPHA_OPIC_CHANNELS))
+
+# The alpha-opic efficacies of luminous radiation of D65, in W/lm (CIE S 026:2018, table 2)
+K_D65 = np.array([0.8173, 1.4558, 1.6289, 1.4497, 1.3262]) * 1e-3
+
+# The maximum luminous efficacy, in lm/W, as used by CIE S 026
+K_M = 683.002
+
+CONE_FUNDAMENTALS = 'Stockman & Sharpe 10 Degree Cone Fundamentals'
+
+PHOTOPIC_LEF = 'CIE 1924 Photopic Standard Observer'
+
+alpha_opic_matrix = None
+
+
+"""
+Gets the alpha-opic weighting matrix, compiling it on first use
+
+The first five rows are the peak-normalized action spectra of ALPHA_OPIC_CHANNELS, and
+the last is K_M × V(λ). All rows include the Δλ of the grid, so a product with spectral
+irradiances gives the alpha-opic irradiances and the illuminance directly.
+
+@return ndarray         The (6, W) weighting matrix
+"""
+def get_alpha_opic_matrix():
+    global alpha_opic_matrix
+
+    if alpha_opic_matrix is None:
+        wavelengths = reshape_wavelengths()
+        cmfs = MSDS_CMFS[CONE_FUNDAMENTALS]
+        # cmfs columns are L, M, S
+        cones = [np.interp(wavelengths, cmfs.wavelengths, cmfs.values[:, i], left=0, right=0)
+                 for i in (2, 1, 0)]
+        rows = cones + [reference_registry.values('Scotopic'), reference_registry.values('Melanopic')]
+        rows = [row / row.max() for row in rows]
+        lef = SDS_LEFS[PHOTOPIC_LEF]
+        rows.append(K_M * np.interp(wavelengths, lef.wavelengths, lef.values, left=0, right=0))
+
+        matrix = np.vstack(rows) * WAVELENGTH_INTERVAL
+        matrix.flags.writeable = False
+        alpha_opic_matrix = matrix
+
+    return alpha_opic_matrix
+
+
+"""
+Calculates the alpha-opic irradiances and illuminances of a batch with one matrix product
+
+@param SpectrumBatch/list/ndarray spds          The spectral irradiances, see batch.as_batch_values
+
+@return tuple                                   The (N, 5) alpha-opic irradiances and (N,) illuminances
+"""
+def _alpha_opic_products(spds):
+    products = as_batch_values(spds) @ get_alpha_opic_matrix().T
+    return products[:, :-1], products[:, -1]
+
+
+"""
+Calculates the alpha-opic irradiances for a batch of light sources
+
+@param SpectrumBatch/list/ndarray spds          The spectral irradiances, see batch.as_batch_values
+
+@return ndarray                                 The (N, 5) irradiances, with columns ordered as ALPHA_OPIC_CHANNELS
+"""
+def alpha_opic_irradiance_batch(spds):
+    return _alpha_opic_products(spds)[0]
+
+
+"""
+Calculates the alpha-opic equivalent daylight (D65) illuminances for a batch of light sources
+
+@param SpectrumBatch/list/ndarray spds          The spectral irradiances, see batch.as_batch_values
+
+@return ndarray                                 The (N, 5) EDIs, with columns ordered as ALPHA_OPIC_CHANNELS
+"""
+def alpha_opic_edi_batch(spds):
+    return alpha_opic_irradiance_batch(spds) / K_D65
+
+
+"""
+Calculates the alpha-opic daylight (D65) efficacy ratios for a batch of light sources
+
+@param SpectrumBatch/list/ndarray spds          The spectral irradiances, see batch.as_batch_values
+
+@return ndarray                                 The (N, 5) DERs, with columns ordered as ALPHA_OPIC_CHANNELS,
+                                                NaN where the illuminance is zero
+"""
+def alpha_opic_der_batch(spds):
+    irradiance, illuminance = _alpha_opic_products(spds)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return irradiance / K_D65 / illuminance[:, np.newaxis]
+
+
+"""Calculates every alpha-opic quantity for a batch of light sources
+
+Parameters
+----------
+spds : SpectrumBatch, list or ndarray
+    The spectral irradiances in W/m²/nm, see batch.as_batch_values
+toround : bool
+    Whether to round illuminances and EDIs to 1 decimal place, and irradiances and DERs
+    to 4 decimal places
+
+Returns
+-------
+ndarray
+    A structured array with one record per light source, with the fields 'illuminance'
+    and, for each channel in ALPHA_OPIC_CHANNELS, '<channel>_irradiance', '<channel>_edi'
+    and '<channel>_der'
+"""
+def alpha_opic_batch(spds, toround=False):
+    irradiance, illuminance = _alpha_opic_products(spds)
+    edi = irradiance / K_D65
+    with np.errstate(divide='ignore', invalid='ignore'):
+        der = edi / illuminance[:, np.newaxis]
+
+    fields = ['illuminance']
+    for channel in ALPHA_OPIC_CHANNELS:
+        fields += [channel + '_irradiance', channel + '_edi', channel + '_der']
+
+    results = np.empty(len(illuminance), dtype=[(field, float) for field in fields])
+    results['illuminance'] = round_output_array(illuminance, toround, 1)
+    for i, channel in enumerate(ALPHA_OPIC_CHANNELS):
+        results[channel + '_irradiance'] = round_output_array(irradiance[:, i], toround, 4)
+        results[channel + '_edi'] = round_output_array(edi[:, i], toround, 1)
+        results[channel + '_der'] = round_output_array(der[:, i], toround, 4)
+
+    return results
+
+
+"""
+Calculates the melanopic equivalent daylight (D65) illuminance for a given light source
+
+@param SpectralDistribution spd            The spectral irradiance, in W/m²/nm
+@param bool toround [optional]                  Whether to round to output to 1 decimal place
+
+@return float                                   The melanopic EDI, in lx
+"""
+def melanopic_edi(spd, toround=True):
+    return round_output(alpha_opic_edi_batch(spd)[0, MELANOPIC], toround, 1)
+
+
+"""
+Calculates the melanopic daylight (D65) efficacy ratio for a given light source
+
+@param SpectralDistribution spd            The spectral power distribution
+@param bool toround [optional]                  Whether to round to output to 4 decimal places
+
+@return float                                   The melanopic DER
+"""
+def melanopic_der(spd, toround=True):
+    return round_output(alpha_opic_der_batch(spd)[0, MELANOPIC], toround, 4)
@@ -0,0 +1,74 @@
+"""
+Streaming access to spectral data files inside .zip and .tar(.gz) archives
+
+The batch importers (import_spd_batch, iter_spds, iter_spd_chunks) accept an archive
+in place of a directory. Members are read one at a time straight from the archive and
+parsed from memory, so nothing is extracted to disk:
+
+    spds = import_spd_batch('field_campaign.zip', photometer='auto', recursive=True)
+
+Members are selected as files in a directory are (see spectrum.iter_spectral_files):
+paths are relative to the archive root with '/' separators, and hidden members are
+skipped. Zip members are visited in name order; tar members are visited in archive
+order, as a compressed tar stream can only be read front to back.
+"""
+import tarfile
+import zipfile
+
+# The archive file extensions accepted by the batch importers
+ARCHIVE_EXTENSIONS = ('.zip', '.tar', '.tar.gz', '.tgz')
+
+# Directories added by archivers, which never hold spectral data
+ARCHIVE_METADATA = ('__MACOSX',)
+
+
+"""
+Checks whether a path names an archive, by its extension
+
+@param str path             The path
+
+@return bool                Whether the path ends with one of ARCHIVE_EXTENSIONS
+"""
+def is_archive(path):
+    return str(path).lower().endswith(ARCHIVE_EXTENSIONS)
+
+
+"""
+Checks whether a member is hidden or archiver metadata
+"""
+def _is_hidden(name):
+    parts = name.split('/')
+    return any(part.startswith('.') for part in parts) or parts[0] in ARCHIVE_METADATA
+
+
+"""Iterates over the spectral data files in an archive, lazily
+
+Parameters
+----------
+path : String
+    The .zip, .tar, .tar.gz or .tgz archive
+select : callable
+    Called as select(name) with the relative path of each file member, and returns
+    whether to read it
+
+Returns
+-------
+generator
+    (name, data) tuples with the relative path and the bytes of each selected member.
+    Only one member is held in memory at a time
+"""
+def iter_archive_members(path, select):
+    if str(path).lower().endswith('.zip'):
+        with zipfile.ZipFile(path) as archive:
+            names = sorted(info.filename for info in archive.infolist() if not info.is_dir())
+            for name in names:
+                if not _is_hidden(name) and select(name):
+                    yield name, archive.read(name)
+        return
+
+    # 'r|*' streams the tar sequentially, with any compression
+    with tarfile.open(path, mode='r|*') as archive:
+        for member in archive:
+            name = member.name[2:] if member.name.startswith('./') else member.name
+            if member.isfile() and not _is_hidden(name) and select(name):
+                yield name, archive.extractfile(member).read()
@@ -0,0 +1,143 @@
+"""
+Array-backed batches of Spectral Power Distributions
+
+A SpectrumBatch holds N SPDs as one contiguous (N, W) float array on the shared
+reshape() grid, so that metrics can be computed for every SPD with a single
+matrix product instead of one SpectralDistribution at a time.
+"""
+import numpy as np
+from colour import SpectralDistribution
+
+from .spectrum import reshape, reshape_wavelengths
+from .resample import resample
+
+
+"""
+A batch of SPDs stored as a single (N, W) array
+
+Parameters
+----------
+values : array_like
+    The spectral values, with shape (N, W) or (W,) for a single SPD
+wavelengths : array_like or None
+    The W wavelengths of the columns. If None, the reshape() grid is assumed
+names : list or None
+    The N names of the SPDs. If None, the SPDs are named by their index
+"""
+class SpectrumBatch:
+
+    def __init__(self, values, wavelengths=None, names=None):
+        values = np.ascontiguousarray(values, dtype=float)
+        if values.ndim == 1:
+            values = values[np.newaxis, :]
+        if values.ndim != 2:
+            raise ValueError('SpectrumBatch values must be a (N, W) array')
+
+        if wavelengths is None:
+            wavelengths = reshape_wavelengths()
+        wavelengths = np.asarray(wavelengths, dtype=float)
+        if wavelengths.shape != (values.shape[1],):
+            raise ValueError('Got {} wavelengths for {} spectral columns'.format(
+                len(wavelengths), values.shape[1]))
+
+        if names is None:
+            names = [str(i) for i in range(values.shape[0])]
+        names = list(names)
+        if len(names) != values.shape[0]:
+            raise ValueError('Got {} names for {} SPDs'.format(len(names), values.shape[0]))
+
+        self.values = values
+        self.wavelengths = wavelengths
+        self.names = names
+
+    """
+    Creates a batch from SpectralDistribution objects
+
+    SPDs that are not already on the reshape() grid are reshaped onto it. With a
+    resampling method, SPDs that share a source grid are resampled together with one
+    matrix product.
+
+    @param list/dict spds       The SPDs, either as a list or a dict keyed by name
+                                (e.g. the output of import_spd_batch)
+    @param str method           If None, each SPD is reshaped by colour. Otherwise, one of
+                                resample.RESAMPLE_METHODS
+
+    @return SpectrumBatch       The batch
+    """
+    @classmethod
+    def from_spds(cls, spds, method=None):
+        if isinstance(spds, SpectralDistribution):
+            spds = [spds]
+        if isinstance(spds, dict):
+            names = list(spds.keys())
+            spds = list(spds.values())
+        else:
+            spds = list(spds)
+            names = [spd.name for spd in spds]
+
+        wavelengths = reshape_wavelengths()
+        values = np.empty((len(spds), len(wavelengths)))
+        grids = {}
+        for i, spd in enumerate(spds):
+            if np.array_equal(spd.wavelengths, wavelengths):
+                values[i] = spd.values
+            elif method is None:
+                values[i] = reshape(spd.copy()).values
+            else:
+                grids.setdefault(spd.wavelengths.tobytes(), []).append(i)
+
+        for indices in grids.values():
+            source = spds[indices[0]].wavelengths
+            group = np.vstack([spds[i].values for i in indices])
+            values[indices] = resample(group, source, wavelengths, method)
+
+        return cls(values, wavelengths, names)
+
+    def __len__(self):
+        return self.values.shape[0]
+
+    """
+    Indexes the batch
+
+    @param int/slice/array key          The SPD(s) to select
+
+    @return SpectralDistribution/SpectrumBatch      A single SPD for an integer key, otherwise a batch
+    """
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            return SpectralDistribution(self.values[key], self.wavelengths, name=self.names[key])
+
+        index = np.arange(len(self))[key]
+        return SpectrumBatch(self.values[index], self.wavelengths, [self.names[i] for i in index])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __repr__(self):
+        return 'SpectrumBatch({} SPDs, {:g}-{:g} nm)'.format(
+            len(self), self.wavelengths[0], self.wavelengths[-1])
+
+    """
+    Converts the batch back to SpectralDistribution objects
+
+    @return dict        The SPDs keyed by name, matching the output of import_spd_batch
+    """
+    def to_spds(self):
+        return {spd.name: spd for spd in self}
+
+
+"""
+Gets the (N, W) values array of anything that can be turned into a batch
+
+@param SpectrumBatch/SpectralDistribution/list/dict/ndarray spds
+                            The SPDs. Arrays are assumed to be on the reshape() grid already
+
+@return ndarray             The (N, W) spectral values
+"""
+def as_batch_values(spds):
+    if isinstance(spds, SpectrumBatch):
+        return spds.values
+    if isinstance(spds, np.ndarray):
+        return np.atleast_2d(spds)
+    return SpectrumBatch.from_spds(spds).values
@@ -28,21 +28,31 @@ def import_spectral_csv(filename):
     spd = {}
     
     with open(filename, mode='r', encoding='utf-8-sig') as csvFile:
-        reader = csv.reader(csvFile, delimiter=',')
-
-        for count, row in enumerate(reader):
-            # Skip empty rows
-            if not row or len(row) < 2:
-                continue
-                
-            try:
-                # Try to parse as wavelength and intensity
-                wavelength = float(row[0])
-                intensity = float(row[1])
-                spd[int(wavelength)] = intensity
-            except (ValueError, IndexError):
-                # Skip header rows or invalid data
-                continue
+        lines = [line for line in csvFile.read().splitlines() if line.strip()]
+
+    if not lines:
+        return spd
+
+    # Fast path: parse the whole file in one call to NumPy's C parser
+    try:
+        data = np.loadtxt(lines, delimiter=',', usecols=(0, 1), ndmin=2)
+        return dict(zip(data[:, 0].astype(int).tolist(), data[:, 1].tolist()))
+    except ValueError:
+        pass
+
+    # Slow path for files with header rows or invalid data
+    for row in csv.reader(lines, delimiter=','):
+        if len(row) < 2:
+            continue
+            
+        try:
+            # Try to parse as wavelength and intensity
+            wavelength = float(row[0])
+            intensity = float(row[1])
+            spd[int(wavelength)] = intensity
+        except (ValueError, IndexError):
+            # Skip header rows or invalid data
+            continue
 
     return spd
 
@@ -95,11 +105,11 @@ Imports reference SPDs from the database
 def import_reference_spectra(filename='source_illuminants.csv'):
     global reference_spectra
 
+    # resolve the database next to this module instead of changing the working directory
     import os
-    os.chdir(os.path.dirname(__file__))
-    # print(os.getcwd())
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), filename)
 
-    with open(filename, mode='r', encoding='utf-8-sig') as csvFile:
+    with open(path, mode='r', encoding='utf-8-sig') as csvFile:
         reader = csv.reader(csvFile, delimiter=',')
 
         wavelengths = next(reader)[4:]
@@ -0,0 +1,359 @@
+"""
+On-disk caches of compiled spectral data
+
+The cache directory defaults to ~/.cache/beautiful_photometry (or $XDG_CACHE_HOME),
+and can be moved with the BEAUTIFUL_PHOTOMETRY_CACHE environment variable.
+Setting BEAUTIFUL_PHOTOMETRY_CACHE=0 disables caching.
+
+The functions are:
+
+    * default_cache_dir - Gets the cache directory, or None if caching is disabled
+    * resolve_cache_dir - Gets the cache directory selected by a cache= argument
+    * file_digest - Computes the SHA-256 of a file
+    * load_reference_cache - Loads the compiled reference spectra for a database CSV
+    * save_reference_cache - Saves the compiled reference spectra for a database CSV
+    * spd_cache_key - Computes the cache key of an imported SPD file
+    * load_spd_cache - Loads the reshaped values of an imported SPD
+    * save_spd_cache - Saves the reshaped values of an imported SPD
+    * evict_spd_cache - Deletes the least recently used SPDs beyond a size limit
+"""
+import hashlib
+import os
+import tempfile
+import zipfile
+
+import numpy as np
+
+# Bump when a change to import_spd() would change the values cached for a file
+SPD_CACHE_VERSION = 3
+
+# The arrays of a reference cache file. Files missing any of them are treated as misses
+REFERENCE_CACHE_FIELDS = ('names', 'descriptions', 'wavelengths', 'values', 'mtime_ns', 'size', 'sha256')
+
+# The default size limit of the SPD cache, in bytes
+SPD_CACHE_MAX_BYTES = 1 << 30
+
+# The SPD cache is trimmed after this many writes by one process
+SPD_CACHE_EVICT_INTERVAL = 1000
+
+spd_cache_writes = 0
+
+
+"""Gets the cache directory
+
+Returns
+-------
+String or None
+    The cache directory, or None if caching has been disabled
+"""
+def default_cache_dir():
+    path = os.environ.get('BEAUTIFUL_PHOTOMETRY_CACHE')
+    if path is not None:
+        return None if path in ('', '0') else path
+
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'beautiful_photometry')
+
+
+"""Gets the cache directory selected by a cache= argument
+
+Parameters
+----------
+cache : bool or String
+    False to disable caching, True for default_cache_dir(), or a cache directory
+
+Returns
+-------
+String or None
+    The cache directory, or None if caching is disabled
+"""
+def resolve_cache_dir(cache):
+    if isinstance(cache, (str, os.PathLike)):
+        return os.fspath(cache)
+    return default_cache_dir() if cache else None
+
+
+"""Computes the SHA-256 hex digest of a file
+
+Parameters
+----------
+filename : String
+    The file to hash
+
+Returns
+-------
+String
+    The hex digest
+"""
+def file_digest(filename):
+    digest = hashlib.sha256()
+    with open(filename, mode='rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+"""Gets the path of the compiled cache for a reference database CSV
+
+The name includes a hash of the absolute CSV path, so that databases with the same
+file name in different places do not share a cache file.
+"""
+def reference_cache_path(csv_path, cache_dir=None):
+    cache_dir = cache_dir or default_cache_dir()
+    if cache_dir is None:
+        return None
+
+    csv_path = os.path.abspath(csv_path)
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    path_hash = hashlib.sha1(csv_path.encode('utf-8')).hexdigest()[:12]
+    return os.path.join(cache_dir, 'reference', '{}-{}.npz'.format(stem, path_hash))
+
+
+"""Loads the compiled reference spectra for a database CSV
+
+The cache is valid when the CSV's modification time and size match the ones it was
+compiled from, or, failing that, when the CSV's content hash still matches, in which
+case the cache is re-stamped with the new modification time and size. Cache
+files that cannot be read (e.g. truncated, corrupt or from an older layout) are
+misses, so the caller rebuilds and overwrites them.
+
+Parameters
+----------
+csv_path : String
+    The reference database CSV
+cache_dir : String or None
+    The cache directory. If None, default_cache_dir() is used
+
+Returns
+-------
+dict or None
+    The arrays 'names', 'descriptions', 'wavelengths' and 'values', or None if there
+    is no valid cache
+"""
+def load_reference_cache(csv_path, cache_dir=None):
+    path = reference_cache_path(csv_path, cache_dir)
+    if path is None or not os.path.exists(path):
+        return None
+
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {key: data[key] for key in REFERENCE_CACHE_FIELDS}
+    except (OSError, ValueError, EOFError, KeyError, zipfile.BadZipFile):
+        return None
+
+    stat = os.stat(csv_path)
+    if int(arrays['mtime_ns']) != stat.st_mtime_ns or int(arrays['size']) != stat.st_size:
+        # touched, but possibly not changed
+        if str(arrays['sha256']) != file_digest(csv_path):
+            return None
+        # re-stamp the entry, so that later loads do not hash the CSV again
+        arrays['mtime_ns'] = np.int64(stat.st_mtime_ns)
+        arrays['size'] = np.int64(stat.st_size)
+        _write_cache_file(path, arrays)
+
+    return arrays
+
+
+"""Saves the compiled reference spectra for a database CSV
+
+Failures to write (e.g. a read-only home directory) are ignored, as the cache is
+only an optimization.
+
+Parameters
+----------
+csv_path : String
+    The reference database CSV the arrays were compiled from
+names, descriptions : list
+    The names and descriptions of the spectra
+wavelengths : ndarray
+    The (W,) wavelengths of the reshaped spectra
+values : ndarray
+    The (K, W) reshaped values of the spectra
+cache_dir : String or None
+    The cache directory. If None, default_cache_dir() is used
+"""
+def save_reference_cache(csv_path, names, descriptions, wavelengths, values, cache_dir=None):
+    path = reference_cache_path(csv_path, cache_dir)
+    if path is None:
+        return
+
+    stat = os.stat(csv_path)
+    _write_cache_file(path, {
+        'names': np.array(names, dtype=str),
+        'descriptions': np.array(descriptions, dtype=str),
+        'wavelengths': np.asarray(wavelengths, dtype=float),
+        'values': np.asarray(values, dtype=float),
+        'mtime_ns': np.int64(stat.st_mtime_ns),
+        'size': np.int64(stat.st_size),
+        'sha256': np.array(file_digest(csv_path)),
+    })
+
+
+"""
+Atomically writes arrays to an npz cache file, ignoring failures to write
+"""
+def _write_cache_file(path, arrays):
+    tmp_path = None
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+    except OSError:
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+"""Computes the cache key of an imported SPD file
+
+The key covers the file content, not its path or modification time, so renamed or
+copied files share an entry and edited files miss.
+
+Parameters
+----------
+filename : String
+    The imported file
+**params
+    The import parameters that affect the values, e.g. weight, normalize, photometer
+    and the wavelength grid
+
+Returns
+-------
+String
+    The hex key
+"""
+def spd_cache_key(filename, **params):
+    key = hashlib.sha256(file_digest(filename).encode('ascii'))
+    key.update(repr((SPD_CACHE_VERSION, sorted(params.items()))).encode('utf-8'))
+    return key.hexdigest()
+
+
+"""
+Gets the path of a cached SPD, sharded by the first two characters of the key
+"""
+def spd_cache_path(key, cache_dir):
+    return os.path.join(cache_dir, 'spd', key[:2], key + '.f8')
+
+
+"""Loads the reshaped values of an imported SPD
+
+Entries are raw little-endian float64 arrays with no header, as the grid is part of
+the key. A hit refreshes the entry's modification time, which evict_spd_cache uses
+as the last-used time.
+
+Parameters
+----------
+key : String
+    The key from spd_cache_key
+length : int
+    The expected number of values. Entries of any other length are treated as misses
+cache_dir : String
+    The cache directory
+
+Returns
+-------
+ndarray or None
+    The values, or None if the SPD is not cached
+"""
+def load_spd_cache(key, length, cache_dir):
+    path = spd_cache_path(key, cache_dir)
+    try:
+        values = np.fromfile(path, dtype='<f8')
+        os.utime(path)
+    except OSError:
+        return None
+
+    if values.shape != (length,):
+        return None
+    return values.astype(float, copy=False)
+
+
+"""Saves the reshaped values of an imported SPD
+
+Writes are atomic, so concurrent importers never read a partial entry. Failures to
+write are ignored. Every SPD_CACHE_EVICT_INTERVAL writes, the cache is trimmed with
+evict_spd_cache.
+
+Parameters
+----------
+key : String
+    The key from spd_cache_key
+values : ndarray
+    The reshaped values
+cache_dir : String
+    The cache directory
+"""
+def save_spd_cache(key, values, cache_dir):
+    global spd_cache_writes
+
+    path = spd_cache_path(key, cache_dir)
+    directory = os.path.dirname(path)
+    tmp_path = None
+    try:
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        except FileNotFoundError:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(np.ascontiguousarray(values, dtype='<f8').tobytes())
+        os.replace(tmp_path, path)
+    except OSError:
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return
+
+    spd_cache_writes += 1
+    if spd_cache_writes >= SPD_CACHE_EVICT_INTERVAL:
+        spd_cache_writes = 0
+        evict_spd_cache(cache_dir=cache_dir)
+
+
+"""Deletes the least recently used SPDs until the cache fits in a size limit
+
+Parameters
+----------
+max_bytes : int
+    The size limit of the SPD cache
+cache_dir : String or None
+    The cache directory. If None, default_cache_dir() is used
+
+Returns
+-------
+int
+    The number of entries deleted
+"""
+def evict_spd_cache(max_bytes=SPD_CACHE_MAX_BYTES, cache_dir=None):
+    global spd_cache_writes
+    spd_cache_writes = 0
+
+    cache_dir = cache_dir or default_cache_dir()
+    if cache_dir is None:
+        return 0
+
+    entries = []
+    total = 0
+    root = os.path.join(cache_dir, 'spd')
+    for directory, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+            total += stat.st_size
+
+    deleted = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        deleted += 1
+
+    return deleted
@@ -13,10 +13,10 @@ from pathlib import Path
 from typing import List, Optional, Tuple, Dict, Any
 
 # Import the existing photometry modules
+from .archives import is_archive
 from .spectrum import import_spd, import_spd_batch
 from .plot import plot_spectrum, plot_multi_spectrum
-from .human_circadian import melanopic_ratio, melanopic_response, melanopic_lumens, melanopic_photopic_ratio
-from .human_visual import scotopic_photopic_ratio
+from .metrics import compute_all_metrics, metrics_to_dicts
 
 
 def validate_file_path(file_path: str) -> str:
@@ -35,15 +35,21 @@ def validate_directory_path(dir_path: str) -> str:
     return str(path.absolute())
 
 
+def validate_batch_path(path: str) -> str:
+    """Validate that a directory or spectral data archive exists and return the absolute path."""
+    if is_archive(path) and Path(path).is_file():
+        return str(Path(path).absolute())
+    return validate_directory_path(path)
+
+
 def calculate_metrics(spd) -> Dict[str, Any]:
     """Calculate all metrics for a given SPD."""
-    return {
-        'name': spd.strict_name,
-        'melanopic_ratio': round(melanopic_ratio(spd), 3),
-        'melanopic_response': round(melanopic_response(spd), 1),
-        'scotopic_photopic_ratio': round(scotopic_photopic_ratio(spd), 3),
-        'melanopic_photopic_ratio': round(melanopic_photopic_ratio(spd), 3)
-    }
+    return calculate_batch_metrics([spd])[0]
+
+
+def calculate_batch_metrics(spds) -> List[Dict[str, Any]]:
+    """Calculate all metrics for a list or dict of SPDs in a single pass."""
+    return metrics_to_dicts(compute_all_metrics(spds))
 
 
 def print_metrics(metrics: Dict[str, Any]) -> None:
@@ -53,6 +59,8 @@ def print_metrics(metrics: Dict[str, Any]) -> None:
     print(f"  Melanopic Response: {metrics['melanopic_response']}")
     print(f"  Scotopic/Photopic Ratio: {metrics['scotopic_photopic_ratio']}")
     print(f"  Melanopic/Photopic Ratio: {metrics['melanopic_photopic_ratio']}")
+    print(f"  CCT: {'n/a' if metrics['cct'] is None else format(metrics['cct'], '.0f') + ' K'}")
+    print(f"  Duv: {'n/a' if metrics['duv'] is None else format(metrics['duv'], '.4f')}")
 
 
 def single_spd_command(args: argparse.Namespace) -> None:
@@ -113,8 +121,7 @@ def compare_command(args: argparse.Namespace) -> None:
             sys.exit(1)
         
         # Calculate and print metrics for each SPD
-        for spd in spds:
-            metrics = calculate_metrics(spd)
+        for metrics in calculate_batch_metrics(spds):
             print_metrics(metrics)
         
         # Create plot options
@@ -145,12 +152,22 @@ def batch_command(args: argparse.Namespace) -> None:
     """Handle batch processing command."""
     try:
         # Import all SPDs from directory
+        errors = {}
         spds_dict = import_spd_batch(
             directory=args.directory,
             photometer=args.photometer,
-            printNames=args.verbose
+            printNames=args.verbose,
+            workers=args.workers,
+            recursive=args.recursive,
+            include=args.include,
+            exclude=args.exclude,
+            errors=errors,
+            cache=args.cache
         )
         
+        if errors:
+            print(f"Skipped {len(errors)} file(s) that could not be imported", file=sys.stderr)
+        
         if not spds_dict:
             print("No SPD files found in the specified directory", file=sys.stderr)
             sys.exit(1)
@@ -158,8 +175,7 @@ def batch_command(args: argparse.Namespace) -> None:
         spds = list(spds_dict.values())
         
         # Calculate and print metrics for each SPD
-        for spd in spds:
-            metrics = calculate_metrics(spd)
+        for metrics in calculate_batch_metrics(spds_dict):
             print_metrics(metrics)
         
         # Create comparison plot if requested
@@ -200,9 +216,9 @@ Examples:
     # Global options
     parser.add_argument(
         '--photometer',
-        choices=['none', 'uprtek'],
+        choices=['none', 'auto', 'uprtek', 'csv', 'tsv'],
         default='none',
-        help='Photometer type for file import (default: none)'
+        help='Photometer type for file import, or auto to detect it per file (default: none)'
     )
     parser.add_argument(
         '--figsize',
@@ -324,8 +340,36 @@ Examples:
     )
     batch_parser.add_argument(
         'directory',
-        type=validate_directory_path,
-        help='Directory containing SPD files'
+        type=validate_batch_path,
+        help='Directory, or .zip/.tar.gz archive, containing SPD files'
+    )
+    batch_parser.add_argument(
+        '--recursive',
+        action='store_true',
+        help='Also process SPD files in subdirectories'
+    )
+    batch_parser.add_argument(
+        '--include',
+        action='append',
+        metavar='GLOB',
+        help='Only process files whose relative path matches this pattern (repeatable)'
+    )
+    batch_parser.add_argument(
+        '--exclude',
+        action='append',
+        metavar='GLOB',
+        help='Skip files whose relative path matches this pattern (repeatable)'
+    )
+    batch_parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='Number of worker processes for importing (0 for one per CPU, default: serial)'
+    )
+    batch_parser.add_argument(
+        '--cache',
+        action='store_true',
+        help='Reuse previously imported SPDs from the on-disk cache'
     )
     batch_parser.add_argument(
         '--normalize',
@@ -0,0 +1,194 @@
+"""
+CIE 13.3 colour rendering indices for batches of light sources
+
+The special indices R1-R15 and the general index Ra are computed for every row of an
+(N, W) batch on the reshape() grid at once:
+
+    1. the CCT of each source, from chromaticity.cct_duv_batch
+    2. its reference illuminant: a blackbody below 5000 K, CIE daylight above
+    3. the tristimulus values of the 15 test colour samples under both illuminants,
+       with one product with a precomputed (W, 15 × 3) reflectance × CMF matrix
+    4. von Kries adaptation in CIE 1960 uv, CIE 1964 U*V*W* colour differences, and
+       Ri = 100 - 4.6 ΔEi, with Ra the mean of R1-R8
+
+The sample reflectances are colour's CIE test colour samples, interpolated onto the
+grid as reshape() would.
+"""
+import numpy as np
+from colour.quality.datasets.tcs import INDEXES_TO_NAMES_TCS, SDS_TCS
+
+from .batch import as_batch_values
+from .chromaticity import XYZ_to_uv, blackbody_spectra, cct_duv_batch, daylight_spectra, get_cmf_matrix
+from .resample import resample
+from .spectrum import reshape_wavelengths
+from .utils import round_output, round_output_array
+
+# The test colour sample set. TCS15 is only in colour's 'CIE 2024' set
+TCS_METHOD = 'CIE 2024' if 'CIE 2024' in SDS_TCS else 'CIE 1995'
+
+# The names of the special indices, in the order of the columns of every result
+R_VALUES = tuple('R{}'.format(index) for index in sorted(INDEXES_TO_NAMES_TCS[TCS_METHOD]))
+
+# Ra is the mean of the special indices of the first 8 samples
+GENERAL_SAMPLES = 8
+
+# Below this CCT the reference illuminant is a blackbody, and above it CIE daylight
+REFERENCE_CCT = 5000
+
+tcs_matrix = None
+
+
+"""
+Gets the test colour sample matrix, compiling it on first use
+
+@return ndarray         The (W, S × 3) matrix whose column 3i + j is the reflectance of
+                        sample i times the jth colour matching function (with Δλ)
+"""
+def get_tcs_matrix():
+    global tcs_matrix
+
+    if tcs_matrix is None:
+        wavelengths = reshape_wavelengths()
+        names = INDEXES_TO_NAMES_TCS[TCS_METHOD]
+        samples = SDS_TCS[TCS_METHOD]
+        # the samples are not all on the same grid
+        reflectances = np.vstack([resample(samples[names[index]].values, samples[names[index]].wavelengths,
+                                           wavelengths)
+                                  for index in sorted(names)])
+
+        matrix = (reflectances[:, np.newaxis, :] * get_cmf_matrix()).reshape(-1, len(wavelengths)).T
+        matrix = np.ascontiguousarray(matrix)
+        matrix.flags.writeable = False
+        tcs_matrix = matrix
+
+    return tcs_matrix
+
+
+"""
+Calculates the spectra of the CIE 13.3 reference illuminants for the given CCTs
+
+@param ndarray cct              The (N,) CCTs, in K
+
+@return ndarray                 The (N, W) reference spectra, with rows of NaN where the CCT is NaN
+"""
+def reference_illuminants(cct):
+    cct = np.asarray(cct, dtype=float)
+    references = np.full((len(cct), len(reshape_wavelengths())), np.nan)
+
+    blackbody = cct < REFERENCE_CCT
+    references[blackbody] = blackbody_spectra(cct[blackbody])
+
+    # colour interpolates the daylight series linearly for CRI
+    daylight = cct >= REFERENCE_CCT
+    references[daylight] = daylight_spectra(cct[daylight], 'linear')
+
+    return references
+
+
+"""
+Calculates the chromaticities of a batch of illuminants and of the test colour samples under them
+
+@param ndarray values           The (N, W) spectral values
+
+@return tuple                   The (N, 2) uv of the illuminants, and the (N, S, 2) uv and (N, S) Y
+                                (relative to 100 for the perfect diffuser) of the samples
+"""
+def _tcs_colorimetry(values):
+    XYZ = values @ get_cmf_matrix().T
+    samples = (values @ get_tcs_matrix()).reshape(len(values), -1, 3)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        Y = 100 * samples[..., 1] / XYZ[:, 1:2]
+    return XYZ_to_uv(XYZ), XYZ_to_uv(samples), Y
+
+
+"""
+Calculates the c and d terms of the CIE 13.3 von Kries transform
+"""
+def _von_kries_terms(uv):
+    u, v = uv[..., 0], uv[..., 1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (4 - u - 10 * v) / v, (1.708 * v + 0.404 - 1.481 * u) / v
+
+
+"""
+Calculates the special colour rendering indices for a batch of light sources
+
+@param SpectrumBatch/list/ndarray spds          The spectral power distributions, see batch.as_batch_values
+
+@return ndarray                                 The (N, S) indices, with columns ordered as R_VALUES,
+                                                NaN where the CCT is not defined
+"""
+def r_values_batch(spds):
+    values = as_batch_values(spds)
+    references = reference_illuminants(cct_duv_batch(values)[0])
+
+    uv_t, tcs_uv_t, tcs_Y_t = _tcs_colorimetry(values)
+    uv_r, tcs_uv_r, tcs_Y_r = _tcs_colorimetry(references)
+
+    # adapt the samples under the test source to the reference illuminant
+    c_t, d_t = _von_kries_terms(uv_t)
+    c_r, d_r = _von_kries_terms(uv_r)
+    c, d = _von_kries_terms(tcs_uv_t)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        c = (c_r / c_t)[:, np.newaxis] * c
+        d = (d_r / d_t)[:, np.newaxis] * d
+        denominator = 16.518 + 1.481 * c - d
+        tcs_uv_t = np.stack([(10.872 + 0.404 * c - 4 * d) / denominator, 5.52 / denominator], axis=-1)
+
+    W_t = 25 * np.cbrt(tcs_Y_t) - 17
+    W_r = 25 * np.cbrt(tcs_Y_r) - 17
+    UV_t = 13 * W_t[..., np.newaxis] * (tcs_uv_t - uv_r[:, np.newaxis])
+    UV_r = 13 * W_r[..., np.newaxis] * (tcs_uv_r - uv_r[:, np.newaxis])
+
+    difference = np.sqrt(((UV_t - UV_r) ** 2).sum(axis=2) + (W_t - W_r) ** 2)
+    return 100 - 4.6 * difference
+
+
+"""Calculates the general and special colour rendering indices for a batch of light sources
+
+Parameters
+----------
+spds : SpectrumBatch, list or ndarray
+    The spectral power distributions, see batch.as_batch_values
+toround : bool
+    Whether to round every index to 2 decimal places
+
+Returns
+-------
+ndarray
+    A structured array with one record per light source, with the fields 'Ra' and R_VALUES
+"""
+def cri_batch(spds, toround=False):
+    indices = r_values_batch(spds)
+
+    results = np.empty(len(indices), dtype=[(field, float) for field in ('Ra',) + R_VALUES])
+    results['Ra'] = round_output_array(indices[:, :GENERAL_SAMPLES].mean(axis=1), toround)
+    for i, field in enumerate(R_VALUES):
+        results[field] = round_output_array(indices[:, i], toround)
+
+    return results
+
+
+"""
+Calculates the general colour rendering index (Ra) for a given light source
+
+@param SpectralDistribution spd            The spectral power distribution
+@param bool toround [optional]                  Whether to round to output to 2 decimal places
+
+@return float                                   The Ra
+"""
+def color_rendering_index(spd, toround=True):
+    return round_output(r_values_batch(spd)[0, :GENERAL_SAMPLES].mean(), toround)
+
+
+"""
+Calculates the special colour rendering indices for a given light source
+
+@param SpectralDistribution spd            The spectral power distribution
+@param bool toround [optional]                  Whether to round to output to 2 decimal places
+
+@return dict                                    The R values, keyed 'R1' to 'R15' as for plot_r_values
+"""
+def cri_r_values(spd, toround=True):
+    return {field: round_output(float(value), toround)
+            for field, value in zip(R_VALUES, r_values_batch(spd)[0])}
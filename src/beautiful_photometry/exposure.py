@@ -0,0 +1,311 @@
+"""
+Streaming light exposure of timestamped spectral irradiances
+
+An ExposureAccumulator consumes a time series of spectral irradiances (W/m²/nm on the
+reshape() grid), chunk by chunk, and keeps in constant memory:
+
+    * the cumulative melanopic and photopic dose, the time integrals of the melanopic
+      EDI and of the illuminance (CIE S 026), in lx·h
+    * the time spent above melanopic EDI and illuminance thresholds, in h
+    * the same over a rolling window, from a ring of fixed-width time buckets
+
+Doses are integrated with the trapezoidal rule between consecutive samples, including
+across chunks. An interval counts as above a threshold when the mean of its two
+samples is. Gaps longer than max_gap (e.g. a sensor that was off) are not integrated.
+Intervals that span several buckets are split across them in proportion to their
+overlap, so sparse samples are not counted outside the window.
+
+The state can be saved to a checkpoint and restored to resume a stream:
+
+    exposure = ExposureAccumulator(window=3600)
+    for timestamps, spds in chunks:
+        exposure.update(timestamps, spds)
+    exposure.save('exposure.npz')
+    exposure = ExposureAccumulator.load('exposure.npz')
+"""
+import os
+import tempfile
+
+import numpy as np
+
+from .alpha_opic import K_D65, MELANOPIC, get_alpha_opic_matrix
+from .batch import as_batch_values
+from .utils import round_output
+
+# The default melanopic EDI thresholds, in lx: the recommended evening maximum and
+# daytime minimum of Brown et al. (2022)
+MELANOPIC_THRESHOLDS = (10, 250)
+
+# The columns of the accumulated sums, after which come the time above each threshold
+DURATION, MELANOPIC_DOSE, PHOTOPIC_DOSE = range(3)
+
+SECONDS_PER_HOUR = 3600
+
+# The state saved by ExposureAccumulator.save
+CHECKPOINT_VERSION = 1
+
+
+"""
+Converts timestamps to seconds
+
+@param array_like timestamps        The timestamps, as seconds or datetime64
+
+@return ndarray                     The (N,) timestamps in seconds, since the epoch for datetime64
+"""
+def _to_seconds(timestamps):
+    timestamps = np.atleast_1d(np.asarray(timestamps))
+    if np.issubdtype(timestamps.dtype, np.datetime64):
+        return timestamps.astype('datetime64[ns]').astype(np.int64) / 1e9
+    return timestamps.astype(float)
+
+
+"""
+Calculates the melanopic EDI and the illuminance of a batch of spectral irradiances
+
+@param SpectrumBatch/list/ndarray spds          The spectral irradiances, see batch.as_batch_values
+
+@return ndarray                                 The (N, 2) melanopic EDIs and illuminances, in lx
+"""
+def exposure_levels(spds):
+    levels = as_batch_values(spds) @ get_alpha_opic_matrix()[[MELANOPIC, -1]].T
+    levels[:, 0] /= K_D65[MELANOPIC]
+    return levels
+
+
+"""
+Accumulates the light exposure of a stream of timestamped spectral irradiances
+
+Parameters
+----------
+window : float
+    The length of the rolling window, in s
+resolution : float
+    The width of the time buckets of the rolling window, in s. The window is the
+    window / resolution buckets ending with the bucket of the last sample, so its
+    start is exact to this resolution
+melanopic_thresholds : tuple
+    The melanopic EDI thresholds, in lx
+photopic_thresholds : tuple
+    The illuminance thresholds, in lx
+max_gap : float or None
+    The longest interval between samples that is integrated, in s. If None, every
+    interval is
+"""
+class ExposureAccumulator:
+
+    def __init__(self, window=SECONDS_PER_HOUR, resolution=60, melanopic_thresholds=MELANOPIC_THRESHOLDS,
+                 photopic_thresholds=(), max_gap=None):
+        if resolution <= 0 or window < resolution:
+            raise ValueError('The window ({} s) must be at least one resolution ({} s) long'.format(
+                window, resolution))
+
+        self.window = float(window)
+        self.resolution = float(resolution)
+        self.melanopic_thresholds = tuple(float(threshold) for threshold in melanopic_thresholds)
+        self.photopic_thresholds = tuple(float(threshold) for threshold in photopic_thresholds)
+        self.max_gap = None if max_gap is None else float(max_gap)
+
+        columns = 3 + len(self.melanopic_thresholds) + len(self.photopic_thresholds)
+        self.samples = 0
+        self.totals = np.zeros(columns)
+        self.buckets = np.zeros((int(np.ceil(self.window / self.resolution)), columns))
+        self.bucket = None
+        self.last_time = None
+        self.last_levels = None
+
+    """
+    Adds a chunk of samples to the stream
+
+    @param array_like timestamps                    The (N,) timestamps, as seconds or datetime64, in order
+                                                    and no earlier than the last sample of the stream
+    @param SpectrumBatch/list/ndarray spds          The N spectral irradiances, see batch.as_batch_values
+    """
+    def update(self, timestamps, spds):
+        times = _to_seconds(timestamps)
+        levels = exposure_levels(spds)
+        if len(times) != len(levels):
+            raise ValueError('Got {} timestamps for {} spectra'.format(len(times), len(levels)))
+        if not len(times):
+            return
+
+        if self.last_time is not None:
+            times = np.concatenate([[self.last_time], times])
+            levels = np.vstack([self.last_levels, levels])
+        durations = np.diff(times)
+        if np.any(durations < 0):
+            raise ValueError('Timestamps must not decrease')
+
+        self.samples += len(times) - (self.last_time is not None)
+        self.last_time = times[-1]
+        self.last_levels = levels[-1].copy()
+
+        if self.max_gap is not None:
+            durations = np.where(durations > self.max_gap, 0, durations)
+        sums = self._interval_sums(durations, (levels[1:] + levels[:-1]) / 2)
+        self.totals += sums.sum(axis=0)
+        integrated = durations > 0
+        self._add_to_buckets(times[:-1][integrated], times[1:][integrated], sums[integrated])
+
+    """
+    Calculates the sums accumulated over each interval
+
+    @param ndarray durations        The (N,) durations of the intervals, in s
+    @param ndarray levels           The (N, 2) mean melanopic EDIs and illuminances of the intervals
+
+    @return ndarray                 The (N, K) durations, doses and times above each threshold
+    """
+    def _interval_sums(self, durations, levels):
+        above = [levels[:, 0] >= threshold for threshold in self.melanopic_thresholds]
+        above += [levels[:, 1] >= threshold for threshold in self.photopic_thresholds]
+        return np.column_stack([durations, durations[:, np.newaxis] * levels] +
+                               [durations * flags for flags in above])
+
+    """
+    Adds interval sums to the buckets of the rolling window, expiring the buckets that
+    leave it. Each interval is split across the buckets it spans in proportion to its
+    overlap with each, and only the buckets still in the window are kept
+
+    @param ndarray starts           The (N,) start times of the intervals, in order, in s
+    @param ndarray ends             The (N,) end times of the intervals, in s. The stream's last
+                                    sample is at self.last_time
+    @param ndarray sums             The (N, K) sums of each interval
+    """
+    def _add_to_buckets(self, starts, ends, sums):
+        count = len(self.buckets)
+        last = int(np.floor(self.last_time / self.resolution))
+        if self.bucket is None or last - self.bucket >= count:
+            self.buckets[:] = 0
+        elif last > self.bucket:
+            self.buckets[np.arange(self.bucket + 1, last + 1) % count] = 0
+        self.bucket = last if self.bucket is None else max(self.bucket, last)
+        if not len(starts):
+            return
+
+        first = np.maximum(np.floor(starts / self.resolution).astype(np.int64), self.bucket - count + 1)
+        final = np.maximum(np.ceil(ends / self.resolution).astype(np.int64) - 1, first)
+        spans = np.maximum(final - first + 1, 0)
+
+        # one (interval, bucket) pair per bucket that an interval overlaps
+        offsets = np.cumsum(spans) - spans
+        rows = np.repeat(np.arange(len(starts)), spans)
+        buckets = first[rows] + np.arange(len(rows)) - offsets[rows]
+        overlap = (np.minimum(ends[rows], (buckets + 1) * self.resolution) -
+                   np.maximum(starts[rows], buckets * self.resolution))
+        fractions = np.clip(overlap, 0, None) / (ends - starts)[rows]
+
+        positions = buckets % count
+        for column in range(sums.shape[1]):
+            self.buckets[:, column] += np.bincount(positions, sums[rows, column] * fractions, count)
+
+    """
+    Formats accumulated sums
+
+    @param ndarray sums             The (K,) sums
+    @param bool toround             Whether to round doses and levels to 1 decimal place and times to 3
+
+    @return dict                    See summary()
+    """
+    def _summary(self, sums, toround):
+        duration = sums[DURATION]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = sums[[MELANOPIC_DOSE, PHOTOPIC_DOSE]] / duration
+
+        above = sums[3:] / SECONDS_PER_HOUR
+        split = len(self.melanopic_thresholds)
+        return {
+            'duration': round_output(duration / SECONDS_PER_HOUR, toround, 3),
+            'melanopic_dose': round_output(sums[MELANOPIC_DOSE] / SECONDS_PER_HOUR, toround, 1),
+            'photopic_dose': round_output(sums[PHOTOPIC_DOSE] / SECONDS_PER_HOUR, toround, 1),
+            'mean_melanopic_edi': round_output(mean[0], toround, 1),
+            'mean_illuminance': round_output(mean[1], toround, 1),
+            'melanopic_hours_above': {threshold: round_output(hours, toround, 3)
+                                      for threshold, hours in zip(self.melanopic_thresholds, above[:split])},
+            'photopic_hours_above': {threshold: round_output(hours, toround, 3)
+                                     for threshold, hours in zip(self.photopic_thresholds, above[split:])},
+        }
+
+    """Summarizes the exposure of the whole stream
+
+    Parameters
+    ----------
+    toround : bool
+        Whether to round doses and levels to 1 decimal place and times to 3
+
+    Returns
+    -------
+    dict
+        The integrated 'duration' (h), the 'melanopic_dose' and 'photopic_dose' (lx·h),
+        the time-weighted 'mean_melanopic_edi' and 'mean_illuminance' (lx, NaN before any
+        interval), and the 'melanopic_hours_above' and 'photopic_hours_above' each
+        threshold (dicts keyed by threshold)
+    """
+    def summary(self, toround=False):
+        return self._summary(self.totals, toround)
+
+    """
+    Summarizes the exposure of the rolling window ending with the bucket of the last sample
+
+    @param bool toround [optional]      Whether to round doses and levels to 1 decimal place and times to 3
+
+    @return dict                        The same fields as summary()
+    """
+    def window_summary(self, toround=False):
+        return self._summary(self.buckets.sum(axis=0), toround)
+
+    """
+    Saves the state of the accumulator, so that the stream can be resumed with load().
+    The write is atomic, so an interrupted save never leaves a partial checkpoint
+
+    @param String path                  The checkpoint file, conventionally .npz
+    """
+    def save(self, path):
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(
+                    f,
+                    version=np.int64(CHECKPOINT_VERSION),
+                    config=np.array([self.window, self.resolution,
+                                     np.nan if self.max_gap is None else self.max_gap]),
+                    melanopic_thresholds=np.array(self.melanopic_thresholds, dtype=float),
+                    photopic_thresholds=np.array(self.photopic_thresholds, dtype=float),
+                    samples=np.int64(self.samples),
+                    totals=self.totals,
+                    buckets=self.buckets,
+                    bucket=np.float64(np.nan if self.bucket is None else self.bucket),
+                    last=np.concatenate([[np.nan if self.last_time is None else self.last_time],
+                                         np.full(2, np.nan) if self.last_levels is None else self.last_levels]),
+                )
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    """
+    Restores an accumulator saved with save()
+
+    @param String path                  The checkpoint file
+
+    @return ExposureAccumulator         The accumulator, ready for more updates
+    """
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            if int(data['version']) != CHECKPOINT_VERSION:
+                raise ValueError('Unsupported exposure checkpoint version {}'.format(int(data['version'])))
+
+            window, resolution, max_gap = data['config']
+            accumulator = cls(window, resolution, data['melanopic_thresholds'], data['photopic_thresholds'],
+                              None if np.isnan(max_gap) else max_gap)
+            accumulator.samples = int(data['samples'])
+            accumulator.totals = data['totals'].copy()
+            accumulator.buckets = data['buckets'].copy()
+            accumulator.bucket = None if np.isnan(data['bucket']) else int(data['bucket'])
+            last = data['last']
+            if not np.isnan(last[0]):
+                accumulator.last_time = float(last[0])
+                accumulator.last_levels = last[1:].copy()
+
+        return accumulator
@@ -0,0 +1,170 @@
+"""
+Light sources seen through transmission filters
+
+The SPD of source s through filter f is the product of the source SPD and the filter
+transmission, and every channel response is a weighted sum over the grid:
+
+    responses[s, f, c] = sum_w sources[s, w] * filters[f, w] * weights[c, w]
+
+Instead of building the S × F product spectra, the sources are weighted by every
+channel once, and each block of sources is multiplied with each block of filters in
+one fused product:
+
+    (Sb × 7, W) @ (W, Fb) -> (Sb, 7, Fb)
+
+so memory stays bounded by the block size however many sources and filters there are:
+
+    filters = import_spd_batch('CSVs/filters', normalize=False)
+    table = filter_table(import_spd_batch('path/to/sources'), filters)
+
+Filters are imported with normalize=False, which keeps the absolute transmissions of
+the files; normalizing would scale every filter to peak at 1.
+"""
+import numpy as np
+
+from .batch import SpectrumBatch
+from .human_circadian import (
+    melanopic_ratio_batch,
+    melanopic_response_batch,
+    melanopic_photopic_ratio_batch,
+)
+from .human_visual import (
+    photopic_response_batch,
+    scotopic_response_batch,
+    scotopic_photopic_ratio_batch,
+)
+from .utils import round_output_array
+from .weighting import MELANOPIC, PHOTOPIC, get_weighting_matrix
+
+# The fields of filter_table, with the digits they are rounded to
+FILTER_FIELDS = (
+    ('photopic_response', 1),
+    ('scotopic_response', 1),
+    ('melanopic_response', 1),
+    ('melanopic_ratio', 2),
+    ('melanopic_photopic_ratio', 2),
+    ('scotopic_photopic_ratio', 2),
+    ('photopic_transmission', 3),
+    ('melanopic_transmission', 3),
+)
+
+# The number of sources and of filters multiplied at once
+BLOCK_SIZE = 256
+
+
+"""
+Gets a SpectrumBatch of sources or filters
+
+@param SpectrumBatch/list/dict/ndarray spds     The SPDs. Arrays must already be on the reshape() grid
+
+@return SpectrumBatch                           The batch
+"""
+def _as_batch(spds):
+    if isinstance(spds, SpectrumBatch):
+        return spds
+    if isinstance(spds, np.ndarray):
+        return SpectrumBatch(spds)
+    return SpectrumBatch.from_spds(spds)
+
+
+"""
+Builds the SPD of every source through every filter. Only needed to plot or export
+them; filter_table() does not use them
+
+@param SpectrumBatch/list/dict/ndarray sources  The S light sources
+@param SpectrumBatch/list/dict/ndarray filters  The F filter transmissions, as fractions
+
+@return SpectrumBatch                           The S × F filtered SPDs, source-major, named
+                                                'source / filter'
+"""
+def filter_spectra(sources, filters):
+    sources, filters = _as_batch(sources), _as_batch(filters)
+    values = (sources.values[:, np.newaxis, :] * filters.values).reshape(-1, sources.values.shape[1])
+    names = ['{} / {}'.format(source, name) for source in sources.names for name in filters.names]
+    return SpectrumBatch(values, sources.wavelengths, names)
+
+
+"""
+Calculates every channel response of every source through every filter
+
+@param SpectrumBatch/list/dict/ndarray sources  The S light sources
+@param SpectrumBatch/list/dict/ndarray filters  The F filter transmissions, as fractions
+@param int block_size [optional]                The number of sources and of filters multiplied at once
+
+@return ndarray                                 The (S, F, 7) responses, with the last axis ordered
+                                                as weighting.CHANNELS
+"""
+def filter_responses(sources, filters, block_size=BLOCK_SIZE):
+    sources, filters = _as_batch(sources).values, _as_batch(filters).values
+    responses = np.empty((len(sources), len(filters), len(get_weighting_matrix())))
+    for (s, f), block in _iter_blocks(sources, filters, block_size):
+        responses[s, f] = block
+    return responses
+
+
+"""
+Multiplies blocks of sources with blocks of filters, see the module docstring
+
+@return generator               Yields the (source slice, filter slice) of each block, and its
+                                (Sb, Fb, 7) responses
+"""
+def _iter_blocks(sources, filters, block_size):
+    if block_size < 1:
+        raise ValueError('The block size must be at least 1, got {}'.format(block_size))
+
+    weights = get_weighting_matrix()
+    for s in range(0, len(sources), block_size):
+        rows = slice(s, s + block_size)
+        # (Sb, 7, W), reused for every block of filters
+        weighted = (sources[rows, np.newaxis, :] * weights).reshape(-1, weights.shape[1])
+        for f in range(0, len(filters), block_size):
+            columns = slice(f, f + block_size)
+            block = (weighted @ filters[columns].T).reshape(-1, len(weights), len(filters[columns]))
+            yield (rows, columns), block.transpose(0, 2, 1)
+
+
+"""Evaluates the metrics of every source through every filter
+
+Parameters
+----------
+sources : SpectrumBatch, list, dict or ndarray
+    The S light sources. SpectralDistributions that are not on the reshape() grid are
+    reshaped; arrays must already be on the grid
+filters : SpectrumBatch, list, dict or ndarray
+    The F filter transmissions, as fractions, e.g. import_spd_batch('CSVs/filters', normalize=False)
+toround : bool
+    Whether to round each metric as its single-SPD function does, and the
+    transmissions to 3 decimal places
+block_size : int
+    The number of sources and of filters multiplied at once
+
+Returns
+-------
+ndarray
+    An (S, F) structured array with the fields of FILTER_FIELDS. The transmissions are
+    the fractions of the unfiltered photopic and melanopic responses that pass the filter
+"""
+def filter_table(sources, filters, toround=False, block_size=BLOCK_SIZE):
+    sources, filters = _as_batch(sources).values, _as_batch(filters).values
+    results = np.empty((len(sources), len(filters)), dtype=[(field, float) for field, _ in FILTER_FIELDS])
+    unfiltered = sources @ get_weighting_matrix()[[PHOTOPIC, MELANOPIC]].T
+
+    for (s, f), block in _iter_blocks(sources, filters, block_size):
+        responses = block.reshape(-1, block.shape[2])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            columns = {
+                'photopic_response': photopic_response_batch(None, False, responses),
+                'scotopic_response': scotopic_response_batch(None, False, responses),
+                'melanopic_response': melanopic_response_batch(None, False, responses),
+                'melanopic_ratio': melanopic_ratio_batch(None, False, responses),
+                'melanopic_photopic_ratio': melanopic_photopic_ratio_batch(None, False, responses),
+                'scotopic_photopic_ratio': scotopic_photopic_ratio_batch(None, False, responses),
+                'photopic_transmission': block[..., PHOTOPIC] / unfiltered[s, 0:1],
+                'melanopic_transmission': block[..., MELANOPIC] / unfiltered[s, 1:2],
+            }
+
+        shape = block.shape[:2]
+        for field, digits in FILTER_FIELDS:
+            results[field][s, f] = round_output_array(columns[field].reshape(shape), toround, digits)
+
+    return results
@@ -0,0 +1,230 @@
+"""
+Streaming averages of repeated spectral captures
+
+Averaging many repeated frames of one light source reduces the noise of a measurement.
+A FrameAccumulator consumes the frames chunk by chunk and keeps, per wavelength of the
+reshape() grid and in constant memory:
+
+    * the frame count, the running mean and the sum of squared deviations from it,
+      merged with Welford's updates (Chan et al.'s, for a chunk of frames), which stay
+      accurate where the naive sum of squares cancels catastrophically
+    * the minimum and the maximum
+
+A dark frame, or the FrameAccumulator of several dark frames, is subtracted from every
+frame, and the uncertainty of the dark is propagated into the uncertainty of the
+average:
+
+    dark = accumulate_frames('captures/dark', method='linear')
+    frames = accumulate_frames('captures/led', dark=dark, method='linear')
+    spd, uncertainty = frames.average('LED')
+"""
+import os
+from os.path import join
+
+import numpy as np
+from colour import SpectralDistribution
+
+from . import readers
+from .batch import as_batch_values
+from .resample import FULL_RESOLUTION_METHODS, resample
+from .spectrum import iter_spectral_files, reshape, reshape_wavelengths
+
+# The number of frames imported by accumulate_frames before each update
+FRAME_CHUNK_SIZE = 64
+
+
+"""
+Accumulates repeated frames of one light source
+
+Parameters
+----------
+dark : FrameAccumulator, SpectralDistribution, ndarray or None
+    The dark frame subtracted from every frame. A FrameAccumulator of dark frames
+    contributes the uncertainty of its mean (none for a single dark frame); a single
+    SPD or (W,) array is taken as exact. If None, no dark frame is subtracted
+"""
+class FrameAccumulator:
+
+    def __init__(self, dark=None):
+        self.dark, self.dark_uncertainty = _dark_values(dark)
+        self.count = 0
+        self.mean = None
+        self.m2 = None
+        self.minimum = None
+        self.maximum = None
+
+    """
+    Adds frames to the average
+
+    @param SpectrumBatch/SpectralDistribution/list/ndarray frames       The N frames, see batch.as_batch_values
+    """
+    def update(self, frames):
+        values = as_batch_values(frames) - self.dark
+        if not len(values):
+            return
+        if self.mean is not None and values.shape[1] != len(self.mean):
+            raise ValueError('Got frames of {} wavelengths, expected {}'.format(values.shape[1], len(self.mean)))
+
+        count = len(values)
+        mean = values.mean(axis=0)
+        m2 = ((values - mean) ** 2).sum(axis=0)
+
+        if self.count == 0:
+            self.mean, self.m2 = mean, m2
+            self.minimum, self.maximum = values.min(axis=0), values.max(axis=0)
+        else:
+            total = self.count + count
+            delta = mean - self.mean
+            self.mean = self.mean + delta * (count / total)
+            self.m2 = self.m2 + m2 + delta ** 2 * (self.count * count / total)
+            np.minimum(self.minimum, values.min(axis=0), out=self.minimum)
+            np.maximum(self.maximum, values.max(axis=0), out=self.maximum)
+        self.count += count
+
+    """
+    The (W,) sample variance of the dark-subtracted frames, NaN before two frames
+    """
+    @property
+    def variance(self):
+        if self.count < 2:
+            return np.full_like(self.m2, np.nan)
+        return self.m2 / (self.count - 1)
+
+    """
+    The (W,) sample standard deviation of the dark-subtracted frames
+    """
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+    """
+    The (W,) standard uncertainty of the mean: the standard error of the frames,
+    combined in quadrature with the uncertainty of the dark
+    """
+    @property
+    def uncertainty(self):
+        return np.sqrt(self.variance / self.count + self.dark_uncertainty ** 2)
+
+    """Gets the averaged SPD and its uncertainty
+
+    Parameters
+    ----------
+    name : String or None
+        The name of the SPD
+
+    Returns
+    -------
+    tuple
+        The dark-subtracted mean as a SpectralDistribution on the reshape() grid, and
+        the (W,) uncertainty of each of its values (NaN for a single frame)
+    """
+    def average(self, name=None):
+        if self.count == 0:
+            raise ValueError('No frames have been added')
+        return SpectralDistribution(self.mean, reshape_wavelengths(), name=name), self.uncertainty
+
+
+"""
+Gets the values and the uncertainty of a dark frame, see FrameAccumulator
+
+@return tuple                   The (W,) dark values and uncertainties, or zeros without a dark frame
+"""
+def _dark_values(dark):
+    if dark is None:
+        return 0.0, 0.0
+
+    if isinstance(dark, FrameAccumulator):
+        if dark.count == 0:
+            raise ValueError('The dark FrameAccumulator has no frames')
+        uncertainty = dark.uncertainty if dark.count > 1 else np.zeros_like(dark.mean)
+        return dark.mean, uncertainty
+
+    values = as_batch_values(dark)
+    if len(values) != 1:
+        raise ValueError('Expected one dark frame, got {}. Average them with a FrameAccumulator'.format(len(values)))
+    return values[0], np.zeros_like(values[0])
+
+
+"""
+Imports a chunk of frame files onto the reshape() grid, without normalizing them
+
+Frames that share a wavelength grid, as the frames of one spectrometer do, are
+resampled together with one product. Without a method, each frame is reshaped by colour.
+
+@return ndarray                 The (N, W) frame values
+"""
+def _import_frames(paths, photometer, method):
+    truncate = method not in FULL_RESOLUTION_METHODS
+    spectra = [readers.read_spectrum(path, photometer, truncate) for path in paths]
+    if method is None:
+        return np.array([reshape(SpectralDistribution(values, wavelengths)).values
+                         for wavelengths, values in spectra])
+
+    grids = {}
+    for i, (wavelengths, _) in enumerate(spectra):
+        grids.setdefault(wavelengths.tobytes(), []).append(i)
+
+    target = reshape_wavelengths()
+    frames = np.empty((len(spectra), len(target)))
+    for indices in grids.values():
+        values = np.array([spectra[i][1] for i in indices])
+        frames[indices] = resample(values, spectra[indices[0]][0], target, method)
+    return frames
+
+
+"""Averages repeated frames streamed from files
+
+The frames are imported FRAME_CHUNK_SIZE at a time as they are, without normalizing,
+so memory stays constant however many frames there are.
+
+Parameters
+----------
+frames : String or list
+    A directory of frames, one frame file, or a list of frame files
+dark : FrameAccumulator, SpectralDistribution, ndarray, String, list or None
+    The dark frame, see FrameAccumulator. Files or directories of dark frames are
+    averaged first with the same arguments
+photometer : String or None
+    The format of the files, see import_spd
+method : String or None
+    The resampling method, see import_spd. With a method, the frames of each chunk
+    that share a wavelength grid are resampled with one product of a cached matrix
+recursive : bool
+    If True, also averages the frames in subdirectories
+include, exclude : String, list or None
+    Glob patterns selecting the frames in a directory, see iter_spectral_files
+chunk_size : int
+    The number of frames imported before each update
+
+Returns
+-------
+FrameAccumulator
+    The accumulated frames, see FrameAccumulator.average
+"""
+def accumulate_frames(frames, dark=None, photometer=None, method=None, recursive=False, include=None,
+                      exclude=None, chunk_size=FRAME_CHUNK_SIZE):
+    if chunk_size < 1:
+        raise ValueError('The chunk size must be at least 1, got {}'.format(chunk_size))
+    if isinstance(dark, (str, list, tuple)):
+        dark = accumulate_frames(dark, None, photometer, method, recursive, chunk_size=chunk_size)
+
+    if isinstance(frames, str) and os.path.isdir(frames):
+        paths = (join(frames, path) for path in iter_spectral_files(frames, recursive, include, exclude))
+    elif isinstance(frames, str):
+        paths = [frames]
+    else:
+        paths = frames
+
+    accumulator = FrameAccumulator(dark)
+    chunk = []
+    for path in paths:
+        chunk.append(path)
+        if len(chunk) == chunk_size:
+            accumulator.update(_import_frames(chunk, photometer, method))
+            chunk = []
+    if chunk:
+        accumulator.update(_import_frames(chunk, photometer, method))
+
+    if accumulator.count == 0:
+        raise ValueError('No frames found in {}'.format(frames))
+    return accumulator
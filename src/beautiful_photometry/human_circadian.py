@@ -4,10 +4,11 @@ Calculations related to the human circadian system
 import numpy as np
 from math import log10
 
-from .spectrum import get_reference_spectrum
-from .utils import round_output
+from .spectrum import get_reference_spectrum, reshape_wavelengths
+from .batch import SpectrumBatch, as_batch_values
+from .weighting import channel_response, channel_responses, get_weighting_matrix, PHOTOPIC, MELANOPIC
+from .utils import round_output, round_output_array
 from colour import SpectralDistribution
-from .human_visual import photopic_response, get_photopic_curve
 
 """
 Gets the melanopic sensitivity curve
@@ -19,6 +20,25 @@ def get_melanopic_curve():
     return spectrum['curve']
 
 
+"""
+Sums the Spectral G-Index terms over the reshape() grid
+
+@param ndarray values           The (N, W) spectral values on the reshape() grid
+
+@return tuple                   The (N,) numerators (sum from 380 to 500 nm) and (N,) denominators
+                                (sum from 380 to 780 nm weighted by the luminosity function)
+"""
+def _g_index_sums(values):
+    wavelengths = reshape_wavelengths()
+    blue = (wavelengths >= 380) & (wavelengths <= 500)
+    visible = (wavelengths >= 380) & (wavelengths <= 780)
+    photopic = get_weighting_matrix()[PHOTOPIC]
+
+    numer = values[:, blue].sum(axis=1)
+    denom = values[:, visible] @ photopic[visible]
+    return numer, denom
+
+
 """
 Computes the Spectral G-Index
 
@@ -30,20 +50,112 @@ Uses the equation found here: https://en.wikipedia.org/wiki/Spectral_G-index
 @return float                                   The Spectral G-Index
 """
 def spectral_g_index(spd):
-    photopic_spd = get_photopic_curve()
+    wavelengths = reshape_wavelengths()
+    if np.array_equal(spd.wavelengths, wavelengths):
+        values = spd.values
+    else:
+        # sample the SPD at the grid wavelengths in one interpolator call
+        values = spd[wavelengths]
+
+    numer, denom = _g_index_sums(values[np.newaxis, :])
+    return -2.5 * log10(numer[0] / denom[0])
+
+
+"""
+Computes the Spectral G-Index for a batch of light sources
+
+@param SpectrumBatch/list/ndarray spds          The spectral power distributions, see batch.as_batch_values
+
+@return ndarray                                 The Spectral G-Indices, NaN where the ratio is not positive
+"""
+def spectral_g_index_batch(spds):
+    numer, denom = _g_index_sums(as_batch_values(spds))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return -2.5 * np.log10(numer / denom)
+
+
+"""
+Calculates the melanopic response for a batch of light sources
+
+@param SpectrumBatch/list/ndarray spds          The spectral power distributions, see batch.as_batch_values
+@param bool toround [optional]                  Whether to round to output to a 1 decimal place
+@param ndarray responses [optional]             Precomputed weighting.channel_responses() of spds
+
+@return ndarray                                 The melanopic responses
+"""
+def melanopic_response_batch(spds, toround=True, responses=None):
+    if responses is None:
+        resp = channel_response(spds, MELANOPIC)
+    else:
+        resp = responses[:, MELANOPIC]
+    return round_output_array(resp, toround, 1)
+
+
+"""
+Calculates the melanopic ratio for a batch of light sources
 
-    # numerator: sum spectral values from 380 to 500 nm
-    numer = 0.0
-    for i in range(380,501):
-        numer += spd[i] 
+@param SpectrumBatch/list/ndarray spds          The spectral power distributions, see batch.as_batch_values
+@param bool toround [optional]                  Whether to round to output to 2 decimal places
+@param ndarray responses [optional]             Precomputed weighting.channel_responses() of spds
 
-    # demoninator: sum spectral values from 380 to 780 nm * the luminosity function
-    denom = 0.0
-    for i in range(380,781):
-        denom += spd[i] * photopic_spd[i]
+@return ndarray                                 The melanopic ratios
+"""
+def melanopic_ratio_batch(spds, toround=True, responses=None):
+    if responses is None:
+        responses = channel_responses(spds)
+    ratio = responses[:, MELANOPIC] / responses[:, PHOTOPIC] * 1.218
+    return round_output_array(ratio, toround)
 
-    # # perform the overall calculation
-    return -2.5 * log10(numer/denom)
+
+"""
+Calculates the M/P ratio for a batch of light sources
+
+@param SpectrumBatch/list/ndarray spds          The spectral power distributions, see batch.as_batch_values
+@param bool toround [optional]                  Whether to round to output to 2 decimal places
+@param ndarray responses [optional]             Precomputed weighting.channel_responses() of spds
+
+@return ndarray                                 The M/P ratios
+"""
+def melanopic_photopic_ratio_batch(spds, toround=True, responses=None):
+    if responses is None:
+        responses = channel_responses(spds)
+    ratio = responses[:, MELANOPIC] / responses[:, PHOTOPIC]
+    return round_output_array(ratio, toround)
+
+
+"""
+Calculates melanopic lumens for a batch of light sources
+
+@param SpectrumBatch/list/ndarray spds          The spectral power distributions, see batch.as_batch_values
+@param array_like lumens                        The lumens of each light source, with the light sources
+                                                along the first axis (e.g. (N, D) for D dimming levels)
+@param bool toround [optional]                  Whether to round to output to whole numbers
+
+@return ndarray                                 The melanopic lumens results, shaped as lumens
+"""
+def melanopic_lumens_batch(spds, lumens, toround=True):
+    return _melanopic_lumens(melanopic_ratio_batch(spds, False), lumens, toround, True)
+
+
+"""
+Multiplies melanopic ratios by lumens
+
+@param ndarray mel_ratio            The melanopic ratios
+@param array_like lumens            The lumens
+@param bool toround                 Whether to round to whole numbers
+@param bool per_source              Whether mel_ratio holds one ratio per light source, to be aligned
+                                    with the first axis of lumens. Otherwise the two broadcast as usual
+
+@return ndarray/int/float           The melanopic lumens, as a scalar if both inputs are scalars
+"""
+def _melanopic_lumens(mel_ratio, lumens, toround, per_source=False):
+    mel_ratio = np.asarray(mel_ratio, dtype=float)
+    lumens = np.asarray(lumens, dtype=float)
+    if per_source and lumens.ndim > 1:
+        mel_ratio = mel_ratio.reshape(mel_ratio.shape + (1,) * (lumens.ndim - 1))
+
+    mel_lumens = round_output_array(mel_ratio * lumens, toround, digits=None)
+    return mel_lumens.item() if mel_lumens.ndim == 0 else mel_lumens
 
 
 """
@@ -55,9 +167,7 @@ Calculates the melanopic response (used to compute melanopic ratio) for a given
 @return float                                   The melanopic response
 """
 def melanopic_response(spd, toround=True):
-    melanopic_spd = get_melanopic_curve()
-    resp = np.sum(np.multiply(melanopic_spd.values, spd.values))
-    return round_output(resp, toround, 1)
+    return round_output(melanopic_response_batch(spd, False)[0], toround, 1)
 
 
 """
@@ -69,7 +179,7 @@ Calculates the melanopic ratio for a given light source
 @return float                                   The melanopic ratio
 """
 def melanopic_ratio(spd, toround=True):
-    return round_output(melanopic_response(spd, False) / photopic_response(spd, False) * 1.218, toround)
+    return round_output(melanopic_ratio_batch(spd, False)[0], toround)
 
 
 """
@@ -81,26 +191,33 @@ Calculates the M/P ratio for a given light source
 @return float                                   The M/P ratio
 """
 def melanopic_photopic_ratio(spd, toround=True):
-    return round_output(melanopic_response(spd, False) / photopic_response(spd, False), toround)
+    return round_output(melanopic_photopic_ratio_batch(spd, False)[0], toround)
 
 
 """
-Calculates melanopic lumens for a given light source
+Calculates melanopic lumens for one or more light sources
 
-@param SpectralDistribution/float input    If SPD, calculates the melanopic ratio. 
-                                                If float, assumes the melanopic ratio is already provided.
-@param int/float lumens                         The lumens of the light source
-@param bool toround [optional]                  Whether to round to output to a whole number
+Ratios and lumens broadcast as NumPy arrays do. The ratios of a batch of SPDs are
+aligned with the first axis of lumens, so (N,) SPDs with (N, D) lumens at D dimming
+levels give (N, D) results.
 
-@return int/float                               The melanopic lumens result
+@param SpectralDistribution/SpectrumBatch/list/dict/float/array_like input
+                                                If SPDs, calculates their melanopic ratios.
+                                                If floats, assumes the melanopic ratios are already provided.
+@param int/float/array_like lumens              The lumens of the light sources
+@param bool toround [optional]                  Whether to round to output to whole numbers
+
+@return int/float/ndarray                       The melanopic lumens results, as a scalar if input is a
+                                                single SPD or ratio and lumens is a scalar
 """
 def melanopic_lumens(input, lumens, toround=True):
-    if type(input) == SpectralDistribution:
+    if isinstance(input, SpectralDistribution):
         # SPD given, calculate the melanopic ratio
-        mel_ratio = melanopic_ratio(input, toround=False)
-    else:
-        # Input is already the melanopic ratio
-        mel_ratio = input
-
-    return round_output(mel_ratio * lumens, toround, digits=None)
- 
\ No newline at end of file
+        return _melanopic_lumens(melanopic_ratio_batch(input, False)[0], lumens, toround)
+    if isinstance(input, (SpectrumBatch, dict)) or (
+            isinstance(input, (list, tuple)) and input and isinstance(input[0], SpectralDistribution)):
+        # SPDs given, calculate one melanopic ratio per SPD
+        return melanopic_lumens_batch(input, lumens, toround)
+
+    # Input is already the melanopic ratio(s)
+    return _melanopic_lumens(input, lumens, toround)
@@ -1,10 +1,9 @@
 """
 Calculations related to the human visual system, such as rods and cones
 """
-import numpy as np
-
 from .spectrum import get_reference_spectrum
-from .utils import round_output
+from .weighting import channel_response, channel_responses, PHOTOPIC, SCOTOPIC
+from .utils import round_output, round_output_array
 from colour import SpectralDistribution
 
 """
@@ -57,6 +56,56 @@ def get_s_cone_curve():
     return spectrum['curve']
 
 
+"""
+Calculates the visual/photopic response for a batch of light sources
+
+@param SpectrumBatch/list/ndarray spds          The spectral power distributions, see batch.as_batch_values
+@param bool toround [optional]                  Whether to round to output to a 1 decimal place
+@param ndarray responses [optional]             Precomputed weighting.channel_responses() of spds
+
+@return ndarray                                 The photopic responses
+"""
+def photopic_response_batch(spds, toround=True, responses=None):
+    if responses is None:
+        resp = channel_response(spds, PHOTOPIC)
+    else:
+        resp = responses[:, PHOTOPIC]
+    return round_output_array(resp, toround, 1)
+
+
+"""
+Calculates the scotopic (low-light visual) response for a batch of light sources
+
+@param SpectrumBatch/list/ndarray spds          The spectral power distributions, see batch.as_batch_values
+@param bool toround [optional]                  Whether to round to output to a 1 decimal place
+@param ndarray responses [optional]             Precomputed weighting.channel_responses() of spds
+
+@return ndarray                                 The scotopic responses
+"""
+def scotopic_response_batch(spds, toround=True, responses=None):
+    if responses is None:
+        resp = channel_response(spds, SCOTOPIC)
+    else:
+        resp = responses[:, SCOTOPIC]
+    return round_output_array(resp, toround, 1)
+
+
+"""
+Calculates the S/P ratio for a batch of light sources
+
+@param SpectrumBatch/list/ndarray spds          The spectral power distributions, see batch.as_batch_values
+@param bool toround [optional]                  Whether to round to output to 2 decimal places
+@param ndarray responses [optional]             Precomputed weighting.channel_responses() of spds
+
+@return ndarray                                 The S/P ratios
+"""
+def scotopic_photopic_ratio_batch(spds, toround=True, responses=None):
+    if responses is None:
+        responses = channel_responses(spds)
+    ratio = responses[:, SCOTOPIC] / responses[:, PHOTOPIC]
+    return round_output_array(ratio, toround)
+
+
 """
 Calculates the visual/photopic response for a given light source
 
@@ -66,9 +115,7 @@ Calculates the visual/photopic response for a given light source
 @return float                                   The photopic response
 """
 def photopic_response(spd, toround=True):
-    photopic_spd = get_photopic_curve()
-    resp = np.sum(np.multiply(photopic_spd.values, spd.values))
-    return round_output(resp, toround, 1)
+    return round_output(photopic_response_batch(spd, False)[0], toround, 1)
 
 
 """
@@ -80,9 +127,7 @@ Calculates the scotopic (low-light visual) response for a given light source
 @return float                                   The scotopic response
 """
 def scotopic_response(spd, toround=True):
-    scotopic_spd = get_scotopic_curve()
-    resp = np.sum(np.multiply(scotopic_spd.values, spd.values))
-    return round_output(resp, toround, 1)
+    return round_output(scotopic_response_batch(spd, False)[0], toround, 1)
 
 
 """
@@ -94,4 +139,4 @@ Calculates the S/P ratio for a given light source
 @return float                                   The S/P ratio
 """
 def scotopic_photopic_ratio(spd, toround=True):
-    return round_output(scotopic_response(spd, False) / photopic_response(spd, False), toround)
+    return round_output(scotopic_photopic_ratio_batch(spd, False)[0], toround)
@@ -0,0 +1,201 @@
+"""
+Single-pass computation of the metrics reported by the front ends
+
+compute_all_metrics evaluates only the requested metrics, sharing intermediate
+results between them (e.g. one weighting-matrix product serves every ratio), and
+returns a structured NumPy array with one record per SPD:
+
+    results = compute_all_metrics(spds, ['melanopic_ratio', 'scotopic_photopic_ratio'])
+    results['melanopic_ratio']          # (N,) column
+    metrics_to_dicts(results)           # JSON-ready rows
+
+Metrics are looked up by name in METRICS, and new ones are added with register_metric.
+"""
+import numpy as np
+from colour import SpectralDistribution
+
+from .alpha_opic import ALPHA_OPIC_CHANNELS, alpha_opic_batch
+from .batch import SpectrumBatch
+from .chromaticity import cct_duv_batch
+from .cri import R_VALUES, cri_batch
+from .human_circadian import (
+    melanopic_ratio_batch,
+    melanopic_response_batch,
+    melanopic_photopic_ratio_batch,
+    spectral_g_index_batch,
+)
+from .human_visual import (
+    photopic_response_batch,
+    scotopic_response_batch,
+    scotopic_photopic_ratio_batch,
+)
+from .tm30 import tm30_batch
+from .utils import round_output_array
+from .weighting import channel_responses
+
+# name: (function, digits). See register_metric
+METRICS = {}
+
+# The metrics reported by the CLI and web front ends, in display order
+DEFAULT_METRICS = (
+    'melanopic_ratio',
+    'melanopic_response',
+    'scotopic_photopic_ratio',
+    'melanopic_photopic_ratio',
+    'cct',
+    'duv',
+)
+
+
+"""
+The inputs shared by the metric functions of one compute_all_metrics call
+
+Intermediate results are computed on first use and reused by every later metric.
+
+Parameters
+----------
+values : ndarray
+    The (N, W) spectral values on the reshape() grid
+"""
+class MetricContext:
+    __slots__ = ('values', 'cache')
+
+    def __init__(self, values):
+        self.values = values
+        self.cache = {}
+
+    """
+    Gets a shared intermediate result
+
+    @param str key                  The name of the result
+    @param callable compute         Computes the result from the (N, W) values, if not yet cached
+
+    @return                         The result
+    """
+    def shared(self, key, compute):
+        if key not in self.cache:
+            self.cache[key] = compute(self.values)
+        return self.cache[key]
+
+    @property
+    def responses(self):
+        return self.shared('responses', channel_responses)
+
+
+"""
+Adds a metric to METRICS
+
+@param str name                 The name of the metric, and of its result field
+@param callable function        Called as function(values, context) with the (N, W) values and the
+                                MetricContext, and returns the (N,) unrounded results
+@param int digits [optional]    The number of digits to round to. Set digits=None to round to whole numbers
+"""
+def register_metric(name, function, digits=2):
+    METRICS[name] = (function, digits)
+
+
+register_metric('melanopic_response',
+                lambda values, context: melanopic_response_batch(values, False, context.responses), 1)
+register_metric('melanopic_ratio',
+                lambda values, context: melanopic_ratio_batch(values, False, context.responses))
+register_metric('melanopic_photopic_ratio',
+                lambda values, context: melanopic_photopic_ratio_batch(values, False, context.responses))
+register_metric('photopic_response',
+                lambda values, context: photopic_response_batch(values, False, context.responses), 1)
+register_metric('scotopic_response',
+                lambda values, context: scotopic_response_batch(values, False, context.responses), 1)
+register_metric('scotopic_photopic_ratio',
+                lambda values, context: scotopic_photopic_ratio_batch(values, False, context.responses))
+register_metric('spectral_g_index',
+                lambda values, context: spectral_g_index_batch(values))
+# CCT is rounded to 0 digits rather than to an int, so that undefined CCTs stay NaN
+register_metric('cct', lambda values, context: context.shared('cct_duv', cct_duv_batch)[0], 0)
+register_metric('duv', lambda values, context: context.shared('cct_duv', cct_duv_batch)[1], 4)
+
+
+"""
+Registers a column of alpha_opic_batch, which is computed once for all alpha-opic metrics
+"""
+def _register_alpha_opic_metric(field, digits):
+    register_metric(field, lambda values, context: context.shared('alpha_opic', alpha_opic_batch)[field],
+                    digits)
+
+
+_register_alpha_opic_metric('illuminance', 1)
+for channel in ALPHA_OPIC_CHANNELS:
+    _register_alpha_opic_metric(channel + '_irradiance', 4)
+    _register_alpha_opic_metric(channel + '_edi', 1)
+    _register_alpha_opic_metric(channel + '_der', 4)
+
+
+"""
+Registers a column of cri_batch as cri_<field>, e.g. cri_ra, which is computed once for all CRI metrics
+"""
+def _register_cri_metric(field):
+    register_metric('cri_' + field.lower(), lambda values, context: context.shared('cri', cri_batch)[field])
+
+
+for field in ('Ra',) + R_VALUES:
+    _register_cri_metric(field)
+
+register_metric('tm30_rf', lambda values, context: context.shared('tm30', tm30_batch)['Rf'])
+register_metric('tm30_rg', lambda values, context: context.shared('tm30', tm30_batch)['Rg'])
+
+
+"""Computes metrics for one or more SPDs in a single pass
+
+Parameters
+----------
+spds : SpectrumBatch, SpectralDistribution, list or dict
+    The SPDs. SpectralDistributions that are not on the reshape() grid are reshaped
+metrics : list or None
+    The names of the metrics to compute, from METRICS. If None, DEFAULT_METRICS
+toround : bool
+    Whether to round each metric as its single-SPD function does
+
+Returns
+-------
+ndarray
+    A structured array with one record per SPD: a 'name' field, then one float field per
+    metric in the requested order (int for metrics rounded to whole numbers)
+"""
+def compute_all_metrics(spds, metrics=None, toround=True):
+    metrics = list(DEFAULT_METRICS if metrics is None else metrics)
+    unknown = [name for name in metrics if name not in METRICS]
+    if unknown:
+        raise ValueError('Unknown metrics: {}. Available metrics are: {}'.format(
+            ', '.join(unknown), ', '.join(METRICS)))
+
+    if not isinstance(spds, SpectrumBatch):
+        if isinstance(spds, SpectralDistribution):
+            spds = [spds]
+        spds = SpectrumBatch.from_spds(spds)
+
+    dtype = [('name', 'U{}'.format(max([1] + [len(name) for name in spds.names])))]
+    for name in metrics:
+        digits = METRICS[name][1]
+        dtype.append((name, int if toround and digits is None else float))
+
+    results = np.empty(len(spds), dtype=dtype)
+    results['name'] = spds.names
+
+    context = MetricContext(spds.values)
+    for name in metrics:
+        function, digits = METRICS[name]
+        results[name] = round_output_array(function(spds.values, context), toround, digits)
+
+    return results
+
+
+"""
+Converts the results of compute_all_metrics to a list of dicts of Python scalars
+
+@param ndarray results          The structured array from compute_all_metrics
+
+@return list                    One dict per SPD, keyed by field name in field order, with
+                                undefined (NaN) results as None
+"""
+def metrics_to_dicts(results):
+    fields = results.dtype.names
+    return [{field: None if value != value else value for field, value in zip(fields, row)}
+            for row in results.tolist()]
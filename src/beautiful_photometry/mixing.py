@@ -0,0 +1,193 @@
+"""
+Linear mixing of the channels of a tunable light source
+
+The SPD of a mix is the drive-level-weighted sum of the channel SPDs, and every
+response below is linear in the SPD, so the responses of a mix are the same weighted
+sum of the channel responses:
+
+    responses = drive_levels @ channel_responses      # (N, C) @ (C, 7)
+
+A ChannelMixer computes the channel responses and tristimulus values once, and then
+evaluates the photopic, scotopic and melanopic metrics and the chromaticity, CCT and
+Duv of any number of drive-level combinations without building the mixed spectra:
+
+    mixer = ChannelMixer(import_spd_batch('path/to/channel_csvs'))
+    table = mixer.evaluate(drive_level_grid(len(mixer), 11))
+"""
+import numpy as np
+
+from .batch import SpectrumBatch
+from .chromaticity import XYZ_batch, XYZ_to_uv, XYZ_to_xy, uv_to_cct_duv
+from .human_circadian import (
+    melanopic_ratio_batch,
+    melanopic_response_batch,
+    melanopic_photopic_ratio_batch,
+)
+from .human_visual import (
+    photopic_response_batch,
+    scotopic_response_batch,
+    scotopic_photopic_ratio_batch,
+)
+from .utils import round_output_array
+from .weighting import channel_responses
+
+# The fields of ChannelMixer.evaluate, with the digits they are rounded to
+MIX_FIELDS = (
+    ('photopic_response', 1),
+    ('scotopic_response', 1),
+    ('melanopic_response', 1),
+    ('melanopic_ratio', 2),
+    ('melanopic_photopic_ratio', 2),
+    ('scotopic_photopic_ratio', 2),
+    ('x', 4),
+    ('y', 4),
+    ('cct', 0),
+    ('duv', 4),
+)
+
+# The number of mixes evaluated at once, which keeps the working arrays in cache
+CHUNK_SIZE = 32768
+
+
+"""
+The channels of a tunable light source, with their responses precomputed
+
+Parameters
+----------
+channels : SpectrumBatch, list, dict or ndarray
+    The SPD of each channel at full drive. SpectralDistributions that are not on the
+    reshape() grid are reshaped; arrays must already be on the grid
+names : list or None
+    The channel names. If None, the names of the SPDs
+"""
+class ChannelMixer:
+
+    def __init__(self, channels, names=None):
+        if not isinstance(channels, SpectrumBatch):
+            if isinstance(channels, np.ndarray):
+                channels = SpectrumBatch(channels)
+            else:
+                channels = SpectrumBatch.from_spds(channels)
+
+        self.channels = channels
+        self.names = list(channels.names if names is None else names)
+        if len(self.names) != len(channels):
+            raise ValueError('Got {} names for {} channels'.format(len(self.names), len(channels)))
+
+        self.responses = channel_responses(channels)
+        self.XYZ = XYZ_batch(channels)
+
+    def __len__(self):
+        return len(self.channels)
+
+    """
+    Checks and shapes drive levels
+
+    @param array_like drive_levels      The (N, C) or (C,) drive levels
+
+    @return ndarray                     The (N, C) drive levels
+    """
+    def _drive_levels(self, drive_levels):
+        drive_levels = np.atleast_2d(np.asarray(drive_levels, dtype=float))
+        if drive_levels.ndim != 2 or drive_levels.shape[1] != len(self):
+            raise ValueError('Drive levels must have shape (N, {}), got {}'.format(
+                len(self), drive_levels.shape))
+        return drive_levels
+
+    """
+    Builds the SPDs of mixes. Only needed to plot or export mixes; evaluate() does not use them
+
+    @param array_like drive_levels      The (N, C) or (C,) drive levels, as fractions of full drive
+
+    @return SpectrumBatch               The N mixed SPDs
+    """
+    def mix(self, drive_levels):
+        drive_levels = self._drive_levels(drive_levels)
+        return SpectrumBatch(drive_levels @ self.channels.values, self.channels.wavelengths)
+
+    """
+    Calculates the channel responses of mixes
+
+    @param array_like drive_levels      The (N, C) or (C,) drive levels, as fractions of full drive
+
+    @return ndarray                     The (N, 7) responses, with columns ordered as weighting.CHANNELS
+    """
+    def mix_responses(self, drive_levels):
+        return self._drive_levels(drive_levels) @ self.responses
+
+    """
+    Calculates the CIE 1931 tristimulus values of mixes
+
+    @param array_like drive_levels      The (N, C) or (C,) drive levels, as fractions of full drive
+
+    @return ndarray                     The (N, 3) XYZ
+    """
+    def mix_XYZ(self, drive_levels):
+        return self._drive_levels(drive_levels) @ self.XYZ
+
+    """Evaluates the metrics of mixes
+
+    Parameters
+    ----------
+    drive_levels : array_like
+        The (N, C) or (C,) drive levels, as fractions of full drive
+    toround : bool
+        Whether to round each metric as its single-SPD function does
+
+    Returns
+    -------
+    ndarray
+        A structured array with one record per mix and the fields of MIX_FIELDS. Mixes
+        that are off (all zero) give NaN ratios and chromaticities
+    """
+    def evaluate(self, drive_levels, toround=False):
+        drive_levels = self._drive_levels(drive_levels)
+        results = np.empty(len(drive_levels), dtype=[(field, float) for field, _ in MIX_FIELDS])
+
+        for start in range(0, len(drive_levels), CHUNK_SIZE):
+            columns = self._evaluate_chunk(drive_levels[start:start + CHUNK_SIZE])
+            for field, digits in MIX_FIELDS:
+                results[field][start:start + CHUNK_SIZE] = round_output_array(columns[field], toround, digits)
+
+        return results
+
+    """
+    Evaluates the metrics of a chunk of mixes, see evaluate()
+
+    @param ndarray drive_levels         The (N, C) drive levels
+
+    @return dict                        The (N,) unrounded results, keyed by the fields of MIX_FIELDS
+    """
+    def _evaluate_chunk(self, drive_levels):
+        responses = drive_levels @ self.responses
+        XYZ = drive_levels @ self.XYZ
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            columns = {
+                'photopic_response': photopic_response_batch(None, False, responses),
+                'scotopic_response': scotopic_response_batch(None, False, responses),
+                'melanopic_response': melanopic_response_batch(None, False, responses),
+                'melanopic_ratio': melanopic_ratio_batch(None, False, responses),
+                'melanopic_photopic_ratio': melanopic_photopic_ratio_batch(None, False, responses),
+                'scotopic_photopic_ratio': scotopic_photopic_ratio_batch(None, False, responses),
+            }
+            xy = XYZ_to_xy(XYZ)
+        columns['x'], columns['y'] = xy[:, 0], xy[:, 1]
+        columns['cct'], columns['duv'] = uv_to_cct_duv(XYZ_to_uv(XYZ))
+
+        return columns
+
+
+"""
+Builds the full grid of drive-level combinations of a tunable light source
+
+@param int channels             The number of channels, C
+@param int levels [optional]    The number of evenly spaced drive levels per channel, from 0 to 1
+
+@return ndarray                 The (levels ** C, C) drive levels, with the last channel varying fastest
+"""
+def drive_level_grid(channels, levels=11):
+    if levels < 2:
+        raise ValueError('At least 2 drive levels are needed, got {}'.format(levels))
+    grids = np.meshgrid(*[np.linspace(0, 1, levels)] * channels, indexing='ij')
+    return np.stack(grids, axis=-1).reshape(-1, channels)
@@ -0,0 +1,259 @@
+"""
+Drive-level optimization for tunable light sources
+
+Finds the drive levels of a ChannelMixer that maximize (or minimize) the M/P ratio
+subject to:
+
+    * a target chromaticity, given as a CCT and Duv, to within a uv distance
+    * a minimum light output
+    * optionally, a minimum CRI Ra
+
+The search is a population-based local search: each iteration evaluates a whole
+population of drive-level candidates with one ChannelMixer.evaluate call (and one
+r_values_batch call for the candidates that meet every other constraint), keeps the
+best candidate, and narrows the population around it when it stops improving.
+
+optimize_schedule solves a sequence of targets, such as the CCTs of a day-long
+circadian schedule, starting the search for each point from the solution of the
+previous one. Neighbouring points have nearby solutions, so warm-started searches
+start narrow and converge in a few iterations.
+"""
+import numpy as np
+
+from .chromaticity import XYZ_to_uv, cct_duv_to_uv
+from .cri import GENERAL_SAMPLES, r_values_batch
+from .utils import round_output_array
+
+# The default maximum uv distance from the target chromaticity (about a 2-step MacAdam ellipse)
+UV_TOLERANCE = 0.002
+
+# The initial spread of the population around the start, as a fraction of full drive,
+# for cold and warm starts
+COLD_SPREAD = 0.5
+WARM_SPREAD = 0.05
+
+# The population spread is multiplied by SHRINK when an iteration does not improve
+# the best candidate by more than MIN_IMPROVEMENT, and the search stops once it is below MIN_SPREAD
+SHRINK = 0.5
+MIN_SPREAD = 1e-4
+MIN_IMPROVEMENT = 1e-4
+
+
+"""
+Scores drive-level candidates against the constraints of optimize_mix
+
+@param ChannelMixer mixer           The channels
+@param ndarray drive_levels         The (N, C) candidates
+@param ndarray target_uv            The (2,) target chromaticity
+@param dict constraints             The tolerance, min_lumens, channel_lumens and ra_min of optimize_mix
+
+@return tuple                       The (N,) M/P ratios, (N,) constraint violations (0 for feasible
+                                    candidates), (N,) light outputs and (N,) Ra (NaN where not computed)
+"""
+def _score_candidates(mixer, drive_levels, target_uv, constraints):
+    results = mixer.evaluate(drive_levels)
+    ratio = results['melanopic_photopic_ratio']
+
+    if constraints['channel_lumens'] is None:
+        lumens = results['photopic_response']
+    else:
+        lumens = drive_levels @ constraints['channel_lumens']
+
+    with np.errstate(invalid='ignore'):
+        distance = np.linalg.norm(XYZ_to_uv(mixer.mix_XYZ(drive_levels)) - target_uv, axis=1)
+    violation = np.maximum(distance - constraints['tolerance'], 0) / constraints['tolerance']
+    if constraints['min_lumens']:
+        violation += np.maximum(constraints['min_lumens'] - lumens, 0) / constraints['min_lumens']
+    # lights that are off have no chromaticity
+    violation[~np.isfinite(violation)] = np.inf
+
+    # Ra needs the mixed spectra, so it is only computed for otherwise feasible candidates
+    ra = np.full(len(drive_levels), np.nan)
+    if constraints['ra_min'] is not None:
+        feasible = violation == 0
+        if feasible.any():
+            ra[feasible] = r_values_batch(mixer.mix(drive_levels[feasible]))[:, :GENERAL_SAMPLES].mean(axis=1)
+            violation[feasible] = np.maximum(constraints['ra_min'] - ra[feasible], 0) / constraints['ra_min']
+
+    return ratio, violation, lumens, ra
+
+
+"""
+Finds the best of a set of scored candidates
+
+Feasible candidates are ranked by the objective, and infeasible ones by their violation.
+
+@return int                         The index of the best candidate
+"""
+def _best_candidate(ratio, violation, maximize):
+    feasible = violation == 0
+    if feasible.any():
+        objective = np.where(feasible, ratio if maximize else -ratio, -np.inf)
+        return int(np.argmax(objective))
+    return int(np.argmin(violation))
+
+
+"""
+Checks whether a candidate score improves on the previous best by more than MIN_IMPROVEMENT
+
+@param tuple score                  The (violation, objective to minimize) of the new best
+@param tuple best_score             The same for the previous best
+
+@return bool                        Whether the search improved
+"""
+def _improved(score, best_score):
+    if best_score[0] > 0:
+        return score[0] < best_score[0] * (1 - MIN_IMPROVEMENT)
+    return score[1] < best_score[1] - MIN_IMPROVEMENT
+
+
+"""Finds the drive levels that maximize or minimize the M/P ratio for one target
+
+Parameters
+----------
+mixer : ChannelMixer
+    The channels of the light source
+cct : float
+    The target CCT, in K
+duv : float
+    The target Duv
+maximize : bool
+    Whether to maximize the M/P ratio. If False, minimizes it
+min_lumens : float or None
+    The minimum light output, in the units of channel_lumens
+channel_lumens : array_like or None
+    The (C,) light output of each channel at full drive. If None, the light output is
+    the photopic response of the mix, in the units of the channel SPDs
+ra_min : float or None
+    The minimum CRI Ra
+tolerance : float
+    The maximum uv distance from the target chromaticity
+start : array_like or None
+    The (C,) drive levels to start from, e.g. the solution for a neighbouring target.
+    If None, the search starts from the whole drive-level space
+population : int
+    The number of candidates evaluated per iteration
+iterations : int
+    The maximum number of iterations
+seed : int or None
+    The seed of the random candidates
+
+Returns
+-------
+dict
+    The 'drive_levels' (C,) of the best candidate, its 'melanopic_photopic_ratio',
+    'lumens' and 'ra' (NaN if ra_min is None), whether it is 'feasible', and the number of
+    'iterations' run
+"""
+def optimize_mix(mixer, cct, duv=0.0, maximize=True, min_lumens=None, channel_lumens=None, ra_min=None,
+                 tolerance=UV_TOLERANCE, start=None, population=128, iterations=50, seed=None):
+    if population < 2:
+        raise ValueError('The population must have at least 2 candidates, got {}'.format(population))
+
+    rng = np.random.default_rng(seed)
+    target_uv = cct_duv_to_uv(cct, duv)[0]
+    constraints = {
+        'tolerance': tolerance,
+        'min_lumens': min_lumens,
+        'channel_lumens': None if channel_lumens is None else np.asarray(channel_lumens, dtype=float),
+        'ra_min': ra_min,
+    }
+
+    if start is None:
+        best = np.full(len(mixer), 0.5)
+        spread = COLD_SPREAD
+    else:
+        best = np.clip(np.asarray(start, dtype=float), 0, 1)
+        spread = WARM_SPREAD
+
+    best_score = None
+    iteration = 0
+    while iteration < iterations and spread >= MIN_SPREAD:
+        iteration += 1
+        if start is None and iteration == 1:
+            candidates = rng.random((population, len(mixer)))
+        else:
+            candidates = np.clip(best + spread * rng.standard_normal((population, len(mixer))), 0, 1)
+        candidates[0] = best
+
+        ratio, violation, lumens, ra = _score_candidates(mixer, candidates, target_uv, constraints)
+        index = _best_candidate(ratio, violation, maximize)
+        score = (violation[index], -ratio[index] if maximize else ratio[index])
+
+        if best_score is not None and not _improved(score, best_score):
+            spread *= SHRINK
+        best = candidates[index]
+        best_score = score
+        best_result = (ratio[index], lumens[index], ra[index], violation[index] == 0)
+
+    return {
+        'drive_levels': best,
+        'melanopic_photopic_ratio': best_result[0],
+        'lumens': best_result[1],
+        'ra': best_result[2],
+        'feasible': bool(best_result[3]),
+        'iterations': iteration,
+    }
+
+
+"""Optimizes the drive levels for each point of a schedule of targets
+
+Each point is started from the solution of the previous one (or from scratch if that
+fails to meet the constraints), so points should be ordered so that neighbours have
+similar targets (e.g. by time of day).
+
+Parameters
+----------
+mixer : ChannelMixer
+    The channels of the light source
+cct : array_like
+    The (P,) target CCTs, in K
+duv : array_like
+    The (P,) target Duvs, or one Duv for every point
+min_lumens : array_like or None
+    The (P,) minimum light outputs, or one for every point
+toround : bool
+    Whether to round the M/P ratios to 2 decimal places, the lumens to 1 and Ra to 1
+**kwargs
+    The other arguments of optimize_mix, shared by every point
+
+Returns
+-------
+ndarray
+    A structured array with one record per point, with the fields 'cct', 'duv' (the
+    targets), 'drive_levels' (C,), 'melanopic_photopic_ratio', 'lumens', 'ra' and 'feasible'
+"""
+def optimize_schedule(mixer, cct, duv=0.0, min_lumens=None, toround=False, **kwargs):
+    cct = np.atleast_1d(np.asarray(cct, dtype=float))
+    duv = np.broadcast_to(np.asarray(duv, dtype=float), cct.shape)
+    lumens = np.broadcast_to(np.asarray(np.nan if min_lumens is None else min_lumens, dtype=float), cct.shape)
+
+    results = np.empty(len(cct), dtype=[
+        ('cct', float),
+        ('duv', float),
+        ('drive_levels', float, (len(mixer),)),
+        ('melanopic_photopic_ratio', float),
+        ('lumens', float),
+        ('ra', float),
+        ('feasible', bool),
+    ])
+    results['cct'] = cct
+    results['duv'] = duv
+
+    start = kwargs.pop('start', None)
+    for i in range(len(cct)):
+        point = dict(kwargs, min_lumens=None if np.isnan(lumens[i]) else lumens[i])
+        solution = optimize_mix(mixer, cct[i], duv[i], start=start, **point)
+        if start is not None and not solution['feasible']:
+            # the constraints may be met far from the previous solution
+            solution = optimize_mix(mixer, cct[i], duv[i], **point)
+
+        # only warm start from solutions that met the constraints
+        start = solution['drive_levels'] if solution['feasible'] else None
+        for field in ('drive_levels', 'melanopic_photopic_ratio', 'lumens', 'ra', 'feasible'):
+            results[field][i] = solution[field]
+
+    results['melanopic_photopic_ratio'] = round_output_array(results['melanopic_photopic_ratio'], toround)
+    results['lumens'] = round_output_array(results['lumens'], toround, 1)
+    results['ra'] = round_output_array(results['ra'], toround, 1)
+    return results
@@ -4,17 +4,193 @@ These functions handle data files from spectrophotometers for easy and direct im
 
 The functions are:
 
+    * uprtek_import - Imports the spectrum, R values and header of a UPRtek file in one pass
+    * uprtek_parse - Parses the text of a UPRtek file, e.g. an archive member
     * uprtek_import_spectrum - Imports the spectrum from a UPRtek spectrophotometer
     * uprtek_import_r_vals - Imports the R values generated by a UPRtek spectrophotometer
     * uprtek_file_import - Imports the UPRtek file and extracts the selected data
 """
 
-import csv
-import itertools
+from datetime import datetime
+
+import numpy as np
+
+# The format of the Time header field
+UPRTEK_TIME_FORMAT = '%Y/%m/%d_%H:%M:%S'
+
+# The R values reported by UPRtek meters
+UPRTEK_R_VALUES = tuple('R{}'.format(i) for i in range(1, 16))
+
+
+"""A measurement read from a UPRtek data file
+
+Parameters
+----------
+model : String
+    The meter model, e.g. 'CV600' or 'MK350NPLUS'
+header : dict
+    Every header field (all rows before the spectrum except the R values), keyed by
+    the label in the file. Numeric fields are floats, others strings
+wavelengths : ndarray
+    The (W,) wavelengths of the spectrum, in nm
+values : ndarray
+    The (W,) spectral values
+r_values : dict
+    The R values, e.g. {'R1': 98.887482, 'R2': 99.234245, ...}
+"""
+class UprtekMeasurement:
+
+    def __init__(self, model, header, wavelengths, values, r_values):
+        self.model = model
+        self.header = header
+        self.wavelengths = wavelengths
+        self.values = values
+        self.r_values = r_values
+
+    def __repr__(self):
+        return 'UprtekMeasurement({}, {}, {:g}-{:g} nm)'.format(
+            self.model, self.time, self.wavelengths[0], self.wavelengths[-1])
+
+    @property
+    def serial(self):
+        return self.header.get('Serial Number')
+
+    """
+    The time of the measurement, as a datetime, or None if missing or unparseable
+    """
+    @property
+    def time(self):
+        try:
+            return datetime.strptime(self.header['Time'], UPRTEK_TIME_FORMAT)
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    @property
+    def lux(self):
+        return self.header.get('LUX')
+
+    @property
+    def cct(self):
+        return self.header.get('CCT')
+
+    @property
+    def duv(self):
+        return self.header.get('Duv')
+
+    """
+    The integration time, in ms
+    """
+    @property
+    def integration_time(self):
+        return self.header.get('I-Time')
+
+    """
+    Gets the spectrum as a dictionary, as returned by uprtek_import_spectrum
+
+    @return dict            The intensities keyed by wavelength, e.g. {380: 0.048, 381: 0.051, ...}
+    """
+    def spectrum(self):
+        return dict(zip(self.wavelengths.astype(int).tolist(), self.values.tolist()))
+
+
+"""
+Parses a header value as a float where possible
+
+@param String value         The value
+
+@return float/String        The value
+"""
+def _parse_header_value(value):
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+"""
+Parses the spectrum block at the end of a UPRtek data file
+
+@param list lines           The lines of the block, e.g. '380nm\t17.028198'
+
+@return ndarray             The (W, 2) wavelengths and values
+"""
+def _parse_spectrum(lines):
+    fields = ' '.join(lines).replace('nm\t', ' ').split()
+    if len(fields) == 2 * len(lines):
+        return np.array(fields, dtype=float).reshape(-1, 2)
+
+    # extra columns: parse row by row
+    rows = [line.split('\t')[:2] for line in lines if line]
+    return np.array([(label[:-2], value) for label, value in rows], dtype=float)
+
+
+"""Imports the spectrum, R values and header of a UPRtek data file in a single pass
+
+Rows are identified by their labels rather than their positions, so the layouts of
+every model are read the same way: labels ending in 'nm' are spectral values, 'R1' to
+'R15' are R values, and everything else is a header field.
+
+Note: UPRtek names these files as .xls, but they are actually formatted as tab-delimited text files
+Note2: This has only been tested with the UPRtek CV600 and MK350N. Others may have a different file format
+
+Parameters
+----------
+filename : String
+    The filename to import
+
+Returns
+-------
+UprtekMeasurement
+    The measurement
+"""
+def uprtek_import(filename: str):
+    with open(filename, mode='r', encoding='us-ascii') as f:
+        return uprtek_parse(f.read(), filename)
+
+
+"""Parses the text of a UPRtek data file, see uprtek_import
+
+Parameters
+----------
+text : String
+    The contents of the file
+source : String
+    The name of the file, for error messages
+
+Returns
+-------
+UprtekMeasurement
+    The measurement
+"""
+def uprtek_parse(text: str, source='UPRtek data'):
+    lines = text.splitlines()
+
+    header = {}
+    r_values = {}
+    spectrum = []
+    for i, line in enumerate(lines):
+        label, _, value = line.partition('\t')
+        value = value.split('\t', 1)[0]
+        if label.endswith('nm') and label[:-2].isdigit():
+            spectrum = _parse_spectrum(lines[i:])
+            break
+        elif label in UPRTEK_R_VALUES:
+            r_values[label] = float(value)
+        elif label:
+            header[label] = _parse_header_value(value)
+
+    model = header.pop('Model Name', None)
+    if model is None:
+        raise ValueError('{} is not a UPRtek data file'.format(source))
+
+    spectrum = np.asarray(spectrum, dtype=float).reshape(-1, 2)
+    return UprtekMeasurement(model, header, spectrum[:, 0], spectrum[:, 1], r_values)
 
 
 """Imports a UPRtek data file and outputs a dictionary with the intensities for each wavelength
 
+This is a view of uprtek_import; use that to get the R values and header from the same read.
+
 Note: UPRtek names these files as .xls, but they are actually formatted as tab-delimited text files
 Note2: This has only been tested with the UPRtek CV600 and MK350N. Others may have a different file format
 
@@ -30,11 +206,13 @@ dict
                                     {380: 0.048, 381: 0.051, ...}
 """
 def uprtek_import_spectrum(filename: str):
-    return uprtek_file_import(filename, 'spd')
+    return uprtek_import(filename).spectrum()
 
 
 """Imports a UPRtek data file and outputs a dictionary with the R-Values
 
+This is a view of uprtek_import; use that to get the spectrum and header from the same read.
+
 Note: UPRtek names these files as .xls, but they are actually formatted as tab-delimited text files
 Note2: This has only been tested with the UPRtek CV600 and MK350N. Others may have a different file format
 
@@ -50,7 +228,7 @@ dict
                                     {'R1': 98.887482, 'R2': 99.234245, ...}
 """
 def uprtek_import_r_vals(filename: str):
-    return uprtek_file_import(filename, 'r_vals')
+    return uprtek_import(filename).r_values
 
 
 """Imports a UPRtek data file and outputs a dictionary with the selected data
@@ -71,37 +249,8 @@ dict
     A dictionary with the selected data
 """
 def uprtek_file_import(filename: str, returntype: dict):
-    with open(filename, mode='r', encoding='us-ascii') as csvFile:
-        reader = csv.reader(csvFile, delimiter='\t')
-
-        # Get UPRtek model from the first line, then set rows for reading data
-        model = next(reader)[1]
-        if model == 'CV600':
-            spd_start = 40
-            r_start = 18
-            r_end = 33
-        elif model == 'MK350NPLUS':
-            spd_start = 46
-            r_start = 26
-            r_end = 41
-        else:
-            print('UPRtek model not available. Using the MK350N format, which could result in errors!')
-            spd_start = 46
-            r_start = 26
-            r_end = 41
-
-        # Extract the data and return
-        if returntype == 'spd':
-            spd = {}
-            
-            for row in itertools.islice(reader, spd_start, None):
-                spd[int(row[0][0:3])] = float(row[1])
-
-            return spd
-        elif returntype == 'r_vals':
-            r_vals = {}
-
-            for row in itertools.islice(reader, r_start, r_end):
-                r_vals[row[0]] = float(row[1])
-
-            return r_vals
+    measurement = uprtek_import(filename)
+    if returntype == 'spd':
+        return measurement.spectrum()
+    elif returntype == 'r_vals':
+        return measurement.r_values
@@ -4,12 +4,16 @@ These functions deal with R-values
 
 The functions are:
 
+    * import_r_values - Imports the R values of a spectral data file
     * plot_r_values - Plots the specified R values in a bar graph
 """
 
 import matplotlib.pyplot as plt
 
+from .cri import cri_r_values
 from .photometer import uprtek_import_r_vals
+from .readers import detect_format
+from .spectrum import import_spd
 
 r_hex_colors = {
     'R1': '#e49da7',
@@ -37,18 +41,23 @@ filename : String
     The filename to import
 photometer : String or None
     If specified, imports a data file specific to that meter brand/model. Current options are: uprtek
+    If 'auto', the format is detected from the first bytes of the file, see readers.detect_format
     If None, file must be a CSV in the format [nm, intensity] with no header data
     
 Returns
 -------
 dict
-    A dict of the R Values
+    A dict of the R Values, as recorded by the meter for UPRtek files and computed from the
+    SPD (see cri.cri_r_values) otherwise
 """
 def import_r_values(filename, photometer=None):
+    if photometer == 'auto':
+        photometer = detect_format(filename)
+
     if photometer == 'uprtek':
         r_vals = uprtek_import_r_vals(filename)
     else:
-        print('R Values import not yet implemented!')
+        r_vals = cri_r_values(import_spd(filename, photometer=photometer))
 
     return r_vals
 
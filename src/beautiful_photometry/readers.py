@@ -0,0 +1,216 @@
+"""
+Registry of spectral data file readers
+
+Each format is registered with a sniffer, which recognizes the format from the first
+SNIFF_BYTES bytes of a file, a reader, which parses a whole file into arrays, and a
+parser, which does the same for the bytes of a file already in memory (e.g. an archive
+member):
+
+    read_spectrum('CSVs/shawn.xls', 'auto')        # (wavelengths, values)
+    parse_spectrum(data, 'auto')                    # the same, from bytes
+    detect_format('CSVs/incandescent.csv')          # 'csv'
+
+import_spd(..., photometer='auto') dispatches through detect_format, so directories of
+mixed formats are imported without trial parsing. New formats are added with
+register_reader; sniffers are tried in registration order, most specific first.
+"""
+import os
+
+from . import photometer, spectrum
+
+# name: (sniff, read, parse). See register_reader
+READERS = {}
+
+# The number of bytes passed to the sniffers
+SNIFF_BYTES = 512
+
+# The photometer names that select the plain CSV reader, as passed by the front ends
+CSV_ALIASES = (None, 'none')
+
+UTF8_BOM = b'\xef\xbb\xbf'
+
+
+"""
+Adds a format to READERS
+
+@param str name                 The name of the format, as passed to import_spd(photometer=...)
+@param callable sniff           Called as sniff(prefix) with the complete lines in the first SNIFF_BYTES
+                                bytes of a file (without any UTF-8 byte order mark), and returns
+                                whether the file is in this format
+@param callable read            Called as read(filename), and returns the (wavelengths, values) float
+                                ndarrays, with the wavelengths of the file, strictly increasing
+@param callable parse [optional]    Called as parse(data) with the bytes of a whole file, and returns
+                                    the same as read. If None, the format cannot be read from memory
+"""
+def register_reader(name, sniff, read, parse=None):
+    READERS[name] = (sniff, read, parse)
+
+
+"""
+Gets the first line of a prefix, decoded
+"""
+def _first_line(prefix):
+    return prefix.split(b'\n', 1)[0].rstrip(b'\r').decode('utf-8', 'replace')
+
+
+"""
+Checks whether any complete line of a prefix is a numeric row in a given delimiter, so
+that files with any number of header rows are recognized, as read_spectral_csv reads them
+"""
+def _sniff_delimited(prefix, delimiter):
+    return any(spectrum._is_spectral_row(line.decode('utf-8', 'replace'), delimiter)
+               for line in prefix.splitlines())
+
+
+"""
+Reads a delimited [nm, intensity] file, sorted by wavelength at full resolution
+"""
+def _read_delimited(filename, delimiter):
+    return spectrum.sort_wavelengths(*spectrum.read_spectral_csv(filename, delimiter))
+
+
+def _parse_delimited(data, delimiter):
+    return spectrum.sort_wavelengths(*spectrum.parse_spectral_csv(data.decode('utf-8-sig'), delimiter))
+
+
+def _read_uprtek(filename):
+    measurement = photometer.uprtek_import(filename)
+    return measurement.wavelengths, measurement.values
+
+
+def _parse_uprtek(data):
+    measurement = photometer.uprtek_parse(data.decode('us-ascii'))
+    return measurement.wavelengths, measurement.values
+
+
+register_reader('uprtek',
+                lambda prefix: _first_line(prefix).startswith('Model Name\t'),
+                _read_uprtek,
+                _parse_uprtek)
+register_reader('csv',
+                lambda prefix: _sniff_delimited(prefix, ','),
+                lambda filename: _read_delimited(filename, ','),
+                lambda data: _parse_delimited(data, ','))
+register_reader('tsv',
+                lambda prefix: _sniff_delimited(prefix, '\t'),
+                lambda filename: _read_delimited(filename, '\t'),
+                lambda data: _parse_delimited(data, '\t'))
+
+
+"""Detects the format of a spectral data file from its first bytes
+
+Parameters
+----------
+filename : String
+    The file to check
+
+Returns
+-------
+String
+    The name of the first format in READERS whose sniffer accepts the file
+
+Raises
+------
+ValueError
+    If no format accepts the file
+"""
+def detect_format(filename):
+    with open(filename, 'rb') as f:
+        # one more byte tells sniff_format whether the prefix is the whole file
+        return sniff_format(f.read(SNIFF_BYTES + 1), os.path.basename(filename))
+
+
+"""
+Detects the format of spectral data from its first bytes, see detect_format
+
+@param bytes prefix             The first bytes of the data. Only the first SNIFF_BYTES are used, and
+                                if there are more, the last line is dropped as it may be cut off
+@param str source [optional]    The name of the data, for error messages
+
+@return str                     The name of the format
+"""
+def sniff_format(prefix, source='data'):
+    if len(prefix) > SNIFF_BYTES:
+        prefix = prefix[:SNIFF_BYTES]
+        if b'\n' in prefix:
+            prefix = prefix[:prefix.rindex(b'\n') + 1]
+    if prefix.startswith(UTF8_BOM):
+        prefix = prefix[len(UTF8_BOM):]
+
+    for name, (sniff, _, _) in READERS.items():
+        if sniff(prefix):
+            return name
+    raise ValueError('Unrecognized spectral data format: {}'.format(source))
+
+
+"""
+Looks up the READERS entry selected by a photometer argument other than 'auto'
+"""
+def _reader(photometer):
+    if photometer in CSV_ALIASES:
+        photometer = 'csv'
+    try:
+        return READERS[photometer]
+    except KeyError:
+        raise ValueError('Unknown photometer {!r}, expected one of {}'.format(
+            photometer, ', '.join(['auto'] + list(READERS)))) from None
+
+
+"""Reads a spectral data file into arrays
+
+Parameters
+----------
+filename : String
+    The file to read
+photometer : String or None
+    The name of a format in READERS, 'auto' to detect it with detect_format, or None
+    (or 'none') for a [nm, intensity] CSV
+truncate : bool
+    Whether to keep only the samples at whole-nanometre wavelengths, as import_spd does
+    by default (see spectrum.truncate_wavelengths). If False, they are kept at full
+    resolution, as import_spd does with method='bin'
+
+Returns
+-------
+tuple
+    The (wavelengths, values) float ndarrays, with strictly increasing wavelengths
+"""
+def read_spectrum(filename, photometer=None, truncate=True):
+    if photometer == 'auto':
+        photometer = detect_format(filename)
+    return _truncated(_reader(photometer)[1](filename), truncate)
+
+
+"""
+Truncates the wavelengths of a read spectrum if asked to
+"""
+def _truncated(arrays, truncate):
+    return spectrum.truncate_wavelengths(*arrays) if truncate else arrays
+
+
+"""Parses the bytes of a spectral data file into arrays
+
+Parameters
+----------
+data : bytes
+    The contents of the file
+photometer : String or None
+    As for read_spectrum, with 'auto' sniffing the first bytes of data
+source : String
+    The name of the data, for error messages
+truncate : bool
+    As for read_spectrum
+
+Returns
+-------
+tuple
+    The (wavelengths, values) float ndarrays
+"""
+def parse_spectrum(data, photometer=None, source='data', truncate=True):
+    if photometer == 'auto':
+        photometer = sniff_format(data, source)
+
+    parse = _reader(photometer)[2]
+    if parse is None:
+        raise ValueError('The {} format can only be read from files'.format(photometer))
+    return _truncated(parse(data), truncate)
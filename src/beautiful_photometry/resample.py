@@ -0,0 +1,286 @@
+"""
+Resampling of spectral values with cached interpolation kernels
+
+reshape() extrapolates and interpolates every SPD with colour's general-purpose
+interpolators. Both steps are linear in the spectral values, so for a given source
+grid, target grid and method they reduce to a fixed (T, S) weight matrix. The
+matrix is computed once, cached, and applied to a whole batch as one product:
+
+    resampled = values @ matrix.T       # (N, S) -> (N, T)
+
+The methods are:
+
+    * colour - The weights of colour's own extrapolate() and interpolate() (Sprague
+      for uniform source grids, cubic spline otherwise, constant extrapolation).
+      Results match reshape() to within RESAMPLE_TOLERANCE
+    * linear - Piecewise-linear interpolation with constant extrapolation, the same
+      as np.interp. Cheaper to compile, and exact when the target wavelengths are a
+      subset of the source wavelengths (e.g. 1 nm UPRtek data onto the 1 nm grid)
+    * bin - Energy-conserving binning of full-resolution data, such as the 2048-4096
+      non-integer pixel wavelengths of an array spectrometer. Each sample stands for
+      the band between the midpoints to its neighbours, and each target value is the
+      mean over its own band of the samples overlapping it, weighted by the overlap.
+      The integral of the values (sum of value × bandwidth) is preserved wherever the
+      source covers the target, and the target is zero where it does not
+
+Each target band of the 'bin' method only overlaps a few samples, so its weights are
+kept as a sparse CSR matrix (see binning_matrix) of about S + T weights rather than
+T × S, and applied without forming the dense matrix.
+
+The functions are:
+
+    * resampling_matrix - Gets the cached (T, S) weight matrix for a pair of grids
+    * binning_matrix - Gets the cached sparse weights of the 'bin' method
+    * resample - Resamples a (S,) or (N, S) array of spectral values
+"""
+import functools
+
+import numpy as np
+from colour import MultiSpectralDistributions, SpectralShape
+
+RESAMPLE_METHODS = ('colour', 'linear', 'bin')
+
+# The methods that take wavelengths at full resolution, for which import_spd() keeps
+# the samples at fractional wavelengths
+FULL_RESOLUTION_METHODS = ('bin',)
+
+# The maximum absolute difference between the 'colour' method and reshape(), relative
+# to the largest absolute input value. The observed difference is ~1e-14, from the
+# order of floating-point operations only.
+RESAMPLE_TOLERANCE = 1e-9
+
+# The number of basis vectors pushed through colour at once when compiling a matrix
+BASIS_BLOCK_SIZE = 512
+
+# The number of SPDs binned at once, which bounds the (N, nnz) intermediate products
+BIN_BLOCK_SIZE = 128
+
+
+"""Gets the weight matrix that resamples spectral values from one grid to another
+
+The matrix is cached per (source grid, target grid, method), and is read-only.
+
+Parameters
+----------
+source_wavelengths : array_like
+    The S strictly increasing wavelengths of the input values
+target_wavelengths : array_like
+    The T wavelengths to resample to. For the 'colour' method these must form a
+    uniform grid, e.g. reshape_wavelengths()
+method : String
+    One of RESAMPLE_METHODS
+
+Returns
+-------
+ndarray
+    The (T, S) weight matrix
+"""
+def resampling_matrix(source_wavelengths, target_wavelengths, method='colour'):
+    if method not in RESAMPLE_METHODS:
+        raise ValueError('Unknown resampling method {!r}, expected one of {}'.format(
+            method, ', '.join(RESAMPLE_METHODS)))
+
+    return _resampling_matrix(*_grid_keys(source_wavelengths, target_wavelengths, method), method)
+
+
+"""
+Validates a pair of grids for a method and gets their cache keys
+"""
+def _grid_keys(source_wavelengths, target_wavelengths, method):
+    source = np.ascontiguousarray(source_wavelengths, dtype=float)
+    target = np.ascontiguousarray(target_wavelengths, dtype=float)
+    if source.ndim != 1 or target.ndim != 1 or len(source) == 0 or len(target) == 0:
+        raise ValueError('Wavelengths must be non-empty 1-D arrays')
+    if np.any(np.diff(source) <= 0):
+        raise ValueError('Source wavelengths must be strictly increasing')
+    if method == 'bin' and np.any(np.diff(target) <= 0):
+        raise ValueError('Target wavelengths must be strictly increasing for the bin method')
+
+    return source.tobytes(), target.tobytes()
+
+
+@functools.lru_cache(maxsize=32)
+def _resampling_matrix(source_key, target_key, method):
+    source = np.frombuffer(source_key, dtype=float)
+    target = np.frombuffer(target_key, dtype=float)
+
+    if method == 'linear':
+        matrix = _linear_matrix(source, target)
+    elif method == 'bin':
+        matrix = _dense_bins(_binning_matrix(source_key, target_key), len(source))
+    else:
+        matrix = _colour_matrix(source, target)
+
+    matrix = np.ascontiguousarray(matrix)
+    matrix.flags.writeable = False
+    return matrix
+
+
+"""
+Compiles the piecewise-linear weights, with two non-zero weights per target wavelength
+"""
+def _linear_matrix(source, target):
+    matrix = np.zeros((len(target), len(source)))
+    rows = np.arange(len(target))
+
+    if len(source) == 1:
+        matrix[:, 0] = 1.0
+        return matrix
+
+    left = np.clip(np.searchsorted(source, target, side='right') - 1, 0, len(source) - 2)
+    fraction = (target - source[left]) / (source[left + 1] - source[left])
+    fraction = np.clip(fraction, 0.0, 1.0)
+
+    matrix[rows, left] = 1.0 - fraction
+    matrix[rows, left + 1] += fraction
+    return matrix
+
+
+"""
+Compiles colour's extrapolate() + interpolate() weights by resampling the identity basis
+
+Column j of the matrix is the reshaped unit spectrum that is 1 at source wavelength j.
+"""
+def _colour_matrix(source, target):
+    interval = target[1] - target[0] if len(target) > 1 else 1.0
+    shape = SpectralShape(start=target[0], end=target[-1], interval=interval)
+
+    matrix = np.empty((len(target), len(source)))
+    for start in range(0, len(source), BASIS_BLOCK_SIZE):
+        stop = min(start + BASIS_BLOCK_SIZE, len(source))
+        basis = np.zeros((len(source), stop - start))
+        basis[np.arange(start, stop), np.arange(stop - start)] = 1.0
+
+        msd = MultiSpectralDistributions(basis, source)
+        msd = msd.extrapolate(shape)
+        msd = msd.interpolate(shape)
+        if not np.allclose(msd.wavelengths, target):
+            raise ValueError('Target wavelengths must be a uniform grid for the colour method')
+
+        matrix[:, start:stop] = msd.values
+
+    return matrix
+
+
+"""Gets the sparse weight matrix of the 'bin' method
+
+The matrix is cached per (source grid, target grid), and its arrays are read-only.
+Target row t has the weights data[indptr[t]:indptr[t + 1]] for the source columns
+indices[indptr[t]:indptr[t + 1]], as in scipy.sparse.csr_matrix.
+
+Parameters
+----------
+source_wavelengths : array_like
+    The S strictly increasing wavelengths of the input values, e.g. the pixel
+    wavelengths of a spectrometer calibration
+target_wavelengths : array_like
+    The T strictly increasing wavelengths to bin to, e.g. reshape_wavelengths()
+
+Returns
+-------
+tuple
+    The (data, indices, indptr) of the (T, S) matrix
+"""
+def binning_matrix(source_wavelengths, target_wavelengths):
+    return _binning_matrix(*_grid_keys(source_wavelengths, target_wavelengths, 'bin'))
+
+
+"""
+Gets the edges of the band that each wavelength stands for: the midpoints to its
+neighbours, and half a spacing beyond the ends (1 nm wide for a single wavelength)
+"""
+def _band_edges(wavelengths):
+    if len(wavelengths) == 1:
+        return wavelengths[0] + np.array([-0.5, 0.5])
+
+    midpoints = (wavelengths[1:] + wavelengths[:-1]) / 2
+    return np.concatenate([[2 * wavelengths[0] - midpoints[0]], midpoints, [2 * wavelengths[-1] - midpoints[-1]]])
+
+
+"""
+Compiles the overlap weights of the 'bin' method in CSR form, see the module docstring
+"""
+@functools.lru_cache(maxsize=32)
+def _binning_matrix(source_key, target_key):
+    source = _band_edges(np.frombuffer(source_key, dtype=float))
+    target = _band_edges(np.frombuffer(target_key, dtype=float))
+    low, high = target[:-1], target[1:]
+
+    # the source bands from first to stop - 1 overlap each target band
+    first = np.maximum(np.searchsorted(source, low, side='right') - 1, 0)
+    stop = np.minimum(np.searchsorted(source, high, side='left'), len(source) - 1)
+    counts = np.maximum(stop - first, 0)
+
+    indptr = np.concatenate([[0], np.cumsum(counts)])
+    rows = np.repeat(np.arange(len(low)), counts)
+    indices = first[rows] + np.arange(indptr[-1]) - indptr[rows]
+    overlap = np.minimum(high[rows], source[indices + 1]) - np.maximum(low[rows], source[indices])
+    data = np.maximum(overlap, 0) / (high - low)[rows]
+
+    for array in (data, indices, indptr):
+        array.flags.writeable = False
+    return data, indices, indptr
+
+
+"""
+Expands the CSR weights of the 'bin' method into a dense (T, S) matrix
+"""
+def _dense_bins(bins, columns):
+    data, indices, indptr = bins
+    matrix = np.zeros((len(indptr) - 1, columns))
+    matrix[np.repeat(np.arange(len(indptr) - 1), np.diff(indptr)), indices] = data
+    return matrix
+
+
+"""
+Applies the CSR weights of the 'bin' method to (N, S) values, BIN_BLOCK_SIZE rows at a time
+
+@return ndarray                 The (N, T) binned values
+"""
+def _apply_bins(values, bins):
+    data, indices, indptr = bins
+    binned = np.zeros((len(values), len(indptr) - 1))
+    # reduceat cannot sum empty segments, so rows without weights stay zero
+    filled = np.diff(indptr) > 0
+    starts = indptr[:-1][filled]
+    if not len(starts):
+        return binned
+
+    for start in range(0, len(values), BIN_BLOCK_SIZE):
+        rows = slice(start, start + BIN_BLOCK_SIZE)
+        products = values[rows, indices]
+        products *= data
+        binned[rows, filled] = np.add.reduceat(products, starts, axis=1)
+    return binned
+
+
+"""Resamples spectral values from one grid to another
+
+Parameters
+----------
+values : array_like
+    The (S,) values of one SPD, or (N, S) values of N SPDs sharing the source grid
+source_wavelengths : array_like
+    The S wavelengths of the values
+target_wavelengths : array_like
+    The T wavelengths to resample to
+method : String
+    One of RESAMPLE_METHODS
+
+Returns
+-------
+ndarray
+    The (T,) or (N, T) resampled values
+"""
+def resample(values, source_wavelengths, target_wavelengths, method='colour'):
+    values = np.asarray(values, dtype=float)
+    if values.shape[-1] != len(source_wavelengths):
+        raise ValueError('Got {} wavelengths for {} spectral values'.format(
+            len(source_wavelengths), values.shape[-1]))
+
+    if method == 'bin':
+        bins = binning_matrix(source_wavelengths, target_wavelengths)
+        binned = _apply_bins(values.reshape(-1, values.shape[-1]), bins)
+        return binned.reshape(values.shape[:-1] + binned.shape[-1:])
+
+    return values @ resampling_matrix(source_wavelengths, target_wavelengths, method).T
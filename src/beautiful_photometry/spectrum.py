@@ -2,16 +2,194 @@
 Tools for importing and processing Spectral Power Distributions
 """
 import csv
+import os
+import threading
+import warnings
+import numpy as np
 from colour import SpectralDistribution, SpectralShape
-from .photometer import uprtek_import_spectrum
-from os import listdir
-from os.path import isfile, join
+from . import readers
+from .archives import is_archive, iter_archive_members
+from .cache import (
+    load_reference_cache,
+    save_reference_cache,
+    resolve_cache_dir,
+    spd_cache_key,
+    load_spd_cache,
+    save_spd_cache,
+    evict_spd_cache,
+)
+from .resample import FULL_RESOLUTION_METHODS, resample
+from concurrent.futures import ProcessPoolExecutor
+from fnmatch import fnmatch
+from itertools import islice
+from os.path import join
 
 reference_spectra = []
 
+# The analysis grid every SPD is reshaped onto: [360,780] at 1 nm
+WAVELENGTH_MIN = 360
+WAVELENGTH_MAX = 780
+WAVELENGTH_INTERVAL = 1
+
+# The number of archive members read ahead of the workers, which bounds the memory of
+# import_spd_batch on archives
+ARCHIVE_WINDOW = 256
+
+
+"""Parses the text of a two-column [nm, intensity] spectral CSV into float arrays
+
+Header rows and malformed lines (too few columns, non-numeric fields) are tolerated:
+leading header rows are skipped and the rest is handed to NumPy's C parser in one
+call. Only text with bad rows in the middle of the data falls back to checking each
+line. Columns after the second are ignored.
+
+Parameters
+----------
+text : String
+    The CSV text
+delimiter : String
+    The column delimiter
+
+Returns
+-------
+tuple
+    The (wavelengths, intensities) as float ndarrays, in file order
+"""
+def parse_spectral_csv(text, delimiter=','):
+    lines = text.splitlines()
+
+    # skip any header rows
+    start = 0
+    while start < len(lines) and not _is_spectral_row(lines[start], delimiter):
+        start += 1
+    if start == len(lines):
+        return np.empty(0), np.empty(0)
+
+    try:
+        data = np.loadtxt(lines[start:], delimiter=delimiter, usecols=(0, 1), ndmin=2)
+    except ValueError:
+        # malformed lines within the data: check line by line
+        rows = [_parse_spectral_row(line, delimiter) for line in lines[start:]]
+        data = np.array([row for row in rows if row], dtype=float).reshape(-1, 2)
+
+    return data[:, 0].copy(), data[:, 1].copy()
+
+
+def _parse_spectral_row(line, delimiter):
+    parts = line.split(delimiter)
+    if len(parts) < 2:
+        return None
+    try:
+        return float(parts[0]), float(parts[1])
+    except ValueError:
+        return None
+
+
+def _is_spectral_row(line, delimiter):
+    return _parse_spectral_row(line, delimiter) is not None
+
+
+"""Reads a two-column [nm, intensity] spectral CSV file into float arrays
+
+Files are parsed straight from disk by NumPy's C parser, after skipping any header
+rows. Files with malformed lines within the data are handled by parse_spectral_csv.
+
+Fractional wavelengths are read as they are. import_spd drops them with
+truncate_wavelengths, as the original dict-based importer did, unless imported with
+method='bin'.
+
+Parameters
+----------
+filename : String
+    The filename to import
+delimiter : String
+    The column delimiter
+    
+Returns
+-------
+tuple
+    The (wavelengths, intensities) as float ndarrays, in file order
+"""
+def read_spectral_csv(filename, delimiter=','):
+    # count the header rows, if any
+    skiprows = 0
+    with open(filename, mode='r', encoding='utf-8-sig') as csvFile:
+        for line in csvFile:
+            if _is_spectral_row(line, delimiter):
+                break
+            skiprows += 1
+
+    try:
+        with warnings.catch_warnings():
+            # an empty file is not an error here
+            warnings.simplefilter('ignore', UserWarning)
+            data = np.loadtxt(filename, delimiter=delimiter, usecols=(0, 1), ndmin=2,
+                              skiprows=skiprows, encoding='utf-8-sig')
+    except ValueError:
+        with open(filename, mode='r', encoding='utf-8-sig') as csvFile:
+            return parse_spectral_csv(csvFile.read(), delimiter)
+
+    data = data.reshape(-1, 2)
+    return data[:, 0].copy(), data[:, 1].copy()
+
+
+"""Keeps only the samples at whole-nanometre wavelengths, as the dict-based importer did
+
+The original importer parsed each wavelength with int(), which rejected rows such as
+380.5, so those rows were skipped. The same samples are dropped here, rather than
+truncated onto the nanometre below, which would shift 0.5 nm data by half a step and
+overwrite the real sample at x with the one at x.5. Where several samples have the
+same wavelength the last one wins, as with repeated assignment into a dict.
+
+To use sub-nm data, import it with method='bin', which keeps the wavelengths at full
+resolution (see resample.binning_matrix).
+
+Parameters
+----------
+wavelengths : ndarray
+    The wavelengths
+values : ndarray
+    The intensities
+
+Returns
+-------
+tuple
+    The sorted, unique integer (wavelengths, intensities)
+"""
+def truncate_wavelengths(wavelengths, values):
+    whole = wavelengths == np.trunc(wavelengths)
+    return sort_wavelengths(wavelengths[whole], values[whole])
+
+
+"""Sorts spectral samples by wavelength, keeping full-resolution wavelengths
+
+Where several samples have exactly the same wavelength the last one wins, as in
+truncate_wavelengths.
+
+Parameters
+----------
+wavelengths : ndarray
+    The wavelengths, e.g. the non-integer pixel wavelengths of an array spectrometer
+values : ndarray
+    The intensities
+
+Returns
+-------
+tuple
+    The (wavelengths, intensities), with strictly increasing wavelengths
+"""
+def sort_wavelengths(wavelengths, values):
+    _, last = np.unique(wavelengths[::-1], return_index=True)
+    index = len(wavelengths) - 1 - last
+    return wavelengths[index], values[index]
+
 
 """Imports a spectral CSV data file and outputs a dictionary with the intensities for each wavelength
 
+This is a compatibility wrapper around read_spectral_csv, which returns arrays. Rows
+with fractional wavelengths are skipped, see truncate_wavelengths; use
+read_spectral_csv to keep sub-nm wavelengths.
+
 Parameters
 ----------
 filename : String
@@ -24,17 +202,8 @@ dict
                                     {380: 0.048, 381: 0.051, ...}
 """
 def import_spectral_csv(filename):
-    spd = {}
-    with open(filename, mode='r', encoding='utf-8-sig') as csvFile:
-        reader = csv.reader(csvFile, delimiter=',')
-        for count, row in enumerate(reader):
-            if not row or len(row) < 2:
-                continue  # skip empty or malformed lines
-            try:
-                spd[int(row[0])] = float(row[1])
-            except Exception:
-                continue  # skip lines that can't be parsed
-    return spd
+    wavelengths, values = truncate_wavelengths(*read_spectral_csv(filename))
+    return dict(zip(wavelengths.astype(int).tolist(), values.tolist()))
 
 
 """
@@ -78,18 +247,34 @@ def create_colour_spd(spd_dict, spd_name):
 
 
 """
-Imports reference SPDs from the database
+Resolves a data file shipped inside the package, without touching the working directory
 
-@param string filename              CSV file that serves as the SPD database
+@param string filename              The file name, relative to the package. Absolute paths are returned as-is
+
+@return string                      The path to the file
 """
-def import_reference_spectra(filename='source_illuminants.csv'):
-    global reference_spectra
+def package_data_path(filename):
+    if os.path.isabs(filename):
+        return filename
+    try:
+        from importlib.resources import files
+    except ImportError:
+        # Python 3.8
+        return os.path.join(os.path.dirname(os.path.abspath(__file__)), filename)
+    return str(files(__package__).joinpath(filename))
 
-    import os
-    os.chdir(os.path.dirname(__file__))
-    # print(os.getcwd())
 
-    with open(filename, mode='r', encoding='utf-8-sig') as csvFile:
+"""
+Reads reference SPDs from the database
+
+@param string filename              CSV file that serves as the SPD database
+
+@return list                        The reference spectra, as dicts in file order
+"""
+def read_reference_spectra(filename='source_illuminants.csv'):
+    spectra = []
+
+    with open(package_data_path(filename), mode='r', encoding='utf-8-sig') as csvFile:
         reader = csv.reader(csvFile, delimiter=',')
 
         wavelengths = next(reader)[4:]
@@ -118,7 +303,149 @@ def import_reference_spectra(filename='source_illuminants.csv'):
             out_dict['description'] = description
             out_dict['normalized'] = True
             out_dict['weight'] = 1.0
-            reference_spectra.append(out_dict)
+            spectra.append(out_dict)
+
+    return spectra
+
+
+"""
+Reads reference SPDs from the database, using the compiled binary cache when it is up to date
+
+On a cache miss the CSV is parsed with read_reference_spectra() and the reshaped
+curves are written back to the cache (see cache.load_reference_cache).
+
+@param string filename              CSV file that serves as the SPD database
+@param bool cache [optional]        Whether to use the binary cache
+
+@return list                        The reference spectra, as dicts in file order
+"""
+def read_reference_spectra_cached(filename='source_illuminants.csv', cache=True):
+    path = package_data_path(filename)
+
+    arrays = load_reference_cache(path) if cache else None
+    if arrays is None:
+        spectra = read_reference_spectra(path)
+        if cache and spectra:
+            save_reference_cache(
+                path,
+                [spectrum['name'] for spectrum in spectra],
+                [spectrum['description'] for spectrum in spectra],
+                spectra[0]['curve'].wavelengths,
+                np.vstack([spectrum['curve'].values for spectrum in spectra]),
+            )
+        return spectra
+
+    spectra = []
+    for name, description, values in zip(arrays['names'], arrays['descriptions'], arrays['values']):
+        spectra.append({
+            'curve': SpectralDistribution(values, arrays['wavelengths'], name=str(description)),
+            'name': str(name),
+            'description': str(description),
+            'normalized': True,
+            'weight': 1.0,
+        })
+    return spectra
+
+
+"""
+A thread-safe registry of the reference spectra (such as CIE-A, L-Cone, PAR)
+
+The database is read once, under a lock, on first access. Spectra are indexed by
+name, and each entry also holds its reshaped values as a read-only NumPy array
+under the 'values' key, so that metric code can do an O(1) lookup with no
+filesystem access.
+
+Parameters
+----------
+filename : String
+    CSV file that serves as the SPD database, relative to the package
+cache : bool
+    If True, load the reshaped spectra from the compiled binary cache when it is up to date
+"""
+class ReferenceSpectrumRegistry:
+
+    def __init__(self, filename='source_illuminants.csv', cache=True):
+        self.filename = filename
+        self.cache = cache
+        self._lock = threading.Lock()
+        self._spectra = None
+        self._by_name = None
+
+    """
+    Loads the database, if it has not been loaded yet
+
+    @return list            The reference spectra, as dicts in file order
+    """
+    def load(self):
+        if self._spectra is None:
+            with self._lock:
+                if self._spectra is None:
+                    spectra = read_reference_spectra_cached(self.filename, self.cache)
+                    for spectrum in spectra:
+                        values = np.array(spectrum['curve'].values, dtype=float)
+                        values.flags.writeable = False
+                        spectrum['values'] = values
+                    self._by_name = {spectrum['name']: spectrum for spectrum in spectra}
+                    self._spectra = spectra
+        return self._spectra
+
+    """
+    Gets a reference spectrum by name
+
+    @param String name      The name of the spectrum
+
+    @return dict            The reference spectrum, or None if there is no such spectrum
+    """
+    def get(self, name):
+        if self._by_name is None:
+            self.load()
+        return self._by_name.get(name)
+
+    """
+    Gets the reshaped values of a reference spectrum
+
+    @param String name      The name of the spectrum
+
+    @return ndarray         The read-only spectral values on the reshape() grid
+    """
+    def values(self, name):
+        spectrum = self.get(name)
+        if spectrum is None:
+            raise KeyError('Unknown reference spectrum: {}'.format(name))
+        return spectrum['values']
+
+    def names(self):
+        return [spectrum['name'] for spectrum in self.load()]
+
+    def __contains__(self, name):
+        return self.get(name) is not None
+
+    def __iter__(self):
+        return iter(self.load())
+
+    def __len__(self):
+        return len(self.load())
+
+
+# The registry backing get_reference_spectrum()
+reference_registry = ReferenceSpectrumRegistry()
+
+
+"""
+Imports reference SPDs from the database into the module-level reference_spectra list
+
+Kept for backwards compatibility; new code should use reference_registry.
+
+@param string filename              CSV file that serves as the SPD database
+"""
+def import_reference_spectra(filename='source_illuminants.csv'):
+    if filename == reference_registry.filename:
+        spectra = reference_registry.load()
+    else:
+        spectra = read_reference_spectra(filename)
+
+    if not reference_spectra:
+        reference_spectra.extend(spectra)
 
 
 """
@@ -129,14 +456,7 @@ The getter for reference spectra (such as CIE-A, L-Cone, PAR)
 @return dict            The reference spectrum
 """
 def get_reference_spectrum(name):
-    # if not initialized, first import the spectra into memory
-    if not reference_spectra:
-        import_reference_spectra()
-    
-    # then find the spectrum
-    for spectrum in reference_spectra:
-        if spectrum['name'] == name:
-            return spectrum
+    return reference_registry.get(name)
 
 
 """
@@ -146,15 +466,36 @@ Reshapes the SPD by extending it to [360,780] and increasing the resolution to 1
 @param int min [optional]               The minimum wavelength to extend to
 @param int max [optional]               The maximum wavelength to extend to
 @param int interval [optional]          The nm interval to specify
+@param str method [optional]            If None, uses colour's extrapolate() and interpolate()
+                                        directly. Otherwise, one of resample.RESAMPLE_METHODS,
+                                        which applies a cached weight matrix for the SPD's grid
 
 @return SpectralDistribution       The reshaped SPD
 """
-def reshape(spd, min=360, max=780, interval=1):
+def reshape(spd, min=WAVELENGTH_MIN, max=WAVELENGTH_MAX, interval=WAVELENGTH_INTERVAL, method=None):
+    if method is not None:
+        wavelengths = reshape_wavelengths(min, max, interval)
+        values = resample(spd.values, spd.wavelengths, wavelengths, method)
+        return SpectralDistribution(values, wavelengths, name=spd.name)
+
     spd = spd.extrapolate(SpectralShape(start=min, end=max, interval=interval))
     spd = spd.interpolate(SpectralShape(start=min, end=max, interval=interval))
     return spd
 
 
+"""
+Gets the wavelengths of the grid produced by reshape()
+
+@param int min [optional]               The minimum wavelength of the grid
+@param int max [optional]               The maximum wavelength of the grid
+@param int interval [optional]          The nm interval of the grid
+
+@return ndarray                         The grid wavelengths, e.g. [360, 361, ..., 780]
+"""
+def reshape_wavelengths(min=WAVELENGTH_MIN, max=WAVELENGTH_MAX, interval=WAVELENGTH_INTERVAL):
+    return np.arange(min, max + interval, interval, dtype=float)
+
+
 """Imports a spectral data file and creates a named SPD usable by the Colour library
 
 Parameters
@@ -168,67 +509,408 @@ weight : float
 normalize : bool
     If True, normalize the spectrum to [0,1]
 photometer : String or None
-    If specified, imports a data file specific to that meter brand/model. Current options are: uprtek
+    If specified, imports a data file specific to that meter brand/model, or another format
+    in readers.READERS. Current options are: uprtek, tsv, csv
+    If 'auto', the format is detected from the first bytes of the file, see readers.detect_format
     If None, file must be a CSV in the format [nm, intensity] with no header data
+method : String or None
+    The resampling method passed to reshape(). 'colour' and 'linear' reuse a cached
+    weight matrix across files that share a wavelength grid. 'bin' keeps the
+    wavelengths of the file at full resolution, instead of dropping the samples at
+    fractional wavelengths, and bins them onto the grid conserving energy, which suits array
+    spectrometers with sub-nm pixels
+cache : bool or String
+    If True, the reshaped values are looked up in and saved to the on-disk SPD cache,
+    keyed by the file content and the import parameters. A String selects the cache
+    directory. See cache.default_cache_dir
     
 Returns
 -------
 SpectralDistribution
     The SPD as an object usable by the Colour library
 """
-def import_spd(filename, spd_name=None, weight=1.0, normalize=False, photometer=None):
-    if photometer == 'uprtek':
-        spd_dict = uprtek_import_spectrum(filename)
-    else:
-        spd_dict = import_spectral_csv(filename)
-
+def import_spd(filename, spd_name=None, weight=1.0, normalize=False, photometer=None, method=None,
+               cache=False):
     if not spd_name:
         spd_name = filename.split(".")[-2].split('/')[-1]
 
+    values, wavelengths, spd = _import_spd_values(filename, weight, normalize, photometer, method, cache)
+    if spd is None:
+        return SpectralDistribution(values, wavelengths, name=spd_name)
+
+    spd.name = spd_name
+    return spd
+
+
+"""
+Imports the reshaped values of a spectral data file, see import_spd
+
+Returns (values, wavelengths, spd), where spd is the reshaped SpectralDistribution, or
+None when the values came from the cache. Batch imports use the arrays directly, which
+saves constructing a SpectralDistribution for every cache hit.
+"""
+def _import_spd_values(filename, weight, normalize, photometer, method, cache):
+    cache_dir = resolve_cache_dir(cache)
+    if cache_dir is not None:
+        key = spd_cache_key(filename, weight=float(weight), normalize=bool(normalize),
+                            photometer=photometer, method=method,
+                            grid=(WAVELENGTH_MIN, WAVELENGTH_MAX, WAVELENGTH_INTERVAL))
+        wavelengths = reshape_wavelengths()
+        values = load_spd_cache(key, len(wavelengths), cache_dir)
+        if values is not None:
+            return values, wavelengths, None
+
+    spectrum = readers.read_spectrum(filename, photometer, method not in FULL_RESOLUTION_METHODS)
+    spd = _reshape_values(*spectrum, weight, normalize, method)
+
+    if cache_dir is not None:
+        save_spd_cache(key, spd.values, cache_dir)
+
+    return spd.values, spd.wavelengths, spd
+
+
+"""
+Weights, normalizes and reshapes imported spectral values, see import_spd
+
+@return SpectralDistribution        The reshaped SPD
+"""
+def _reshape_values(wavelengths, values, weight, normalize, method):
     if normalize:
-        spd_dict = normalize_spd(spd_dict)
+        values = values / values.max()
 
     if weight != 1.0:
-        spd_dict = weight_spd(spd_dict, weight)
+        values = values * weight
+
+    spd = SpectralDistribution(values, wavelengths)
+    return reshape(spd, method=method)
+
+
+"""Iterates over the spectral data files in a directory, lazily
+
+Hidden files and directories (starting with '.') are skipped. Patterns are matched
+with fnmatch against the path relative to the directory, with '/' separators, so
+'*.csv' matches CSVs at any depth and '2019_*/*' matches one campaign folder.
+
+Entries are visited depth-first in name order, so the order is deterministic, and
+only the listings of the directories on the current path are held in memory.
+
+Parameters
+----------
+directory : String
+    The directory to search
+recursive : bool
+    If True, also searches subdirectories
+include : String, list or None
+    If specified, only files matching at least one of these glob patterns are returned
+exclude : String, list or None
+    If specified, files matching any of these glob patterns are skipped
+
+Returns
+-------
+generator
+    The relative paths of the files
+"""
+def iter_spectral_files(directory, recursive=False, include=None, exclude=None):
+    include, exclude = _as_patterns(include), _as_patterns(exclude)
+
+    stack = [('', _sorted_entries(directory))]
+    while stack:
+        prefix, entries = stack[-1]
+        entry = next(entries, None)
+        if entry is None:
+            stack.pop()
+            continue
+
+        relative = prefix + entry.name
+        if entry.is_dir():
+            if recursive:
+                stack.append((relative + '/', _sorted_entries(entry.path)))
+            continue
+        if _is_selected(relative, include, exclude):
+            yield relative
+
+
+"""
+Checks a relative path against the include and exclude patterns of iter_spectral_files
+"""
+def _is_selected(relative, include, exclude):
+    if include and not any(fnmatch(relative, pattern) for pattern in include):
+        return False
+    return not (exclude and any(fnmatch(relative, pattern) for pattern in exclude))
+
+
+"""
+Gets a list of glob patterns from a pattern, a list of them or None
+"""
+def _as_patterns(patterns):
+    return [patterns] if isinstance(patterns, str) else patterns
+
+
+"""
+Lists the non-hidden entries of a directory in name order
+"""
+def _sorted_entries(path):
+    with os.scandir(path) as it:
+        entries = sorted((e for e in it if not e.name.startswith('.')), key=lambda e: e.name)
+    return iter(entries)
 
-    spd = create_colour_spd(spd_dict, spd_name)
-    spd = reshape(spd)
-    return spd
+
+"""Finds the spectral data files in a directory
+
+See iter_spectral_files for the parameters.
+
+Returns
+-------
+list
+    The relative paths of the files
+"""
+def find_spectral_files(directory, recursive=False, include=None, exclude=None):
+    return list(iter_spectral_files(directory, recursive, include, exclude))
+
+
+"""
+Imports one file of a batch, returning the exception instead of raising it
+
+This runs in the worker processes of import_spd_batch, so it returns plain arrays,
+which are cheaper to send back than a SpectralDistribution. Archive members are
+passed as their bytes, which are parsed from memory without the cache.
+"""
+def _import_spd_task(task):
+    filename, data, photometer, normalize, method, cache = task
+    try:
+        if data is None:
+            values, wavelengths, _ = _import_spd_values(filename, 1.0, normalize, photometer, method, cache)
+        else:
+            spectrum = readers.parse_spectrum(data, photometer, filename, method not in FULL_RESOLUTION_METHODS)
+            spd = _reshape_values(*spectrum, 1.0, normalize, method)
+            values, wavelengths = spd.values, spd.wavelengths
+    except Exception as e:
+        return e
+    return values, wavelengths
+
+
+"""
+Lists the import tasks of a batch lazily, as (relative path, task) tuples in file order
+
+directory may be a directory or an archive (see archives.is_archive), whose members
+are selected like the files of a directory and read one at a time.
+"""
+def _iter_import_tasks(directory, photometer, normalize, method, cache, recursive, include, exclude, paths=None):
+    if is_archive(directory):
+        include, exclude = _as_patterns(include), _as_patterns(exclude)
+
+        def select(name):
+            return (recursive or '/' not in name) and _is_selected(name, include, exclude)
+
+        for name, data in iter_archive_members(directory, select):
+            yield name, (name, data, photometer, normalize, method, cache)
+        return
+
+    if paths is None:
+        paths = iter_spectral_files(directory, recursive, include, exclude)
+    for path in paths:
+        yield path, (join(directory, path), None, photometer, normalize, method, cache)
+
+
+"""
+Imports files lazily, yielding (relative path, result of _import_spd_task) in file order
+
+With workers, at most `window` files are in flight at once, which bounds memory for
+arbitrarily long file iterators and archives.
+"""
+def _iter_import_results(tasks, workers, window):
+    if workers == 0:
+        workers = os.cpu_count() or 1
+
+    if workers is None or workers <= 1:
+        for path, task in tasks:
+            yield path, _import_spd_task(task)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while True:
+            block = list(islice(tasks, window))
+            if not block:
+                break
+            paths, block = zip(*block)
+            chunksize = max(1, len(block) // (workers * 8))
+            yield from zip(paths, executor.map(_import_spd_task, block, chunksize=chunksize))
+
+
+"""
+Gets the name of a batch-imported SPD: the file name, or the relative path when recursive,
+minus the extension
+"""
+def _batch_spd_name(path, recursive):
+    return os.path.splitext(path if recursive else os.path.basename(path))[0]
 
 
 """Imports an entire directory of SPD files to a dictionary
 
-Note: for now, this only works in the top level of the directory
-Note: All SPDs will be normalized, and the SPD name will match the file name minus the extension
+Note: SPDs are normalized unless normalize is False, and the SPD name will match the file name minus the extension
+(or the relative path minus the extension, when recursive)
 Note: the data format should be the same for all files in the directory
+Note: files that fail to import are skipped, and reported in errors
+Note: every SPD is held in memory. For large directories, see iter_spds and iter_spd_chunks
+Note: archives are read member by member, with at most ARCHIVE_WINDOW members in flight
 
 Parameters
 ----------
 directory : String
-    The directory to import
+    The directory to import, or a .zip, .tar, .tar.gz or .tgz archive to import without
+    extracting it (see archives.iter_archive_members)
 photometer : String or None
     If specified, imports a data file specific to that meter brand/model. Current options are: uprtek
+    If 'auto', the format of each file is detected separately, so directories may mix formats
     If None, file must be a CSV in the format [nm, intensity] with no header data
 printNames : bool
     If True, prints the names of all imported files
+method : String or None
+    The resampling method passed to reshape(), see import_spd
+workers : int or None
+    The number of worker processes. If None or 1, files are imported in this process.
+    If 0, one worker per CPU is used
+recursive : bool
+    If True, also imports files in subdirectories
+include, exclude : String, list or None
+    Glob patterns selecting the files to import, see iter_spectral_files
+errors : dict or None
+    If specified, filled with the exception of every file that failed to import,
+    keyed by relative path
+cache : bool or String
+    The on-disk SPD cache passed to import_spd. After the import, the cache is trimmed
+    to cache.SPD_CACHE_MAX_BYTES. Archive members are not cached
+normalize : bool
+    If True, normalize every SPD to [0,1]. Pass False to keep absolute values, such as
+    the transmissions of filters
     
 Returns
 -------
 dict
-    A dict of SpectralDistribution data
+    A dict of SpectralDistribution data, in file order
 """
-def import_spd_batch(directory: str, photometer=None, printNames=True):
+def import_spd_batch(directory: str, photometer=None, printNames=True, method=None, workers=None,
+                     recursive=False, include=None, exclude=None, errors=None, cache=False, normalize=True):
+    if is_archive(directory):
+        files, window = None, ARCHIVE_WINDOW
+    else:
+        files = find_spectral_files(directory, recursive, include, exclude)
+        window = max(1, len(files))
+    tasks = _iter_import_tasks(directory, photometer, normalize, method, cache, recursive, include, exclude, files)
+    results = _iter_import_results(tasks, workers, window)
+
     spds = {}
-    files = [f for f in listdir(directory) if isfile(join(directory, f)) if not f.startswith('.')]
+    failed = {}
+    for path, result in results:
+        if isinstance(result, Exception):
+            failed[path] = result
+            continue
+        name = _batch_spd_name(path, recursive)
+        values, wavelengths = result
+        spds[name] = SpectralDistribution(values, wavelengths, name=name)
+
+    if errors is not None:
+        errors.update(failed)
 
-    for file in files:
-        spd = import_spd(directory + file, normalize=True, photometer=photometer)
-        spds[spd.strict_name] = spd
+    if resolve_cache_dir(cache) is not None:
+        evict_spd_cache(cache_dir=resolve_cache_dir(cache))
 
     if printNames:
         print('Imported the following SPDs:')
         for k in spds.keys():
             print(k)
+        if failed:
+            print('Failed to import the following files:')
+            for path, e in failed.items():
+                print('{}: {}'.format(path, e))
 
     return spds
-        
\ No newline at end of file
+
+
+"""Imports a directory of SPD files one at a time
+
+Yields the same SPDs as import_spd_batch, in the same order, without holding more
+than a few of them in memory.
+
+Parameters
+----------
+directory : String
+    The directory to import, or a .zip, .tar, .tar.gz or .tgz archive to import without
+    extracting it (see archives.iter_archive_members)
+errors : dict or None
+    If specified, filled with the exception of every file that failed to import,
+    keyed by relative path. Failed files are skipped
+window : int
+    With workers, the number of files imported ahead of the consumer
+
+See import_spd_batch for the other parameters.
+
+Returns
+-------
+generator
+    The SpectralDistribution of each file, normalized unless normalize is False
+"""
+def iter_spds(directory, photometer=None, method=None, workers=None, recursive=False, include=None,
+              exclude=None, errors=None, window=256, cache=False, normalize=True):
+    tasks = _iter_import_tasks(directory, photometer, normalize, method, cache, recursive, include, exclude)
+    results = _iter_import_results(tasks, workers, window)
+    for path, result in results:
+        if isinstance(result, Exception):
+            if errors is not None:
+                errors[path] = result
+            continue
+        name = _batch_spd_name(path, recursive)
+        values, wavelengths = result
+        yield SpectralDistribution(values, wavelengths, name=name)
+
+
+"""Imports a directory of SPD files in fixed-size blocks of array data
+
+Every block but the last holds exactly chunk_size SPDs on the reshape_wavelengths()
+grid, so peak memory is bounded by the chunk size rather than the number of files.
+The values can be passed straight to the *_batch metric functions and to
+weighting.channel_responses, or wrapped with batch.SpectrumBatch(values, names=names).
+
+Parameters
+----------
+directory : String
+    The directory to import, or a .zip, .tar, .tar.gz or .tgz archive to import without
+    extracting it (see archives.iter_archive_members)
+chunk_size : int
+    The number of SPDs per block
+
+See iter_spds for the other parameters.
+
+Returns
+-------
+generator
+    (names, values) tuples, where names is a list of N SPD names and values is the
+    (N, W) array of their reshaped spectral values, normalized unless normalize is False
+"""
+def iter_spd_chunks(directory, chunk_size=1024, photometer=None, method=None, workers=None,
+                    recursive=False, include=None, exclude=None, errors=None, cache=False, normalize=True):
+    if chunk_size < 1:
+        raise ValueError('chunk_size must be at least 1')
+
+    tasks = _iter_import_tasks(directory, photometer, normalize, method, cache, recursive, include, exclude)
+    results = _iter_import_results(tasks, workers, chunk_size)
+
+    names = []
+    values = None
+    for path, result in results:
+        if isinstance(result, Exception):
+            if errors is not None:
+                errors[path] = result
+            continue
+
+        if values is None:
+            values = np.empty((chunk_size, len(result[0])))
+        values[len(names)] = result[0]
+        names.append(_batch_spd_name(path, recursive))
+
+        if len(names) == chunk_size:
+            yield names, values
+            names, values = [], None
+
+    if names:
+        yield names, values[:len(names)]
@@ -327,7 +327,9 @@ class BeautifulPhotometry {
                 { label: 'Melanopic Ratio', value: metric.melanopic_ratio },
                 { label: 'Melanopic Response', value: metric.melanopic_response },
                 { label: 'Scotopic/Photopic', value: metric.scotopic_photopic_ratio },
-                { label: 'Melanopic/Photopic', value: metric.melanopic_photopic_ratio }
+                { label: 'Melanopic/Photopic', value: metric.melanopic_photopic_ratio },
+                { label: 'CCT (K)', value: metric.cct },
+                { label: 'Duv', value: metric.duv }
             ];
             
             metricsList.forEach(item => {
@@ -0,0 +1,292 @@
+"""
+ANSI/IES TM-30-18 colour fidelity and gamut indices for batches of light sources
+
+Every row of an (N, W) batch on the reshape() grid is scored against the 99 colour
+evaluation samples (CES) in one vectorized pass:
+
+    1. the CCT of each source, and its reference illuminant: a blackbody below 4000 K,
+       CIE daylight above 5000 K, and a mixture of the two (at equal Y) in between
+    2. the CIE 1964 10° tristimulus values of the CES under the test source and the
+       reference, with one product with a precomputed (W, 99 × 3) reflectance × CMF matrix
+    3. CIECAM02 (CAM02-UCS) coordinates of all samples under all illuminants at once
+    4. Rf from the mean colour difference, and, from the 16 hue-bin averages of a'b',
+       Rg and the local fidelity Rf,hj, chroma shift Rcs,hj and hue shift Rhs,hj
+
+Like colour's single-spectrum implementation, only 380 nm to 780 nm contribute.
+"""
+import numpy as np
+from colour import MSDS_CMFS, SpectralShape, XYZ_to_CIECAM02
+from colour.appearance import VIEWING_CONDITIONS_CIECAM02
+from colour.models import JMh_CIECAM02_to_CAM02UCS
+from colour.quality.cfi2017 import load_TCS_CIE2017
+
+from .batch import as_batch_values
+from .chromaticity import (
+    XYZ_to_uv,
+    blackbody_spectra,
+    daylight_spectra,
+    get_cmf_matrix,
+    uv_to_cct_duv,
+)
+from .spectrum import reshape_wavelengths
+from .utils import round_output, round_output_array
+
+CMFS = 'CIE 1964 10 Degree Standard Observer'
+
+# The wavelength range of TM-30
+TM30_MIN = 380
+TM30_MAX = 780
+
+# The number of colour evaluation samples and of hue bins
+SAMPLES = 99
+HUE_BINS = 16
+
+# The reference illuminant is a blackbody below BLACKBODY_CCT, CIE daylight above
+# DAYLIGHT_CCT, and a mixture of the two in between
+BLACKBODY_CCT = 4000
+DAYLIGHT_CCT = 5000
+
+# The CIECAM02 viewing conditions of TM-30
+ADAPTING_LUMINANCE = 100
+BACKGROUND_LUMINANCE = 20
+
+# The scaling factor between colour differences and fidelity indices
+FIDELITY_SCALE = 6.73
+
+# The number of rows whose samples are passed through CIECAM02 at once
+CHUNK_SIZE = 2048
+
+tm30_matrices = None
+
+
+"""
+Gets the matrices of TM-30, compiling them on first use
+
+@return tuple           The (W,) mask of the TM-30 range, the (3, W) CIE 1964 10° CMF matrix and the
+                        (W, 99 × 3) matrix whose column 3i + j is the reflectance of CES i times the
+                        jth 10° colour matching function (all with Δλ, and zero outside the range)
+"""
+def get_tm30_matrices():
+    global tm30_matrices
+
+    if tm30_matrices is None:
+        wavelengths = reshape_wavelengths()
+        mask = (wavelengths >= TM30_MIN) & (wavelengths <= TM30_MAX)
+        interval = wavelengths[1] - wavelengths[0]
+
+        cmfs = MSDS_CMFS[CMFS]
+        cmf_matrix = np.vstack([np.interp(wavelengths, cmfs.wavelengths, cmfs.values[:, i], left=0, right=0)
+                                for i in range(3)]) * interval * mask
+
+        samples = load_TCS_CIE2017(SpectralShape(TM30_MIN, TM30_MAX, 1))
+        reflectances = np.vstack([np.interp(wavelengths, samples.wavelengths, samples.values[:, i],
+                                            left=0, right=0)
+                                  for i in range(SAMPLES)])
+        ces_matrix = np.ascontiguousarray(
+            (reflectances[:, np.newaxis, :] * cmf_matrix).reshape(-1, len(wavelengths)).T)
+
+        for array in (mask, cmf_matrix, ces_matrix):
+            array.flags.writeable = False
+        tm30_matrices = (mask, cmf_matrix, ces_matrix)
+
+    return tm30_matrices
+
+
+"""
+Calculates the spectra of the TM-30 reference illuminants for the given CCTs
+
+@param ndarray cct              The (N,) CCTs, in K
+
+@return ndarray                 The (N, W) reference spectra, with rows of NaN where the CCT is NaN
+"""
+def reference_illuminants(cct):
+    cct = np.asarray(cct, dtype=float)
+    mask = get_tm30_matrices()[0]
+    y_bar = get_cmf_matrix()[1] * mask
+    references = np.full((len(cct), len(mask)), np.nan)
+
+    blackbody = cct < DAYLIGHT_CCT
+    daylight = cct >= BLACKBODY_CCT
+    planckian = blackbody_spectra(cct[blackbody])
+    references[blackbody] = planckian
+    references[daylight] = daylight_spectra(cct[daylight])
+
+    # between the two, mix the spectra normalized to equal Y
+    mixed = blackbody & daylight
+    if mixed.any():
+        planckian = planckian[daylight[blackbody]]
+        planckian = planckian / (planckian @ y_bar)[:, np.newaxis]
+        daylight = references[mixed] / (references[mixed] @ y_bar)[:, np.newaxis]
+        m = ((cct[mixed] - BLACKBODY_CCT) / (DAYLIGHT_CCT - BLACKBODY_CCT))[:, np.newaxis]
+        references[mixed] = (1 - m) * planckian + m * daylight
+
+    return references
+
+
+"""
+Converts colour differences in CAM02-UCS to fidelity indices
+
+@param ndarray delta_E          The colour differences
+
+@return ndarray                 The fidelity indices
+"""
+def delta_E_to_fidelity(delta_E):
+    return 10 * np.log1p(np.exp((100 - FIDELITY_SCALE * delta_E) / 10))
+
+
+"""
+Calculates the CAM02-UCS coordinates of the CES under a batch of illuminants
+
+@param ndarray values           The (N, W) spectral values
+
+@return ndarray                 The (N, 99, 3) J'a'b' coordinates
+"""
+def _ces_cam02ucs(values):
+    _, cmf_matrix, ces_matrix = get_tm30_matrices()
+    XYZ_w = values @ cmf_matrix.T
+    XYZ = (values @ ces_matrix).reshape(len(values), SAMPLES, 3)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scale = 100 / XYZ_w[:, 1]
+        specification = XYZ_to_CIECAM02(XYZ * scale[:, np.newaxis, np.newaxis],
+                                        (XYZ_w * scale[:, np.newaxis])[:, np.newaxis, :],
+                                        ADAPTING_LUMINANCE, BACKGROUND_LUMINANCE,
+                                        VIEWING_CONDITIONS_CIECAM02['Average'],
+                                        discount_illuminant=True, compute_H=False)
+        JMh = np.stack([specification.J, specification.M, specification.h], axis=-1)
+        return JMh_CIECAM02_to_CAM02UCS(JMh)
+
+
+"""
+Calculates the area of each polygon of a batch
+
+@param ndarray vertices         The (N, V, 2) vertices, in order
+
+@return ndarray                 The (N,) areas
+"""
+def _polygon_areas(vertices):
+    x, y = vertices[..., 0], vertices[..., 1]
+    return (x * np.roll(y, -1, axis=1) - np.roll(x, -1, axis=1) * y).sum(axis=1) / 2
+
+
+"""
+Averages values of the CES by hue bin
+
+@param ndarray bins             The (N, 99) hue bin of each CES
+@param ndarray values           The (N, 99, C) values
+
+@return ndarray                 The (N, 16, C) averages, NaN for empty bins
+"""
+def _bin_means(bins, values):
+    count, _, channels = values.shape
+    # one bincount over the bins of all rows, offset per row
+    indices = (bins + HUE_BINS * np.arange(count)[:, np.newaxis]).ravel()
+    counts = np.bincount(indices, minlength=count * HUE_BINS)
+    sums = [np.bincount(indices, values[..., c].ravel(), count * HUE_BINS) for c in range(channels)]
+    return (np.stack(sums, axis=-1) / counts[:, np.newaxis]).reshape(count, HUE_BINS, channels)
+
+
+"""
+Calculates the TM-30 indices for a chunk of a batch
+
+@param ndarray values           The (N, W) spectral values
+
+@return dict                    The unrounded fields of tm30_batch
+"""
+def _tm30_chunk(values):
+    mask = get_tm30_matrices()[0]
+    values = values * mask
+    cct = uv_to_cct_duv(XYZ_to_uv(values @ get_cmf_matrix().T))[0]
+    references = reference_illuminants(cct)
+
+    Jab = _ces_cam02ucs(np.vstack([values, references]))
+    Jab_t, Jab_r = Jab[:len(values)], Jab[len(values):]
+    delta_E = np.linalg.norm(Jab_t - Jab_r, axis=2)
+
+    # the hue bin of each sample under the reference
+    hue = np.arctan2(Jab_r[..., 2], Jab_r[..., 1]) % (2 * np.pi)
+    bins = np.minimum((np.nan_to_num(hue) / (2 * np.pi) * HUE_BINS).astype(int), HUE_BINS - 1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        average_t = _bin_means(bins, Jab_t[..., 1:])
+        average_r = _bin_means(bins, Jab_r[..., 1:])
+        bin_delta_E = _bin_means(bins, delta_E[..., np.newaxis])[..., 0]
+        gamut = 100 * _polygon_areas(average_t) / _polygon_areas(average_r)
+
+        # chroma and hue shifts along and across the angle bisecting each bin
+        angles = (np.arange(HUE_BINS) + 0.5) * 2 * np.pi / HUE_BINS
+        norms = np.linalg.norm(average_r, axis=2)
+        delta_a = average_t[..., 0] - average_r[..., 0]
+        delta_b = average_t[..., 1] - average_r[..., 1]
+        chroma_shift = 100 * (delta_a * np.cos(angles) + delta_b * np.sin(angles)) / norms
+        hue_shift = (-delta_a * np.sin(angles) + delta_b * np.cos(angles)) / norms
+
+    return {
+        'Rf': delta_E_to_fidelity(delta_E.mean(axis=1)),
+        'Rg': gamut,
+        'Rf_h': delta_E_to_fidelity(bin_delta_E),
+        'Rcs_h': chroma_shift,
+        'Rhs_h': hue_shift,
+        'Rf_ces': delta_E_to_fidelity(delta_E),
+    }
+
+
+"""Calculates the TM-30 indices for a batch of light sources
+
+Parameters
+----------
+spds : SpectrumBatch, list or ndarray
+    The spectral power distributions, see batch.as_batch_values
+toround : bool
+    Whether to round the hue shifts to 3 decimal places, and every other index to 2
+
+Returns
+-------
+ndarray
+    A structured array with one record per light source, with the fields 'Rf' (fidelity)
+    and 'Rg' (gamut), the (16,) fields 'Rf_h' (local fidelity), 'Rcs_h' (local chroma shift,
+    in %) and 'Rhs_h' (local hue shift) by hue bin, and the (99,) field 'Rf_ces' (fidelity
+    of each CES). Light sources without a CCT give NaN
+"""
+def tm30_batch(spds, toround=False):
+    values = as_batch_values(spds)
+    results = np.empty(len(values), dtype=[
+        ('Rf', float),
+        ('Rg', float),
+        ('Rf_h', float, (HUE_BINS,)),
+        ('Rcs_h', float, (HUE_BINS,)),
+        ('Rhs_h', float, (HUE_BINS,)),
+        ('Rf_ces', float, (SAMPLES,)),
+    ])
+
+    for start in range(0, len(values), CHUNK_SIZE):
+        chunk = _tm30_chunk(values[start:start + CHUNK_SIZE])
+        for field, result in chunk.items():
+            results[field][start:start + CHUNK_SIZE] = round_output_array(
+                result, toround, 3 if field == 'Rhs_h' else 2)
+
+    return results
+
+
+"""
+Calculates the TM-30 fidelity index (Rf) for a given light source
+
+@param SpectralDistribution spd            The spectral power distribution
+@param bool toround [optional]                  Whether to round to output to 2 decimal places
+
+@return float                                   The Rf
+"""
+def tm30_rf(spd, toround=True):
+    return round_output(_tm30_chunk(as_batch_values(spd))['Rf'][0], toround)
+
+
+"""
+Calculates the TM-30 gamut index (Rg) for a given light source
+
+@param SpectralDistribution spd            The spectral power distribution
+@param bool toround [optional]                  Whether to round to output to 2 decimal places
+
+@return float                                   The Rg
+"""
+def tm30_rg(spd, toround=True):
+    return round_output(_tm30_chunk(as_batch_values(spd))['Rg'][0], toround)
@@ -1,3 +1,6 @@
+import numpy as np
+
+
 """
 Fuction to round-on-return
 
@@ -15,4 +18,24 @@ def round_output(value, toround=True, digits=2):
         else: 
             return int(round(value))
     else:
-        return value
\ No newline at end of file
+        return value
+
+"""
+Vectorized version of round_output for arrays of results
+
+@param ndarray values       The return values
+@param boolean toround      Whether or not to round
+@param int digits           The number of digits to round to.
+                            Set digits=None to round to whole numbers.
+
+@return ndarray             The values, potentially rounded
+"""
+def round_output_array(values, toround=True, digits=2):
+    values = np.asarray(values)
+    if toround:
+        if digits is not None:
+            return np.round(values, digits)
+        else:
+            return np.rint(values).astype(int)
+    else:
+        return values
@@ -22,8 +22,7 @@ import tempfile
 
 from .spectrum import import_spd, normalize_spd, create_colour_spd, reshape
 from .plot import plot_spectrum, plot_multi_spectrum
-from .human_circadian import melanopic_ratio, melanopic_response, melanopic_lumens, melanopic_photopic_ratio
-from .human_visual import scotopic_photopic_ratio
+from .metrics import compute_all_metrics, metrics_to_dicts
 from .photometer import uprtek_import_spectrum
 
 
@@ -194,7 +193,7 @@ def register_routes(app: Flask) -> None:
             plot_image = create_plot_image(plot_multi_spectrum, **plot_options)
             
             # Calculate metrics for each SPD
-            metrics = [calculate_spd_metrics(spd) for spd in spds]
+            metrics = calculate_batch_metrics(spds)
             
             return jsonify({
                 'success': True,
@@ -238,13 +237,10 @@ def register_routes(app: Flask) -> None:
     def get_reference_spectra():
         """Get list of available reference spectra."""
         try:
-            from .spectrum import import_reference_spectra, reference_spectra
-            
-            if not reference_spectra:
-                import_reference_spectra()
+            from .spectrum import reference_registry
             
             spectra_list = [{'name': spec['name'], 'description': spec['description']} 
-                           for spec in reference_spectra]
+                           for spec in reference_registry]
             
             return jsonify({'spectra': spectra_list})
         except Exception as e:
@@ -365,13 +361,12 @@ def process_csv_file(
 
 def calculate_spd_metrics(spd: SpectralDistribution) -> Dict[str, Any]:
     """Calculate all metrics for a given SPD."""
-    return {
-        'name': spd.strict_name,
-        'melanopic_ratio': round(melanopic_ratio(spd), 3),
-        'melanopic_response': round(melanopic_response(spd), 1),
-        'scotopic_photopic_ratio': round(scotopic_photopic_ratio(spd), 3),
-        'melanopic_photopic_ratio': round(melanopic_photopic_ratio(spd), 3)
-    }
+    return calculate_batch_metrics([spd])[0]
+
+
+def calculate_batch_metrics(spds: List[SpectralDistribution]) -> List[Dict[str, Any]]:
+    """Calculate all metrics for a list of SPDs in a single pass."""
+    return metrics_to_dicts(compute_all_metrics(spds))
 
 
 def create_plot_image(plot_func, *args, **kwargs) -> str:
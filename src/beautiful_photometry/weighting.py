@@ -0,0 +1,59 @@
+"""
+Precompiled action-spectrum weighting matrix
+
+Stacks the L/M/S cone, rod, photopic, scotopic and melanopic reference curves from
+source_illuminants.csv into a single (7, W) matrix on the reshape() grid, so that
+every channel response of a batch of SPDs comes from one matrix product:
+
+    responses = spd_values @ weights.T      # (N, 7)
+"""
+import numpy as np
+
+from .spectrum import reference_registry
+from .batch import as_batch_values
+
+# The rows of the weighting matrix, as names in source_illuminants.csv
+CHANNELS = ('L Cone', 'M Cone', 'S Cone', 'Rod', 'Photopic', 'Scotopic', 'Melanopic')
+
+# Row indices into the weighting matrix and column indices into channel_responses()
+L_CONE, M_CONE, S_CONE, ROD, PHOTOPIC, SCOTOPIC, MELANOPIC = range(len(CHANNELS))
+
+weighting_matrix = None
+
+
+"""
+Gets the weighting matrix, compiling it from the reference spectra on first use
+
+@return ndarray         The (7, W) weighting matrix, with rows ordered as CHANNELS
+"""
+def get_weighting_matrix():
+    global weighting_matrix
+
+    if weighting_matrix is None:
+        rows = [reference_registry.values(name) for name in CHANNELS]
+        weighting_matrix = np.ascontiguousarray(np.vstack(rows))
+
+    return weighting_matrix
+
+
+"""
+Calculates every channel response for a batch of light sources with a single matrix product
+
+@param SpectrumBatch/list/ndarray spds          The spectral power distributions, see batch.as_batch_values
+
+@return ndarray                                 The (N, 7) responses, with columns ordered as CHANNELS
+"""
+def channel_responses(spds):
+    return as_batch_values(spds) @ get_weighting_matrix().T
+
+
+"""
+Calculates a single channel response for a batch of light sources
+
+@param SpectrumBatch/list/ndarray spds          The spectral power distributions, see batch.as_batch_values
+@param int channel                              The channel index, e.g. weighting.PHOTOPIC
+
+@return ndarray                                 The (N,) responses
+"""
+def channel_response(spds, channel):
+    return as_batch_values(spds) @ get_weighting_matrix()[channel]
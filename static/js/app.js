@@ -473,7 +473,9 @@ class SPDManager {
                 { label: 'Melanopic Ratio', value: primarySPD.metrics.melanopic_ratio },
                 { label: 'Melanopic Response', value: primarySPD.metrics.melanopic_response },
                 { label: 'S/P Ratio', value: primarySPD.metrics.scotopic_photopic_ratio },
-                { label: 'M/P Ratio', value: primarySPD.metrics.melanopic_photopic_ratio }
+                { label: 'M/P Ratio', value: primarySPD.metrics.melanopic_photopic_ratio },
+                { label: 'CCT (K)', value: primarySPD.metrics.cct },
+                { label: 'Duv', value: primarySPD.metrics.duv }
             ];
             
             metrics.forEach(metric => {
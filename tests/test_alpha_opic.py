@@ -0,0 +1,79 @@
+"""
+Tests for the alpha_opic module.
+"""
+
+import numpy as np
+import pytest
+from colour import SDS_ILLUMINANTS, SpectralDistribution
+
+from beautiful_photometry.alpha_opic import (
+    ALPHA_OPIC_CHANNELS,
+    K_D65,
+    MELANOPIC,
+    alpha_opic_batch,
+    alpha_opic_der_batch,
+    alpha_opic_edi_batch,
+    alpha_opic_irradiance_batch,
+    get_alpha_opic_matrix,
+    melanopic_der,
+    melanopic_edi,
+)
+from beautiful_photometry.batch import SpectrumBatch
+from beautiful_photometry.metrics import compute_all_metrics
+from beautiful_photometry.spectrum import reshape, reshape_wavelengths
+
+
+@pytest.fixture
+def d65():
+    return reshape(SDS_ILLUMINANTS['D65'].copy())
+
+
+class TestAlphaOpic:
+    """Test the CIE S 026 quantities."""
+
+    def test_matrix(self):
+        matrix = get_alpha_opic_matrix()
+        assert matrix.shape == (6, len(reshape_wavelengths()))
+        np.testing.assert_allclose(matrix[:5].max(axis=1), 1.0)
+        # peak wavelengths of the S, M, L cone, rhodopic and melanopic action spectra
+        peaks = reshape_wavelengths()[matrix[:5].argmax(axis=1)]
+        np.testing.assert_allclose(peaks, [445, 541, 569, 507, 490], atol=3)
+
+    def test_d65_is_its_own_daylight(self, d65):
+        # the D65 efficacies reproduce CIE S 026 table 2 to within interpolation of the 5 nm D65
+        np.testing.assert_allclose(alpha_opic_der_batch(d65)[0], 1.0, rtol=1e-3)
+        edi = alpha_opic_edi_batch(d65)[0]
+        illuminance = alpha_opic_batch(d65)['illuminance'][0]
+        np.testing.assert_allclose(edi, illuminance, rtol=1e-3)
+
+    def test_scaling(self, d65):
+        batch = SpectrumBatch(np.vstack([d65.values, 2 * d65.values, np.zeros_like(d65.values)]))
+        irradiance = alpha_opic_irradiance_batch(batch)
+        np.testing.assert_allclose(irradiance[1], 2 * irradiance[0])
+        np.testing.assert_allclose(alpha_opic_edi_batch(batch), irradiance / K_D65)
+
+        der = alpha_opic_der_batch(batch)
+        np.testing.assert_allclose(der[0], der[1])
+        assert np.isnan(der[2]).all()
+
+    def test_structured_output(self, d65):
+        results = alpha_opic_batch([d65, d65], toround=True)
+        assert results.shape == (2,)
+        assert len(results.dtype.names) == 1 + 3 * len(ALPHA_OPIC_CHANNELS)
+        assert results['melanopic_edi'][0] == melanopic_edi(d65)
+        assert results['melanopic_der'][0] == melanopic_der(d65)
+        np.testing.assert_allclose(results['melanopic_edi'], alpha_opic_edi_batch([d65, d65])[:, MELANOPIC],
+                                   atol=0.05)
+
+    def test_monochromatic(self):
+        # 1 W/m² at 490 nm gives a melanopic irradiance of 1 W/m²
+        values = np.zeros(len(reshape_wavelengths()))
+        values[reshape_wavelengths() == 490] = 1.0
+        spd = SpectralDistribution(values, reshape_wavelengths())
+        assert alpha_opic_irradiance_batch(spd)[0, MELANOPIC] == pytest.approx(1.0)
+
+    def test_metrics_registry(self, d65):
+        results = compute_all_metrics([d65], ['illuminance', 'melanopic_edi', 'rhodopic_der'])
+        expected = alpha_opic_batch(d65, toround=True)
+        for field in ('illuminance', 'melanopic_edi', 'rhodopic_der'):
+            assert results[field][0] == expected[field][0]
@@ -0,0 +1,103 @@
+"""
+Tests for the archives module and archive imports.
+"""
+
+import os
+import tarfile
+import zipfile
+
+import numpy as np
+import pytest
+
+from beautiful_photometry.archives import is_archive, iter_archive_members
+from beautiful_photometry.cli import create_parser
+from beautiful_photometry.spectrum import import_spd_batch, iter_spd_chunks, iter_spds
+
+CSVS = os.path.join(os.path.dirname(__file__), '..', 'CSVs')
+UPRTEK_FILE = os.path.join(CSVS, '2019_guangzhou', 'Bridgelux Thrive 4000K.xls')
+
+
+@pytest.fixture
+def spd_tree(tmp_path):
+    """A nested directory of CSV and UPRtek files, with one unreadable file and hidden files."""
+    root = tmp_path / 'tree'
+    wavelengths = np.arange(380, 781, 5)
+    for i, path in enumerate(['b.csv', 'a.csv', 'campaign/c.csv', '.hidden/e.csv', '__MACOSX/._a.csv']):
+        path = root / path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savetxt(path, np.column_stack([wavelengths, np.linspace(1, i + 2, len(wavelengths))]),
+                   delimiter=',')
+    with open(UPRTEK_FILE, 'rb') as f:
+        (root / 'campaign' / 'meter.xls').write_bytes(f.read())
+    (root / 'bad.csv').write_text('no,data\n')
+    return root
+
+
+@pytest.fixture(params=['zip', 'tar.gz'])
+def archive(request, spd_tree, tmp_path):
+    path = tmp_path / ('tree.' + request.param)
+    files = sorted(p for p in spd_tree.rglob('*') if p.is_file())
+    if request.param == 'zip':
+        with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for file in files:
+                archive.write(file, file.relative_to(spd_tree).as_posix())
+    else:
+        with tarfile.open(path, 'w:gz') as archive:
+            archive.add(spd_tree, arcname='.')
+    return path
+
+
+class TestArchives:
+    """Archives must import exactly like the directories they were made from."""
+
+    def test_is_archive(self):
+        assert is_archive('campaign.zip') and is_archive('campaign.TAR.GZ') and is_archive('campaign.tgz')
+        assert not is_archive('campaign') and not is_archive('campaign.csv')
+
+    def test_members(self, archive):
+        names = [name for name, _ in iter_archive_members(str(archive), lambda name: True)]
+        assert sorted(names) == ['a.csv', 'b.csv', 'bad.csv', 'campaign/c.csv', 'campaign/meter.xls']
+
+    @pytest.mark.parametrize('workers', [None, 2])
+    def test_matches_directory(self, spd_tree, archive, workers):
+        errors = {}
+        expected = import_spd_batch(str(spd_tree), photometer='auto', printNames=False, recursive=True)
+        spds = import_spd_batch(str(archive), photometer='auto', printNames=False, recursive=True,
+                                workers=workers, errors=errors)
+
+        assert sorted(spds) == sorted(expected) == ['a', 'b', 'campaign/c', 'campaign/meter']
+        assert list(errors) == ['bad.csv']
+        for name in expected:
+            np.testing.assert_array_equal(spds[name].values, expected[name].values)
+
+    def test_top_level_and_patterns(self, archive):
+        assert sorted(import_spd_batch(str(archive), printNames=False)) == ['a', 'b']
+        spds = import_spd_batch(str(archive), photometer='auto', printNames=False, recursive=True,
+                                include='*.xls')
+        assert list(spds) == ['campaign/meter']
+
+    def test_without_normalizing(self, spd_tree, archive):
+        # b.csv rises from 1 to 2, and a.csv from 1 to 3
+        spds = import_spd_batch(str(archive), printNames=False, normalize=False)
+        assert spds['b'].values.max() == pytest.approx(2) and spds['a'].values.max() == pytest.approx(3)
+
+        names, values = next(iter_spd_chunks(str(spd_tree), normalize=False))
+        assert names == ['a', 'b']
+        np.testing.assert_array_equal(values, [spds['a'].values, spds['b'].values])
+        np.testing.assert_allclose([spd.values.max() for spd in iter_spds(str(spd_tree))], 1)
+
+    def test_streaming(self, spd_tree, archive):
+        expected = import_spd_batch(str(spd_tree), photometer='auto', printNames=False, recursive=True)
+        spds = {spd.name: spd for spd in iter_spds(str(archive), photometer='auto', recursive=True,
+                                                   workers=2, window=2)}
+        assert sorted(spds) == sorted(expected)
+
+        chunks = list(iter_spd_chunks(str(archive), chunk_size=3, photometer='auto', recursive=True))
+        assert [len(names) for names, _ in chunks] == [3, 1]
+        for names, values in chunks:
+            for name, row in zip(names, values):
+                np.testing.assert_array_equal(row, expected[name].values)
+
+    def test_cli_accepts_archives(self, archive):
+        args = create_parser().parse_args(['batch', str(archive)])
+        assert args.directory == str(archive.absolute())
@@ -0,0 +1,168 @@
+"""
+Tests for the batch module and the batch metric functions.
+"""
+
+import numpy as np
+import pytest
+from colour import SpectralDistribution
+
+from beautiful_photometry.batch import SpectrumBatch, as_batch_values
+from beautiful_photometry.spectrum import get_reference_spectrum, reshape_wavelengths
+from beautiful_photometry.human_circadian import (
+    melanopic_response,
+    melanopic_ratio,
+    melanopic_photopic_ratio,
+    melanopic_lumens,
+    melanopic_response_batch,
+    melanopic_ratio_batch,
+    melanopic_photopic_ratio_batch,
+    melanopic_lumens_batch,
+    spectral_g_index,
+    spectral_g_index_batch,
+)
+from beautiful_photometry.human_visual import (
+    get_photopic_curve,
+    photopic_response,
+    scotopic_response,
+    scotopic_photopic_ratio,
+    photopic_response_batch,
+    scotopic_response_batch,
+    scotopic_photopic_ratio_batch,
+)
+
+
+@pytest.fixture
+def batch():
+    rng = np.random.default_rng(42)
+    return SpectrumBatch(rng.random((5, 421)) + 0.1, names=list('abcde'))
+
+
+class TestSpectrumBatch:
+    """Test the SpectrumBatch container."""
+
+    def test_defaults(self, batch):
+        assert len(batch) == 5
+        assert batch.values.shape == (5, 421)
+        assert batch.values.flags['C_CONTIGUOUS']
+        np.testing.assert_array_equal(batch.wavelengths, reshape_wavelengths())
+
+    def test_indexing(self, batch):
+        spd = batch[2]
+        assert isinstance(spd, SpectralDistribution)
+        assert spd.name == 'c'
+        np.testing.assert_array_equal(spd.values, batch.values[2])
+
+        sub = batch[1:3]
+        assert isinstance(sub, SpectrumBatch)
+        assert sub.names == ['b', 'c']
+
+    def test_round_trip(self, batch):
+        spds = batch.to_spds()
+        assert list(spds.keys()) == batch.names
+
+        again = SpectrumBatch.from_spds(spds)
+        np.testing.assert_array_equal(again.values, batch.values)
+        assert again.names == batch.names
+
+    def test_from_spds_reshapes(self):
+        spd = SpectralDistribution(np.linspace(1, 2, 81), np.arange(380, 781, 5), name='coarse')
+        values = as_batch_values([spd])
+        assert values.shape == (1, 421)
+
+    def test_shape_validation(self):
+        with pytest.raises(ValueError):
+            SpectrumBatch(np.ones((2, 10)))
+        with pytest.raises(ValueError):
+            SpectrumBatch(np.ones((2, 421)), names=['only one'])
+
+
+class TestBatchMetrics:
+    """The batch metrics must match the single-SPD metrics."""
+
+    def test_responses(self, batch):
+        for fn, batch_fn in [
+            (melanopic_response, melanopic_response_batch),
+            (photopic_response, photopic_response_batch),
+            (scotopic_response, scotopic_response_batch),
+        ]:
+            expected = [fn(spd, toround=False) for spd in batch]
+            np.testing.assert_allclose(batch_fn(batch, toround=False), expected)
+
+    def test_baseline_formulas(self, batch):
+        # the single-SPD metrics wrap the batch ones, so pin both to the original
+        # np.sum(curve * values) formulas rather than to each other
+        curves = {name: get_reference_spectrum(name)['curve'].values
+                  for name in ('Photopic', 'Scotopic', 'Melanopic')}
+        photopic = batch.values @ curves['Photopic']
+        scotopic = np.array([np.sum(curves['Scotopic'] * values) for values in batch.values])
+        melanopic = np.array([np.sum(curves['Melanopic'] * values) for values in batch.values])
+
+        np.testing.assert_allclose(photopic_response_batch(batch, False), photopic)
+        np.testing.assert_allclose(scotopic_response_batch(batch, False), scotopic)
+        np.testing.assert_allclose(melanopic_response_batch(batch, False), melanopic)
+        np.testing.assert_allclose(melanopic_ratio_batch(batch, False), melanopic / photopic * 1.218)
+        np.testing.assert_allclose(melanopic_photopic_ratio_batch(batch, False), melanopic / photopic)
+        np.testing.assert_allclose(scotopic_photopic_ratio_batch(batch, False), scotopic / photopic)
+
+        # and an equal-energy spectrum to the values of the original implementation
+        flat = SpectralDistribution(np.ones(421), reshape_wavelengths())
+        assert photopic_response(flat, False) == pytest.approx(107.488414836)
+        assert scotopic_response(flat, False) == pytest.approx(97.083096574)
+        assert melanopic_response(flat, False) == pytest.approx(87.6945397933)
+        assert melanopic_ratio(flat) == 0.99
+        assert melanopic_photopic_ratio(flat) == 0.82
+
+    def test_ratios(self, batch):
+        for fn, batch_fn in [
+            (melanopic_ratio, melanopic_ratio_batch),
+            (melanopic_photopic_ratio, melanopic_photopic_ratio_batch),
+            (scotopic_photopic_ratio, scotopic_photopic_ratio_batch),
+        ]:
+            expected = [fn(spd) for spd in batch]
+            np.testing.assert_allclose(batch_fn(batch), expected)
+
+    def test_melanopic_lumens(self, batch):
+        lumens = np.array([100, 200, 300, 400, 500])
+        expected = [melanopic_lumens(spd, lm) for spd, lm in zip(batch, lumens)]
+        result = melanopic_lumens_batch(batch, lumens)
+        assert result.dtype.kind == 'i'
+        np.testing.assert_array_equal(result, expected)
+
+    def test_melanopic_lumens_broadcasting(self, batch):
+        # lumens at 4 dimming levels for each light source
+        lumens = np.outer([100, 200, 300, 400, 500], [1, 0.5, 0.25, 0.1])
+        ratios = melanopic_ratio_batch(batch, False)
+        expected = np.rint(ratios[:, np.newaxis] * lumens)
+
+        for spds in (batch, batch.to_spds(), list(batch)):
+            result = melanopic_lumens(spds, lumens)
+            assert result.shape == (5, 4) and result.dtype.kind == 'i'
+            np.testing.assert_array_equal(result, expected)
+        np.testing.assert_array_equal(melanopic_lumens_batch(batch, lumens), expected)
+
+        # ratios broadcast as NumPy arrays do
+        np.testing.assert_allclose(melanopic_lumens(ratios[:, np.newaxis], lumens, False),
+                                   ratios[:, np.newaxis] * lumens)
+        np.testing.assert_allclose(melanopic_lumens(batch[0], lumens[0], False), ratios[0] * lumens[0])
+
+    def test_melanopic_lumens_scalar(self, batch):
+        result = melanopic_lumens(batch[0], 1000)
+        assert isinstance(result, int)
+        assert isinstance(melanopic_lumens(0.8, 1000, False), float)
+        assert melanopic_lumens(0.8, 1000) == 800
+
+    def test_spectral_g_index(self, batch):
+        # the per-wavelength loop spectral_g_index used to run
+        def loop_g_index(spd):
+            photopic_spd = get_photopic_curve()
+            numer = sum(spd[i] for i in range(380, 501))
+            denom = sum(spd[i] * photopic_spd[i] for i in range(380, 781))
+            return -2.5 * np.log10(numer / denom)
+
+        expected = [loop_g_index(spd) for spd in batch]
+        np.testing.assert_allclose([spectral_g_index(spd) for spd in batch], expected, rtol=1e-12)
+        np.testing.assert_allclose(spectral_g_index_batch(batch), expected, rtol=1e-12)
+
+        # off-grid SPDs are sampled at the grid wavelengths, as the loop did
+        spd = SpectralDistribution(np.linspace(1, 2, 81), np.arange(380, 781, 5))
+        assert spectral_g_index(spd) == pytest.approx(loop_g_index(spd), rel=1e-12)
@@ -0,0 +1,199 @@
+"""
+Tests for the cache module.
+"""
+
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from beautiful_photometry import spectrum
+from beautiful_photometry import cache as cache_module
+from beautiful_photometry.cache import (
+    default_cache_dir,
+    evict_spd_cache,
+    load_reference_cache,
+    reference_cache_path,
+)
+from beautiful_photometry.spectrum import (
+    ReferenceSpectrumRegistry,
+    import_spd,
+    import_spd_batch,
+    package_data_path,
+)
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    path = tmp_path / 'cache'
+    monkeypatch.setenv('BEAUTIFUL_PHOTOMETRY_CACHE', str(path))
+    return path
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = tmp_path / 'source_illuminants.csv'
+    shutil.copy(package_data_path('source_illuminants.csv'), path)
+    return str(path)
+
+
+class TestReferenceCache:
+    """Test the compiled reference spectrum cache."""
+
+    def test_disabled(self, monkeypatch):
+        monkeypatch.setenv('BEAUTIFUL_PHOTOMETRY_CACHE', '0')
+        assert default_cache_dir() is None
+        assert reference_cache_path('source_illuminants.csv') is None
+
+    def test_round_trip(self, cache_dir, database, monkeypatch):
+        parsed = ReferenceSpectrumRegistry(database).load()
+        assert os.path.exists(reference_cache_path(database))
+
+        # a warm load must not parse the CSV
+        def fail(*args, **kwargs):
+            raise AssertionError('CSV was parsed')
+        monkeypatch.setattr(spectrum, 'read_reference_spectra', fail)
+
+        cached = ReferenceSpectrumRegistry(database).load()
+        assert [s['name'] for s in cached] == [s['name'] for s in parsed]
+        for a, b in zip(parsed, cached):
+            assert a['description'] == b['description']
+            np.testing.assert_array_equal(a['curve'].values, b['curve'].values)
+            np.testing.assert_array_equal(a['curve'].wavelengths, b['curve'].wavelengths)
+
+    def test_touch_keeps_cache(self, cache_dir, database):
+        ReferenceSpectrumRegistry(database).load()
+        stat = os.stat(database)
+        os.utime(database, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert load_reference_cache(database) is not None
+
+    def test_touch_restamps_cache(self, cache_dir, database, monkeypatch):
+        ReferenceSpectrumRegistry(database).load()
+        stat = os.stat(database)
+        os.utime(database, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert load_reference_cache(database) is not None
+
+        def fail(path):
+            raise AssertionError('The CSV was hashed again')
+
+        monkeypatch.setattr(cache_module, 'file_digest', fail)
+        arrays = load_reference_cache(database)
+        assert int(arrays['mtime_ns']) == os.stat(database).st_mtime_ns
+
+    def test_edit_invalidates_cache(self, cache_dir, database):
+        ReferenceSpectrumRegistry(database).load()
+        with open(database, 'a', encoding='utf-8') as f:
+            f.write('\nFlat,Flat Spectrum,,,' + ','.join(['1'] * 531))
+
+        assert load_reference_cache(database) is None
+        registry = ReferenceSpectrumRegistry(database)
+        assert 'Flat' in registry
+        assert load_reference_cache(database) is not None
+
+    @pytest.mark.parametrize('damage', ['truncate', 'missing array'])
+    def test_unreadable_cache_is_rebuilt(self, cache_dir, database, damage):
+        ReferenceSpectrumRegistry(database).load()
+        path = reference_cache_path(database)
+        if damage == 'truncate':
+            with open(path, 'rb') as f:
+                data = f.read()
+            with open(path, 'wb') as f:
+                f.write(data[:len(data) // 2])
+        else:
+            with np.load(path) as data:
+                arrays = {key: data[key] for key in data.files if key != 'sha256'}
+            np.savez(path, **arrays)
+
+        assert load_reference_cache(database) is None
+        assert len(ReferenceSpectrumRegistry(database).load())
+        assert load_reference_cache(database) is not None
+
+
+@pytest.fixture
+def spd_files(tmp_path):
+    directory = tmp_path / 'spds'
+    directory.mkdir()
+    wavelengths = np.arange(380, 781, 5)
+    for i in range(3):
+        np.savetxt(directory / '{}.csv'.format(i),
+                   np.column_stack([wavelengths, np.linspace(1, i + 2, len(wavelengths))]),
+                   delimiter=',')
+    return directory
+
+
+def cached_entries(cache_dir):
+    return sorted(p for p in (cache_dir / 'spd').rglob('*.f8'))
+
+
+class TestSpdCache:
+    """Test the content-addressed SPD cache."""
+
+    def test_warm_import_skips_parsing(self, cache_dir, spd_files, monkeypatch):
+        filename = str(spd_files / '0.csv')
+        cold = import_spd(filename, normalize=True, cache=True)
+        assert len(cached_entries(cache_dir)) == 1
+
+        def fail(*args, **kwargs):
+            raise AssertionError('CSV was parsed')
+        monkeypatch.setattr(spectrum, 'read_spectral_csv', fail)
+
+        warm = import_spd(filename, 'renamed', normalize=True, cache=True)
+        assert warm.name == 'renamed'
+        np.testing.assert_array_equal(warm.values, cold.values)
+        np.testing.assert_array_equal(warm.wavelengths, cold.wavelengths)
+
+    def test_key_covers_content_and_parameters(self, cache_dir, spd_files):
+        filename = str(spd_files / '0.csv')
+        import_spd(filename, cache=True)
+        import_spd(filename, weight=2.0, cache=True)
+        import_spd(filename, normalize=True, cache=True)
+        assert len(cached_entries(cache_dir)) == 3
+
+        # a copy shares the entry, an edit misses
+        shutil.copy(filename, spd_files / 'copy.csv')
+        import_spd(str(spd_files / 'copy.csv'), cache=True)
+        assert len(cached_entries(cache_dir)) == 3
+
+        with open(filename, 'a', encoding='utf-8') as f:
+            f.write('785,1\n')
+        import_spd(filename, cache=True)
+        assert len(cached_entries(cache_dir)) == 4
+
+    def test_disabled_by_default(self, cache_dir, spd_files):
+        import_spd(str(spd_files / '0.csv'))
+        assert not (cache_dir / 'spd').exists()
+
+    def test_batch(self, tmp_path, spd_files):
+        cache_dir = tmp_path / 'batch-cache'
+        cold = import_spd_batch(str(spd_files), printNames=False, cache=str(cache_dir))
+        warm = import_spd_batch(str(spd_files), printNames=False, cache=str(cache_dir))
+        assert len(cached_entries(cache_dir)) == 3
+        assert list(warm) == list(cold)
+        for name in cold:
+            np.testing.assert_array_equal(warm[name].values, cold[name].values)
+
+    def test_eviction_drops_least_recently_used(self, cache_dir, spd_files):
+        for i in range(3):
+            import_spd(str(spd_files / '{}.csv'.format(i)), cache=True)
+        entries = cached_entries(cache_dir)
+        size = entries[0].stat().st_size
+
+        # make 0.csv the most recently used
+        for age, entry in enumerate(entries):
+            os.utime(entry, ns=(0, (age + 1) * 10**9))
+        import_spd(str(spd_files / '0.csv'), cache=True)
+        recent = max(cached_entries(cache_dir), key=lambda p: p.stat().st_mtime_ns)
+
+        assert evict_spd_cache(max_bytes=size, cache_dir=str(cache_dir)) == 2
+        assert cached_entries(cache_dir) == [recent]
+
+    def test_periodic_eviction(self, cache_dir, spd_files, monkeypatch):
+        monkeypatch.setattr(cache_module, 'SPD_CACHE_EVICT_INTERVAL', 2)
+        monkeypatch.setattr(cache_module, 'spd_cache_writes', 0)
+        calls = []
+        monkeypatch.setattr(cache_module, 'evict_spd_cache', lambda **kwargs: calls.append(kwargs))
+
+        for i in range(3):
+            import_spd(str(spd_files / '{}.csv'.format(i)), cache=True)
+        assert len(calls) == 1
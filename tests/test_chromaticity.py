@@ -0,0 +1,75 @@
+"""
+Tests for the chromaticity module.
+"""
+
+import numpy as np
+import pytest
+from colour import SDS_ILLUMINANTS
+from colour.temperature import uv_to_CCT_Ohno2013
+
+from beautiful_photometry.batch import SpectrumBatch
+from beautiful_photometry.chromaticity import (
+    C2,
+    XYZ_batch,
+    XYZ_to_uv,
+    XYZ_to_xy,
+    cct,
+    cct_duv_batch,
+    cct_duv_to_uv,
+    duv,
+    get_planckian_table,
+    uv_to_cct_duv,
+)
+from beautiful_photometry.spectrum import reshape, reshape_wavelengths
+
+
+def blackbodies(temperatures):
+    wavelengths = reshape_wavelengths() * 1e-9
+    return wavelengths ** -5 / np.expm1(C2 / np.outer(temperatures, wavelengths))
+
+
+class TestChromaticity:
+    """Test XYZ, CCT and Duv of batches."""
+
+    def test_d65(self):
+        d65 = reshape(SDS_ILLUMINANTS['D65'].copy())
+        np.testing.assert_allclose(XYZ_to_xy(XYZ_batch(d65))[0], [0.3127, 0.3290], atol=5e-4)
+        assert cct(d65) == pytest.approx(6504, abs=5)
+        assert abs(duv(d65)) < 0.005
+
+    def test_blackbodies(self):
+        temperatures = np.array([1500, 2700, 4000, 6500, 10000, 25000])
+        cct_values, duv_values = cct_duv_batch(blackbodies(temperatures))
+        np.testing.assert_allclose(cct_values, temperatures, rtol=1e-5)
+        np.testing.assert_allclose(duv_values, 0, atol=1e-6)
+
+    def test_matches_ohno(self):
+        rng = np.random.default_rng(3)
+        temperatures, table_uv = get_planckian_table()
+        index = rng.integers(200, len(temperatures) - 2000, 50)
+        uv = table_uv[index] + rng.uniform(-0.01, 0.01, (50, 2))
+
+        cct_values, duv_values = uv_to_cct_duv(uv)
+        for i in range(len(uv)):
+            expected = uv_to_CCT_Ohno2013(uv[i])
+            assert cct_values[i] == pytest.approx(expected[0], rel=1e-3)
+            assert duv_values[i] == pytest.approx(expected[1], abs=1e-4)
+
+    def test_undefined(self):
+        values = np.vstack([np.zeros(421), blackbodies([500])[0], blackbodies([4000])[0]])
+        cct_values, duv_values = cct_duv_batch(SpectrumBatch(values))
+        assert np.isnan(cct_values[:2]).all() and np.isnan(duv_values[:2]).all()
+        assert cct_values[2] == pytest.approx(4000, rel=1e-5)
+
+    def test_uv(self):
+        XYZ = np.array([[0.9505, 1.0, 1.089]])
+        u, v = XYZ_to_uv(XYZ)[0]
+        assert u == pytest.approx(4 * 0.9505 / (0.9505 + 15 + 3 * 1.089))
+        assert v == pytest.approx(6 / (0.9505 + 15 + 3 * 1.089))
+
+    def test_cct_duv_to_uv(self):
+        cct = np.array([1800, 2700, 4000, 6500, 20000])
+        duv = np.array([-0.02, -0.005, 0, 0.003, 0.03])
+        cct_values, duv_values = uv_to_cct_duv(cct_duv_to_uv(cct, duv))
+        np.testing.assert_allclose(cct_values, cct, rtol=1e-4)
+        np.testing.assert_allclose(duv_values, duv, atol=1e-6)
@@ -0,0 +1,83 @@
+"""
+Tests for the cri module.
+"""
+
+import os
+
+import numpy as np
+import pytest
+from colour import SDS_ILLUMINANTS
+from colour.quality import colour_rendering_index
+
+from beautiful_photometry.batch import SpectrumBatch
+from beautiful_photometry.cri import (
+    R_VALUES,
+    color_rendering_index,
+    cri_batch,
+    cri_r_values,
+    r_values_batch,
+)
+from beautiful_photometry.metrics import compute_all_metrics
+from beautiful_photometry.photometer import uprtek_import_r_vals
+from beautiful_photometry.r_values import import_r_values
+from beautiful_photometry.spectrum import import_spd, reshape
+
+ILLUMINANTS = ['A', 'D65', 'FL2', 'FL11', 'LED-B3']
+UPRTEK_FILE = os.path.join(os.path.dirname(__file__), '..', 'CSVs', '2019_guangzhou',
+                           'Bridgelux Thrive 4000K.xls')
+
+
+@pytest.fixture
+def batch():
+    spds = [reshape(SDS_ILLUMINANTS[name].copy()) for name in ILLUMINANTS]
+    return SpectrumBatch.from_spds(spds)
+
+
+class TestCRI:
+    """Test the batched CIE 13.3 colour rendering indices."""
+
+    def test_matches_colour(self, batch):
+        indices = r_values_batch(batch)
+        assert indices.shape == (len(ILLUMINANTS), 15)
+        for name, row in zip(ILLUMINANTS, indices):
+            specification = colour_rendering_index(SDS_ILLUMINANTS[name], additional_data=True,
+                                                   method='CIE 2024')
+            expected = [specification.Q_as[i + 1].Q_a for i in range(15)]
+            np.testing.assert_allclose(row, expected, atol=0.05)
+
+    def test_reference_sources(self, batch):
+        results = cri_batch(batch, toround=True)
+        assert results.dtype.names == ('Ra',) + R_VALUES
+        # A and D65 are their own reference illuminants
+        np.testing.assert_allclose(results['Ra'][:2], 100, atol=0.01)
+
+    def test_single_spd(self, batch):
+        spd = batch[2]
+        assert color_rendering_index(spd) == round(cri_batch(batch)['Ra'][2], 2)
+        r_values = cri_r_values(spd)
+        assert list(r_values) == list(R_VALUES)
+        assert r_values['R9'] == round(r_values_batch(batch)[2, 8], 2)
+
+    def test_undefined(self):
+        indices = r_values_batch(SpectrumBatch(np.zeros((1, 421))))
+        assert np.isnan(indices).all()
+
+    def test_metrics(self, batch):
+        results = compute_all_metrics(batch, ['cri_ra', 'cri_r9'])
+        np.testing.assert_allclose(results['cri_ra'], cri_batch(batch, toround=True)['Ra'])
+        np.testing.assert_allclose(results['cri_r9'], cri_batch(batch, toround=True)['R9'])
+
+
+class TestImportRValues:
+    """import_r_values must compute R values for files without them."""
+
+    def test_computed_matches_meter(self, tmp_path):
+        measured = uprtek_import_r_vals(UPRTEK_FILE)
+        spd = import_spd(UPRTEK_FILE, photometer='uprtek')
+        csv = tmp_path / 'spd.csv'
+        np.savetxt(csv, np.column_stack([spd.wavelengths, spd.values]), delimiter=',')
+
+        computed = import_r_values(str(csv))
+        assert list(computed) == list(measured)
+        for key in measured:
+            assert computed[key] == pytest.approx(measured[key], abs=0.2)
@@ -0,0 +1,144 @@
+"""
+Tests for the exposure module.
+"""
+
+import numpy as np
+import pytest
+
+from beautiful_photometry.alpha_opic import alpha_opic_batch
+from beautiful_photometry.exposure import ExposureAccumulator, exposure_levels
+from beautiful_photometry.spectrum import reshape_wavelengths
+
+
+@pytest.fixture
+def stream():
+    # a day sampled every 10 s, with a daylight-like level that rises and falls
+    wavelengths = reshape_wavelengths()
+    shape = np.exp(-0.5 * ((wavelengths - 500) / 80) ** 2) * 0.01
+    times = np.arange(0, 86400, 10.0)
+    scale = np.clip(np.sin(np.pi * (times - 21600) / 43200), 0, None) * 5 + 0.01
+    return times, scale[:, np.newaxis] * shape
+
+
+def feed(accumulator, times, values, chunk):
+    for start in range(0, len(times), chunk):
+        accumulator.update(times[start:start + chunk], values[start:start + chunk])
+
+
+class TestExposureAccumulator:
+    """Streamed integrals must match integrals over the whole series."""
+
+    def test_levels(self, stream):
+        _, values = stream
+        expected = alpha_opic_batch(values[:100])
+        levels = exposure_levels(values[:100])
+        np.testing.assert_allclose(levels[:, 0], expected['melanopic_edi'])
+        np.testing.assert_allclose(levels[:, 1], expected['illuminance'])
+
+    def test_matches_trapezoid(self, stream):
+        times, values = stream
+        accumulator = ExposureAccumulator(photopic_thresholds=(100,))
+        feed(accumulator, times, values, 997)
+        summary = accumulator.summary()
+
+        levels = exposure_levels(values)
+        assert accumulator.samples == len(times)
+        assert summary['duration'] == pytest.approx((times[-1] - times[0]) / 3600)
+        assert summary['melanopic_dose'] == pytest.approx(np.trapezoid(levels[:, 0], times) / 3600)
+        assert summary['photopic_dose'] == pytest.approx(np.trapezoid(levels[:, 1], times) / 3600)
+        mean = (levels[1:, 0] + levels[:-1, 0]) / 2
+        assert summary['melanopic_hours_above'][250] == pytest.approx(10 * np.sum(mean >= 250) / 3600)
+        assert set(summary['photopic_hours_above']) == {100}
+
+    def test_chunking(self, stream):
+        times, values = stream
+        whole = ExposureAccumulator()
+        whole.update(times, values)
+        chunked = ExposureAccumulator()
+        feed(chunked, times, values, 1)
+        np.testing.assert_allclose(chunked.totals, whole.totals)
+        np.testing.assert_allclose(chunked.buckets, whole.buckets)
+
+    def test_window(self, stream):
+        times, values = stream
+        accumulator = ExposureAccumulator(window=3600, resolution=60)
+        feed(accumulator, times, values, 500)
+        window = accumulator.window_summary()
+
+        levels = exposure_levels(values)
+        mids = (times[1:] + times[:-1]) / 2
+        recent = mids >= 86400 - 3600
+        expected = np.sum(10 * (levels[1:, 0] + levels[:-1, 0]) / 2 * recent) / 3600
+        assert window['duration'] == pytest.approx(10 * np.sum(recent) / 3600)
+        assert window['melanopic_dose'] == pytest.approx(expected)
+
+    def test_sparse_samples(self, stream, tmp_path):
+        _, values = stream
+        # a constant 1000 lx, sampled far more sparsely than the window
+        spd = values[:1] * 1000 / exposure_levels(values[:1])[0, 1]
+        accumulator = ExposureAccumulator(window=3600, resolution=60)
+        accumulator.update([0, 10830], np.vstack([spd, spd]))
+        assert accumulator.summary()['duration'] == pytest.approx(10830 / 3600)
+
+        # the window is the 60 buckets ending with that of the last sample, [7260, 10860)
+        window = accumulator.window_summary()
+        assert window['duration'] == pytest.approx(3570 / 3600)
+        assert window['photopic_dose'] == pytest.approx(1000 * 3570 / 3600)
+        assert window['mean_illuminance'] == pytest.approx(1000)
+
+        # resuming with one 100 s step moves the window to [7380, 10980)
+        accumulator.save(tmp_path / 'exposure.npz')
+        resumed = ExposureAccumulator.load(tmp_path / 'exposure.npz')
+        resumed.update([10930], spd)
+        assert resumed.window_summary()['duration'] == pytest.approx(3550 / 3600)
+        assert resumed.summary()['duration'] == pytest.approx(10930 / 3600)
+
+    def test_gaps(self, stream):
+        times, values = stream
+        times = np.where(times >= 43200, times + 7200, times)
+        accumulator = ExposureAccumulator(max_gap=60)
+        accumulator.update(times, values)
+        assert accumulator.summary()['duration'] == pytest.approx((86400 - 20) / 3600)
+
+        # the window restarts after a gap longer than itself
+        assert accumulator.window_summary()['duration'] <= 1
+
+    def test_datetimes(self, stream):
+        times, values = stream
+        seconds = ExposureAccumulator()
+        seconds.update(times[:100], values[:100])
+        datetimes = ExposureAccumulator()
+        datetimes.update(np.datetime64('2024-06-01T00:00:00') + times[:100].astype('timedelta64[s]'), values[:100])
+        assert datetimes.summary() == seconds.summary()
+
+    def test_checkpoint(self, stream, tmp_path):
+        times, values = stream
+        expected = ExposureAccumulator(photopic_thresholds=(50,))
+        expected.update(times, values)
+
+        accumulator = ExposureAccumulator(photopic_thresholds=(50,))
+        accumulator.update(times[:4000], values[:4000])
+        accumulator.save(tmp_path / 'exposure.npz')
+        resumed = ExposureAccumulator.load(tmp_path / 'exposure.npz')
+        resumed.update(times[4000:], values[4000:])
+
+        np.testing.assert_allclose(resumed.totals, expected.totals)
+        assert resumed.summary()['melanopic_hours_above'] == pytest.approx(expected.summary()['melanopic_hours_above'])
+        np.testing.assert_allclose(resumed.buckets, expected.buckets)
+        assert resumed.samples == len(times)
+
+    def test_empty_checkpoint(self, tmp_path):
+        ExposureAccumulator().save(tmp_path / 'exposure.npz')
+        accumulator = ExposureAccumulator.load(tmp_path / 'exposure.npz')
+        assert accumulator.last_time is None and accumulator.bucket is None
+        assert np.isnan(accumulator.summary()['mean_melanopic_edi'])
+
+    def test_errors(self, stream):
+        times, values = stream
+        accumulator = ExposureAccumulator()
+        with pytest.raises(ValueError):
+            accumulator.update(times[::-1][:10], values[:10])
+        with pytest.raises(ValueError):
+            accumulator.update(times[:10], values[:9])
+        with pytest.raises(ValueError):
+            ExposureAccumulator(window=10, resolution=60)
@@ -0,0 +1,87 @@
+"""
+Tests for the filters module.
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from beautiful_photometry.batch import SpectrumBatch
+from beautiful_photometry.filters import FILTER_FIELDS, filter_responses, filter_spectra, filter_table
+from beautiful_photometry.human_circadian import melanopic_photopic_ratio_batch, melanopic_response_batch
+from beautiful_photometry.human_visual import photopic_response_batch, scotopic_photopic_ratio_batch
+from beautiful_photometry.spectrum import import_spd_batch, reshape_wavelengths
+from beautiful_photometry.weighting import channel_responses
+
+FILTERS = os.path.join(os.path.dirname(__file__), '..', 'CSVs', 'filters')
+
+
+@pytest.fixture
+def sources():
+    wavelengths = reshape_wavelengths()
+    rng = np.random.default_rng(0)
+    peaks = rng.uniform(420, 650, (7, 1))
+    values = np.exp(-0.5 * ((wavelengths - peaks) / 40) ** 2) + rng.random((7, 1))
+    return SpectrumBatch(values, names=['source {}'.format(i) for i in range(7)])
+
+
+@pytest.fixture
+def filters():
+    return SpectrumBatch.from_spds(import_spd_batch(FILTERS, printNames=False, normalize=False))
+
+
+class TestFilterTable:
+    """The table must match the metrics of the filtered spectra."""
+
+    def test_matches_filtered_spectra(self, sources, filters):
+        table = filter_table(sources, filters)
+        spds = filter_spectra(sources, filters)
+        shape = (len(sources), len(filters))
+        assert table.shape == shape
+
+        np.testing.assert_allclose(table['photopic_response'], photopic_response_batch(spds, False).reshape(shape))
+        np.testing.assert_allclose(table['melanopic_response'], melanopic_response_batch(spds, False).reshape(shape))
+        np.testing.assert_allclose(table['melanopic_photopic_ratio'],
+                                   melanopic_photopic_ratio_batch(spds, False).reshape(shape))
+        np.testing.assert_allclose(table['scotopic_photopic_ratio'],
+                                   scotopic_photopic_ratio_batch(spds, False).reshape(shape))
+
+    def test_blocking(self, sources, filters):
+        expected = filter_responses(sources, filters)
+        np.testing.assert_allclose(filter_responses(sources, filters, block_size=2), expected)
+        blocked = filter_table(sources, filters, block_size=3)
+        table = filter_table(sources, filters)
+        for field, _ in FILTER_FIELDS:
+            np.testing.assert_allclose(blocked[field], table[field])
+
+    def test_responses(self, sources, filters):
+        spds = filter_spectra(sources, filters)
+        np.testing.assert_allclose(filter_responses(sources, filters).reshape(len(spds), -1),
+                                   channel_responses(spds))
+
+    def test_transmission(self, sources, filters):
+        table = filter_table(sources, filters, toround=True)
+        names = filters.names
+        # no intervention passes everything
+        np.testing.assert_allclose(table['melanopic_transmission'][:, names.index('no_intervention')], 1)
+        # the orange filters block most of the melanopic response
+        assert np.all(table['melanopic_transmission'][:, names.index('uvex_sct_orange')] < 0.5)
+        assert np.all(table['melanopic_transmission'] <= table['photopic_transmission'] + 0.01)
+
+    def test_absolute_transmission(self, sources, filters):
+        # the filter files peak below 1, which normalizing would hide
+        gamma_ray = filters.values[filters.names.index('gamma_ray_computer_yellow')]
+        assert gamma_ray.max() == pytest.approx(0.895, abs=0.01)
+
+        table = filter_table(sources, filters)
+        assert np.all(table['photopic_transmission'][:, filters.names.index('gamma_ray_computer_yellow')] < 0.9)
+
+    def test_spectra_names(self, sources, filters):
+        spds = filter_spectra(sources, filters)
+        assert len(spds) == len(sources) * len(filters)
+        assert spds.names[1] == 'source 0 / {}'.format(filters.names[1])
+
+    def test_block_size(self, sources, filters):
+        with pytest.raises(ValueError):
+            filter_table(sources, filters, block_size=0)
@@ -0,0 +1,123 @@
+"""
+Tests for the frames module.
+"""
+
+import numpy as np
+import pytest
+from colour import SpectralDistribution
+
+from beautiful_photometry.frames import FrameAccumulator, accumulate_frames
+from beautiful_photometry.spectrum import reshape_wavelengths
+
+
+@pytest.fixture
+def captures():
+    # repeated noisy frames of one source on a large offset, and dark frames
+    rng = np.random.default_rng(0)
+    wavelengths = reshape_wavelengths()
+    shape = 1e6 + np.exp(-0.5 * ((wavelengths - 550) / 40) ** 2)
+    frames = shape + rng.normal(0, 0.01, (500, len(wavelengths)))
+    darks = 0.2 + rng.normal(0, 0.005, (40, len(wavelengths)))
+    return frames, darks
+
+
+def write_frames(directory, values):
+    directory.mkdir()
+    for i, row in enumerate(values):
+        np.savetxt(directory / 'frame{:03d}.csv'.format(i), np.column_stack([reshape_wavelengths(), row]),
+                   delimiter=',')
+
+
+class TestFrameAccumulator:
+    """Streamed statistics must match statistics over all frames at once."""
+
+    @pytest.mark.parametrize('chunk', [1, 7, 500])
+    def test_matches_numpy(self, captures, chunk):
+        frames, _ = captures
+        accumulator = FrameAccumulator()
+        for start in range(0, len(frames), chunk):
+            accumulator.update(frames[start:start + chunk])
+
+        assert accumulator.count == len(frames)
+        np.testing.assert_allclose(accumulator.mean, frames.mean(axis=0), rtol=1e-12)
+        np.testing.assert_allclose(accumulator.variance, frames.var(axis=0, ddof=1), rtol=1e-6)
+        np.testing.assert_array_equal(accumulator.minimum, frames.min(axis=0))
+        np.testing.assert_array_equal(accumulator.maximum, frames.max(axis=0))
+        np.testing.assert_allclose(accumulator.uncertainty, frames.std(axis=0, ddof=1) / np.sqrt(len(frames)),
+                                   rtol=1e-6)
+
+    def test_dark_subtraction(self, captures):
+        frames, darks = captures
+        dark = FrameAccumulator()
+        dark.update(darks)
+        accumulator = FrameAccumulator(dark)
+        accumulator.update(frames)
+
+        np.testing.assert_allclose(accumulator.mean, frames.mean(axis=0) - darks.mean(axis=0), rtol=1e-12)
+        np.testing.assert_allclose(accumulator.minimum, (frames - darks.mean(axis=0)).min(axis=0), rtol=1e-12)
+        # the uncertainties of the frames and of the dark add in quadrature
+        expected = np.sqrt(frames.var(axis=0, ddof=1) / len(frames) + darks.var(axis=0, ddof=1) / len(darks))
+        np.testing.assert_allclose(accumulator.uncertainty, expected, rtol=1e-6)
+
+        # a single dark SPD is exact
+        spd = SpectralDistribution(darks[0], reshape_wavelengths())
+        accumulator = FrameAccumulator(spd)
+        accumulator.update(frames)
+        np.testing.assert_allclose(accumulator.mean, frames.mean(axis=0) - darks[0], rtol=1e-12)
+        np.testing.assert_allclose(accumulator.uncertainty, frames.std(axis=0, ddof=1) / np.sqrt(len(frames)),
+                                   rtol=1e-6)
+
+    def test_average(self, captures):
+        frames, _ = captures
+        accumulator = FrameAccumulator()
+        with pytest.raises(ValueError):
+            accumulator.average()
+
+        accumulator.update(frames[0])
+        spd, uncertainty = accumulator.average('LED')
+        assert spd.name == 'LED'
+        np.testing.assert_array_equal(spd.wavelengths, reshape_wavelengths())
+        np.testing.assert_array_equal(spd.values, frames[0])
+        assert np.all(np.isnan(uncertainty))
+
+    def test_invalid_arguments(self, captures):
+        frames, darks = captures
+        with pytest.raises(ValueError):
+            FrameAccumulator(darks)
+        with pytest.raises(ValueError):
+            FrameAccumulator(FrameAccumulator())
+
+        accumulator = FrameAccumulator()
+        accumulator.update(frames[:2])
+        with pytest.raises(ValueError):
+            accumulator.update(frames[:2, :100])
+
+
+class TestAccumulateFrames:
+    """Frames must be streamed from files without normalizing them."""
+
+    def test_directory(self, captures, tmp_path):
+        frames, darks = captures
+        frames, darks = frames[:30] - 1e6, darks[:5]
+        write_frames(tmp_path / 'led', frames)
+        write_frames(tmp_path / 'dark', darks)
+
+        accumulator = accumulate_frames(str(tmp_path / 'led'), dark=str(tmp_path / 'dark'), method='linear',
+                                        chunk_size=8)
+        assert accumulator.count == len(frames)
+        np.testing.assert_allclose(accumulator.mean, frames.mean(axis=0) - darks.mean(axis=0), atol=1e-12)
+        expected = np.sqrt(frames.var(axis=0, ddof=1) / len(frames) + darks.var(axis=0, ddof=1) / len(darks))
+        np.testing.assert_allclose(accumulator.uncertainty, expected, rtol=1e-6)
+
+        paths = [str(tmp_path / 'led' / 'frame{:03d}.csv'.format(i)) for i in range(3)]
+        accumulator = accumulate_frames(paths, method='linear')
+        np.testing.assert_allclose(accumulator.mean, frames[:3].mean(axis=0), atol=1e-12)
+        # without a method, each frame is reshaped by colour
+        accumulator = accumulate_frames(paths[0])
+        np.testing.assert_allclose(accumulator.mean, frames[0], atol=1e-9)
+
+    def test_empty_directory(self, tmp_path):
+        with pytest.raises(ValueError):
+            accumulate_frames(str(tmp_path))
+        with pytest.raises(ValueError):
+            accumulate_frames(str(tmp_path), chunk_size=0)
@@ -0,0 +1,98 @@
+"""
+Tests for the metrics module.
+"""
+
+import numpy as np
+import pytest
+
+from beautiful_photometry.batch import SpectrumBatch
+from beautiful_photometry.chromaticity import cct, duv
+from beautiful_photometry.cli import print_metrics
+from beautiful_photometry.human_circadian import (
+    melanopic_ratio,
+    melanopic_response,
+    melanopic_photopic_ratio,
+    spectral_g_index,
+)
+from beautiful_photometry.human_visual import scotopic_photopic_ratio
+from beautiful_photometry import metrics as metrics_module
+from beautiful_photometry.metrics import (
+    DEFAULT_METRICS,
+    METRICS,
+    compute_all_metrics,
+    metrics_to_dicts,
+    register_metric,
+)
+
+
+@pytest.fixture
+def batch():
+    rng = np.random.default_rng(7)
+    return SpectrumBatch(rng.random((4, 421)) + 0.1, names=['a', 'bb', 'ccc', 'dddd'])
+
+
+class TestComputeAllMetrics:
+    """compute_all_metrics must match the single-SPD metric functions."""
+
+    def test_defaults(self, batch):
+        results = compute_all_metrics(batch)
+        assert results.dtype.names == ('name',) + DEFAULT_METRICS
+        assert results['name'].tolist() == batch.names
+
+        for record, spd in zip(metrics_to_dicts(results), batch):
+            assert record == {
+                'name': spd.name,
+                'melanopic_ratio': melanopic_ratio(spd),
+                'melanopic_response': melanopic_response(spd),
+                'scotopic_photopic_ratio': scotopic_photopic_ratio(spd),
+                'melanopic_photopic_ratio': melanopic_photopic_ratio(spd),
+                'cct': cct(spd),
+                'duv': duv(spd),
+            }
+
+    def test_undefined_results(self):
+        dark = SpectrumBatch(np.zeros((1, 421)), names=['dark'])
+        record = metrics_to_dicts(compute_all_metrics(dark, ['cct', 'duv']))[0]
+        assert record == {'name': 'dark', 'cct': None, 'duv': None}
+
+    def test_print_undefined_and_rounded(self, batch, capsys):
+        dark = SpectrumBatch(np.zeros((1, 421)), names=['dark'])
+        print_metrics(metrics_to_dicts(compute_all_metrics(dark))[0])
+        output = capsys.readouterr().out
+        assert '  CCT: n/a\n' in output and '  Duv: n/a\n' in output
+
+        record = metrics_to_dicts(compute_all_metrics(batch, toround=False))[0]
+        print_metrics(record)
+        assert '  Duv: {:.4f}\n'.format(record['duv']) in capsys.readouterr().out
+
+    def test_selection_and_order(self, batch):
+        results = compute_all_metrics(batch, ['spectral_g_index', 'melanopic_ratio'], toround=False)
+        assert results.dtype.names == ('name', 'spectral_g_index', 'melanopic_ratio')
+        np.testing.assert_allclose(results['spectral_g_index'], [spectral_g_index(spd) for spd in batch])
+
+    def test_single_spd(self, batch):
+        results = compute_all_metrics(batch[2])
+        assert results.shape == (1,)
+        assert results['name'][0] == 'ccc'
+
+    def test_shared_intermediates(self, batch, monkeypatch):
+        calls = []
+        original = metrics_module.channel_responses
+
+        def counting(values):
+            calls.append(values.shape)
+            return original(values)
+
+        monkeypatch.setattr(metrics_module, 'channel_responses', counting)
+        compute_all_metrics(batch, list(METRICS))
+        assert calls == [(4, 421)]
+
+    def test_unknown_metric(self, batch):
+        with pytest.raises(ValueError):
+            compute_all_metrics(batch, ['melanopic_ratio', 'nope'])
+
+    def test_register_metric(self, batch, monkeypatch):
+        monkeypatch.setitem(METRICS, 'peak', None)
+        register_metric('peak', lambda values, context: values.max(axis=1), digits=None)
+        results = compute_all_metrics(batch, ['peak'])
+        assert results['peak'].dtype.kind == 'i'
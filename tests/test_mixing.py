@@ -0,0 +1,67 @@
+"""
+Tests for the mixing module.
+"""
+
+import numpy as np
+import pytest
+
+from beautiful_photometry.batch import SpectrumBatch
+from beautiful_photometry.chromaticity import cct_duv_batch
+from beautiful_photometry.human_circadian import melanopic_ratio_batch, melanopic_response_batch
+from beautiful_photometry.human_visual import photopic_response_batch, scotopic_photopic_ratio_batch
+from beautiful_photometry.mixing import MIX_FIELDS, ChannelMixer, drive_level_grid
+from beautiful_photometry.spectrum import reshape_wavelengths
+
+
+@pytest.fixture
+def channels():
+    # blue, green, amber and red LED-like channels
+    wavelengths = reshape_wavelengths()
+    peaks = np.array([[450], [530], [590], [630]])
+    values = np.exp(-0.5 * ((wavelengths - peaks) / 15) ** 2)
+    return SpectrumBatch(values, names=['blue', 'green', 'amber', 'red'])
+
+
+class TestChannelMixer:
+    """Mixed metrics must match the metrics of the mixed spectra."""
+
+    def test_matches_mixed_spectra(self, channels):
+        mixer = ChannelMixer(channels)
+        drive_levels = np.random.default_rng(1).random((50, 4))
+        results = mixer.evaluate(drive_levels)
+        spds = mixer.mix(drive_levels)
+
+        np.testing.assert_allclose(results['photopic_response'], photopic_response_batch(spds, False))
+        np.testing.assert_allclose(results['melanopic_response'], melanopic_response_batch(spds, False))
+        np.testing.assert_allclose(results['melanopic_ratio'], melanopic_ratio_batch(spds, False))
+        np.testing.assert_allclose(results['scotopic_photopic_ratio'],
+                                   scotopic_photopic_ratio_batch(spds, False))
+        cct, duv = cct_duv_batch(spds)
+        np.testing.assert_allclose(results['cct'], cct)
+        np.testing.assert_allclose(results['duv'], duv, atol=1e-12)
+
+    def test_rounding_and_fields(self, channels):
+        results = ChannelMixer(channels).evaluate([0.2, 0.5, 0.8, 1.0], toround=True)
+        assert results.dtype.names == tuple(field for field, _ in MIX_FIELDS)
+        assert results['melanopic_ratio'][0] == round(results['melanopic_ratio'][0], 2)
+
+    def test_off(self, channels):
+        results = ChannelMixer(channels).evaluate(np.zeros(4))
+        assert results['photopic_response'][0] == 0
+        assert np.isnan(results['melanopic_ratio'][0]) and np.isnan(results['cct'][0])
+
+    def test_shape_checks(self, channels):
+        mixer = ChannelMixer(channels)
+        assert len(mixer) == 4 and mixer.names == channels.names
+        with pytest.raises(ValueError):
+            mixer.evaluate(np.ones((3, 5)))
+        with pytest.raises(ValueError):
+            ChannelMixer(channels, names=['a'])
+
+    def test_drive_level_grid(self):
+        grid = drive_level_grid(3, 5)
+        assert grid.shape == (125, 3)
+        np.testing.assert_allclose(grid[:2], [[0, 0, 0], [0, 0, 0.25]])
+        assert len(np.unique(grid, axis=0)) == 125
+        with pytest.raises(ValueError):
+            drive_level_grid(3, 1)
@@ -0,0 +1,87 @@
+"""
+Tests for the optimize module.
+"""
+
+import numpy as np
+import pytest
+
+from beautiful_photometry.cri import color_rendering_index
+from beautiful_photometry.chromaticity import cct_duv_batch
+from beautiful_photometry.mixing import ChannelMixer
+from beautiful_photometry.optimize import optimize_mix, optimize_schedule
+from beautiful_photometry.spectrum import reshape_wavelengths
+
+
+@pytest.fixture
+def mixer():
+    wavelengths = reshape_wavelengths()
+
+    def band(peak, width):
+        return np.exp(-0.5 * ((wavelengths - peak) / width) ** 2)
+
+    return ChannelMixer(np.vstack([band(450, 10), band(495, 15), 0.6 * band(450, 10) + band(560, 45),
+                                   band(590, 8), band(630, 10)]),
+                        names=['blue', 'cyan', 'white', 'amber', 'red'])
+
+
+class TestOptimizeMix:
+    """The optimizer must meet its constraints and order its objectives."""
+
+    def test_chromaticity_target(self, mixer):
+        solution = optimize_mix(mixer, 3000, duv=0.002, seed=0)
+        assert solution['feasible']
+        cct, duv = cct_duv_batch(mixer.mix(solution['drive_levels']))
+        assert cct[0] == pytest.approx(3000, rel=0.05)
+        assert duv[0] == pytest.approx(0.002, abs=0.0025)
+        assert np.all((solution['drive_levels'] >= 0) & (solution['drive_levels'] <= 1))
+
+    def test_maximize_and_minimize(self, mixer):
+        high = optimize_mix(mixer, 4000, maximize=True, seed=0)
+        low = optimize_mix(mixer, 4000, maximize=False, seed=0)
+        assert high['feasible'] and low['feasible']
+        assert high['melanopic_photopic_ratio'] > low['melanopic_photopic_ratio'] + 0.05
+
+    def test_lumens_and_ra(self, mixer):
+        channel_lumens = [10, 40, 300, 60, 20]
+        solution = optimize_mix(mixer, 3500, maximize=False, min_lumens=150, channel_lumens=channel_lumens,
+                                ra_min=85, seed=0)
+        assert solution['feasible']
+        assert solution['drive_levels'] @ channel_lumens >= 150
+        assert color_rendering_index(mixer.mix(solution['drive_levels'])[0], False) >= 85
+        assert solution['ra'] >= 85
+
+    def test_infeasible(self, mixer):
+        solution = optimize_mix(mixer, 6500, min_lumens=1e6, seed=0)
+        assert not solution['feasible']
+
+    def test_population(self, mixer):
+        with pytest.raises(ValueError):
+            optimize_mix(mixer, 3000, population=1)
+
+
+class TestOptimizeSchedule:
+    """optimize_schedule must solve every point, warm starting each from the last."""
+
+    def test_schedule(self, mixer):
+        cct = np.linspace(2700, 5000, 12)
+        results = optimize_schedule(mixer, cct, maximize=False, toround=True, seed=0)
+        assert results['feasible'].all()
+        np.testing.assert_array_equal(results['cct'], cct)
+        assert results['drive_levels'].shape == (12, 5)
+        # lower CCTs allow lower M/P ratios
+        assert results['melanopic_photopic_ratio'][0] < results['melanopic_photopic_ratio'][-1]
+
+    def test_warm_starts_converge_faster(self, mixer, monkeypatch):
+        iterations = []
+        original = optimize_mix
+
+        def counting(*args, **kwargs):
+            solution = original(*args, **kwargs)
+            iterations.append((kwargs.get('start') is not None, solution['iterations']))
+            return solution
+
+        monkeypatch.setattr('beautiful_photometry.optimize.optimize_mix', counting)
+        optimize_schedule(mixer, np.linspace(3000, 3500, 6), maximize=False, seed=0)
+        cold = [count for warm, count in iterations if not warm]
+        warm = [count for warm, count in iterations if warm]
+        assert len(cold) == 1 and np.mean(warm) < cold[0]
@@ -0,0 +1,63 @@
+"""
+Tests for the photometer module.
+"""
+
+import os
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from beautiful_photometry.photometer import (
+    UprtekMeasurement,
+    uprtek_file_import,
+    uprtek_import,
+    uprtek_import_r_vals,
+    uprtek_import_spectrum,
+)
+
+CSVS = os.path.join(os.path.dirname(__file__), '..', 'CSVs')
+CV600_FILE = os.path.join(CSVS, '2019_guangzhou', 'Bridgelux Thrive 4000K.xls')
+MK350_FILE = os.path.join(CSVS, 'shawn.xls')
+
+
+class TestUprtekImport:
+    """One read must give the spectrum, R values and header of both layouts."""
+
+    def test_cv600(self):
+        measurement = uprtek_import(CV600_FILE)
+        assert isinstance(measurement, UprtekMeasurement)
+        assert measurement.model == 'CV600'
+        assert measurement.serial == '16K00407'
+        assert measurement.time == datetime(2017, 1, 20, 8, 40, 19)
+        assert measurement.lux == pytest.approx(249747.28125)
+        assert measurement.cct == 4166
+        assert measurement.duv == pytest.approx(0.000508)
+        assert measurement.integration_time == 100
+        assert measurement.header['CRI'] == pytest.approx(98.254845)
+        assert measurement.header['Memo'] == ''
+
+        np.testing.assert_array_equal(measurement.wavelengths, np.arange(380, 781))
+        assert measurement.values[0] == pytest.approx(17.028198)
+        assert list(measurement.r_values) == ['R{}'.format(i) for i in range(1, 16)]
+        assert measurement.r_values['R1'] == pytest.approx(98.702217)
+
+    def test_mk350(self):
+        measurement = uprtek_import(MK350_FILE)
+        assert measurement.model == 'MK350NPLUS'
+        assert measurement.integration_time == 452
+        assert measurement.header['S/P'] == pytest.approx(0.905443)
+        assert measurement.r_values['R15'] == pytest.approx(83.728302)
+        assert measurement.wavelengths[0] == 380
+        assert len(measurement.values) == len(measurement.wavelengths)
+
+    def test_views(self):
+        measurement = uprtek_import(CV600_FILE)
+        spectrum = uprtek_import_spectrum(CV600_FILE)
+        assert spectrum == measurement.spectrum() == uprtek_file_import(CV600_FILE, 'spd')
+        assert list(spectrum)[:2] == [380, 381]
+        assert uprtek_import_r_vals(CV600_FILE) == measurement.r_values == uprtek_file_import(CV600_FILE, 'r_vals')
+
+    def test_not_uprtek(self):
+        with pytest.raises(ValueError):
+            uprtek_import(os.path.join(CSVS, 'incandescent.csv'))
@@ -0,0 +1,116 @@
+"""
+Tests for the readers module.
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from beautiful_photometry.photometer import uprtek_import
+from beautiful_photometry.readers import READERS, detect_format, read_spectrum, register_reader
+from beautiful_photometry.spectrum import import_spd, import_spd_batch
+
+CSVS = os.path.join(os.path.dirname(__file__), '..', 'CSVs')
+UPRTEK_FILE = os.path.join(CSVS, '2019_guangzhou', 'Bridgelux Thrive 4000K.xls')
+CSV_FILE = os.path.join(CSVS, 'incandescent.csv')
+
+
+class TestDetectFormat:
+    """Formats must be recognized from the first bytes alone."""
+
+    def test_repo_files(self):
+        assert detect_format(UPRTEK_FILE) == 'uprtek'
+        assert detect_format(CSV_FILE) == 'csv'
+        # with a UTF-8 byte order mark
+        assert detect_format(os.path.join(CSVS, 'filters', 'uvex_sct_orange.csv')) == 'csv'
+
+    def test_headers_and_tabs(self, tmp_path):
+        path = tmp_path / 'header.csv'
+        path.write_text('Wavelength,Intensity\n380,0.1\n381,0.2\n')
+        assert detect_format(path) == 'csv'
+        path = tmp_path / 'spectrum.txt'
+        path.write_text('380\t0.1\n381\t0.2\n')
+        assert detect_format(path) == 'tsv'
+
+    def test_multi_line_header(self, tmp_path):
+        path = tmp_path / 'units.csv'
+        path.write_text('Wavelength,Intensity\nnm,W\n380,0.1\n381,0.2\n')
+        assert detect_format(path) == 'csv'
+        np.testing.assert_array_equal(read_spectrum(path, 'auto')[0], [380, 381])
+
+    def test_truncated_last_line(self, tmp_path):
+        # the only numeric row is cut off by the prefix, so it is not trusted
+        path = tmp_path / 'long_header.csv'
+        path.write_text('x' * 500 + '\n380,0.1234567890123\n')
+        with pytest.raises(ValueError):
+            detect_format(path)
+
+    def test_sniffs_prefix_only(self, tmp_path):
+        # a file whose only valid rows are beyond the sniffed prefix is not recognized
+        path = tmp_path / 'unknown.txt'
+        path.write_text('x' * 1000 + '\n380,0.1\n')
+        with pytest.raises(ValueError):
+            detect_format(path)
+
+
+class TestReadSpectrum:
+    """Each reader must give the arrays import_spd always imported."""
+
+    def test_uprtek(self):
+        wavelengths, values = read_spectrum(UPRTEK_FILE, 'auto')
+        measurement = uprtek_import(UPRTEK_FILE)
+        np.testing.assert_array_equal(wavelengths, measurement.wavelengths)
+        np.testing.assert_array_equal(values, measurement.values)
+
+    def test_csv_aliases(self):
+        expected = read_spectrum(CSV_FILE, 'csv')
+        for photometer in (None, 'none', 'auto'):
+            np.testing.assert_array_equal(read_spectrum(CSV_FILE, photometer)[1], expected[1])
+
+    def test_tsv(self, tmp_path):
+        path = tmp_path / 'spectrum.txt'
+        path.write_text('nm\tvalue\n380.4\t0.1\n381\t0.2\n382\t0.3\n')
+        wavelengths, values = read_spectrum(path, 'auto')
+        # fractional wavelengths are dropped, as by the original importer
+        np.testing.assert_array_equal(wavelengths, [381, 382])
+        np.testing.assert_array_equal(values, [0.2, 0.3])
+
+    def test_unknown(self):
+        with pytest.raises(ValueError):
+            read_spectrum(CSV_FILE, 'spectrawiz')
+
+    def test_register(self, tmp_path):
+        path = tmp_path / 'meter.txt'
+        path.write_text('METER v1\n' + ''.join('{};1.5\n'.format(nm) for nm in range(380, 400)))
+
+        def read(filename):
+            data = np.loadtxt(filename, delimiter=';', skiprows=1)
+            return data[:, 0], data[:, 1]
+
+        register_reader('meter', lambda prefix: prefix.startswith(b'METER'), read)
+        try:
+            assert detect_format(path) == 'meter'
+            assert import_spd(str(path), photometer='auto').values[20] == 1.5
+        finally:
+            del READERS['meter']
+
+
+class TestAutoImport:
+    """photometer='auto' must import mixed directories as the explicit photometers do."""
+
+    def test_import_spd(self):
+        np.testing.assert_array_equal(import_spd(UPRTEK_FILE, photometer='auto').values,
+                                      import_spd(UPRTEK_FILE, photometer='uprtek').values)
+        np.testing.assert_array_equal(import_spd(CSV_FILE, photometer='auto').values,
+                                      import_spd(CSV_FILE).values)
+
+    def test_mixed_directory(self, tmp_path):
+        for source in (UPRTEK_FILE, CSV_FILE):
+            with open(source, 'rb') as f:
+                (tmp_path / os.path.basename(source)).write_bytes(f.read())
+
+        spds = import_spd_batch(str(tmp_path), photometer='auto', printNames=False)
+        assert sorted(spds) == ['Bridgelux Thrive 4000K', 'incandescent']
+        np.testing.assert_allclose(spds['incandescent'].values,
+                                   import_spd(CSV_FILE, normalize=True).values)
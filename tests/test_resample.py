@@ -0,0 +1,162 @@
+"""
+Tests for the resample module.
+"""
+
+import numpy as np
+import pytest
+from colour import SpectralDistribution
+
+from beautiful_photometry.batch import SpectrumBatch
+from beautiful_photometry.readers import read_spectrum
+from beautiful_photometry.resample import (
+    RESAMPLE_TOLERANCE,
+    binning_matrix,
+    resample,
+    resampling_matrix,
+)
+from beautiful_photometry.spectrum import import_spd, import_spd_batch, reshape, reshape_wavelengths
+
+GRIDS = {
+    'uprtek': np.arange(380, 781, 1.0),
+    'coarse': np.arange(380, 781, 5.0),
+    'wide': np.arange(300, 831, 2.0),
+    'off-grid': np.arange(380.5, 779.6, 1.0),
+    'non-uniform': np.sort(np.random.default_rng(0).uniform(350, 800, 300)),
+}
+
+# A 3648-pixel array spectrometer with a quadratic pixel-to-wavelength calibration
+PIXELS = np.arange(3648)
+SPECTROMETER = 340 + 0.19 * PIXELS - 5e-6 * PIXELS ** 2
+
+
+def band_integral(values, wavelengths, low, high):
+    """Integrates values that stand for the bands between the midpoints of their wavelengths."""
+    midpoints = (wavelengths[1:] + wavelengths[:-1]) / 2
+    edges = np.concatenate([[2 * wavelengths[0] - midpoints[0]], midpoints, [2 * wavelengths[-1] - midpoints[-1]]])
+    overlap = np.clip(np.minimum(edges[1:], high) - np.maximum(edges[:-1], low), 0, None)
+    return values @ overlap
+
+
+@pytest.mark.parametrize('grid', GRIDS.keys())
+def test_colour_method_matches_reshape(grid):
+    wavelengths = GRIDS[grid]
+    values = np.random.default_rng(1).random((3, len(wavelengths)))
+
+    resampled = resample(values, wavelengths, reshape_wavelengths())
+    for row, expected in zip(resampled, values):
+        spd = reshape(SpectralDistribution(expected, wavelengths))
+        np.testing.assert_array_equal(spd.wavelengths, reshape_wavelengths())
+        assert np.abs(row - spd.values).max() <= RESAMPLE_TOLERANCE * np.abs(expected).max()
+
+
+def test_linear_method_matches_interp():
+    wavelengths = GRIDS['coarse']
+    values = np.random.default_rng(2).random(len(wavelengths))
+    target = reshape_wavelengths()
+
+    np.testing.assert_allclose(
+        resample(values, wavelengths, target, 'linear'),
+        np.interp(target, wavelengths, values))
+
+
+def test_matrix_is_cached_and_read_only():
+    a = resampling_matrix(GRIDS['uprtek'], reshape_wavelengths(), 'linear')
+    b = resampling_matrix(GRIDS['uprtek'].copy(), reshape_wavelengths(), 'linear')
+    assert a is b
+    assert not a.flags.writeable
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        resampling_matrix(GRIDS['uprtek'], reshape_wavelengths(), 'nearest')
+    with pytest.raises(ValueError):
+        resampling_matrix(GRIDS['uprtek'][::-1], reshape_wavelengths())
+    with pytest.raises(ValueError):
+        resample(np.ones(10), GRIDS['uprtek'], reshape_wavelengths())
+
+
+def test_reshape_method():
+    spd = SpectralDistribution(np.linspace(0, 1, 81), GRIDS['coarse'], name='ramp')
+    reshaped = reshape(spd, method='linear')
+    assert reshaped.name == 'ramp'
+    np.testing.assert_array_equal(reshaped.wavelengths, reshape_wavelengths())
+    assert reshaped[380] == pytest.approx(0) and reshaped[780] == pytest.approx(1)
+
+
+def test_batch_from_spds_method():
+    rng = np.random.default_rng(3)
+    spds = [SpectralDistribution(rng.random(len(GRIDS[grid])), GRIDS[grid], name=grid)
+            for grid in ('uprtek', 'coarse', 'uprtek')]
+
+    expected = SpectrumBatch.from_spds(spds)
+    batch = SpectrumBatch.from_spds(spds, method='colour')
+    assert batch.names == expected.names
+    np.testing.assert_allclose(batch.values, expected.values, atol=RESAMPLE_TOLERANCE)
+
+
+class TestBinMethod:
+    """The 'bin' method must conserve energy and lose no sub-nm samples."""
+
+    def test_conserves_energy(self):
+        values = np.random.default_rng(4).random((3, len(SPECTROMETER)))
+        target = reshape_wavelengths()
+        binned = resample(values, SPECTROMETER, target, 'bin')
+
+        # the 1 nm bands of the grid cover [359.5, 780.5]
+        np.testing.assert_allclose(binned.sum(axis=1), band_integral(values, SPECTROMETER, 359.5, 780.5))
+        # and every band on its own
+        np.testing.assert_allclose(binned[:, 100], band_integral(values, SPECTROMETER, 459.5, 460.5))
+
+    def test_same_grid_is_identity(self):
+        values = np.random.default_rng(5).random(len(reshape_wavelengths()))
+        np.testing.assert_allclose(resample(values, reshape_wavelengths(), reshape_wavelengths(), 'bin'), values)
+
+    def test_outside_source_is_zero(self):
+        # the 5 nm bands of the source cover [377.5, 782.5]
+        binned = resample(np.ones(81), GRIDS['coarse'], reshape_wavelengths(), 'bin')
+        assert np.all(binned[:18] == 0)
+        np.testing.assert_allclose(binned[18:], 1)
+
+    def test_sparse_matches_dense(self):
+        values = np.random.default_rng(6).random((4, len(SPECTROMETER)))
+        target = reshape_wavelengths()
+        data, indices, indptr = binning_matrix(SPECTROMETER, target)
+        assert len(data) < 2 * (len(SPECTROMETER) + len(target))
+        assert not data.flags.writeable
+        assert binning_matrix(SPECTROMETER.copy(), target)[0] is data
+
+        np.testing.assert_allclose(resample(values, SPECTROMETER, target, 'bin'),
+                                   values @ resampling_matrix(SPECTROMETER, target, 'bin').T)
+        np.testing.assert_allclose(resample(values[0], SPECTROMETER, target, 'bin'),
+                                   resample(values, SPECTROMETER, target, 'bin')[0])
+
+    def test_invalid_target(self):
+        with pytest.raises(ValueError):
+            binning_matrix(SPECTROMETER, reshape_wavelengths()[::-1])
+
+    def test_import_keeps_sub_nm_samples(self, tmp_path):
+        rng = np.random.default_rng(7)
+        spectra = rng.random((3, len(SPECTROMETER)))
+        for i, values in enumerate(spectra):
+            np.savetxt(tmp_path / 'pixel{}.csv'.format(i), np.column_stack([SPECTROMETER, values]), delimiter=',')
+
+        wavelengths, values = read_spectrum(tmp_path / 'pixel0.csv', truncate=False)
+        np.testing.assert_allclose(wavelengths, SPECTROMETER)
+        # truncated to whole nanometres, most of the samples overwrite one another
+        assert len(read_spectrum(tmp_path / 'pixel0.csv')[0]) < len(SPECTROMETER) / 4
+
+        spd = import_spd(str(tmp_path / 'pixel0.csv'), method='bin')
+        np.testing.assert_array_equal(spd.wavelengths, reshape_wavelengths())
+        np.testing.assert_allclose(spd.values, resample(spectra[0], SPECTROMETER, reshape_wavelengths(), 'bin'))
+
+        # the files share a calibration, so every file is binned with the same cached matrix
+        spds = import_spd_batch(str(tmp_path), method='bin', printNames=False)
+        expected = resample(spectra / spectra.max(axis=1, keepdims=True), SPECTROMETER, reshape_wavelengths(), 'bin')
+        for i, row in enumerate(expected):
+            np.testing.assert_allclose(spds['pixel{}'.format(i)].values, row)
+
+    def test_batch_shares_one_matrix(self):
+        values = np.random.default_rng(8).random((3, len(SPECTROMETER)))
+        spds = [SpectralDistribution(row, SPECTROMETER, name=str(i)) for i, row in enumerate(values)]
+        batch = SpectrumBatch.from_spds(spds, method='bin')
+        np.testing.assert_allclose(batch.values, resample(values, SPECTROMETER, reshape_wavelengths(), 'bin'))
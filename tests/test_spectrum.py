@@ -5,8 +5,11 @@ Tests for the spectrum module.
 import pytest
 import tempfile
 import os
+import threading
 from pathlib import Path
 
+import numpy as np
+
 from beautiful_photometry.spectrum import (
     import_spectral_csv,
     normalize_spd,
@@ -14,7 +17,18 @@ from beautiful_photometry.spectrum import (
     create_colour_spd,
     reshape,
     import_spd,
+    ReferenceSpectrumRegistry,
+    get_reference_spectrum,
+    parse_spectral_csv,
+    read_spectral_csv,
+    truncate_wavelengths,
+    find_spectral_files,
+    import_spd_batch,
+    iter_spds,
+    iter_spd_chunks,
+    reshape_wavelengths,
 )
+from beautiful_photometry.human_circadian import melanopic_response_batch
 
 
 class TestSpectrumFunctions:
@@ -98,6 +112,141 @@ class TestSpectrumFunctions:
         assert spd.values[0] == 1.0  # 0.5 * 2.0
 
 
+class TestSpectralCsvParser:
+    """Test the vectorized spectral CSV parser."""
+
+    def test_read_arrays(self, tmp_path):
+        csv_file = tmp_path / "test.csv"
+        csv_file.write_text("380.5,0.5\n381.0,1.0\n381.5,0.8\n")
+
+        wavelengths, values = read_spectral_csv(str(csv_file))
+        np.testing.assert_array_equal(wavelengths, [380.5, 381.0, 381.5])
+        np.testing.assert_array_equal(values, [0.5, 1.0, 0.8])
+
+    def test_header_and_malformed_lines(self, tmp_path):
+        csv_file = tmp_path / "test.csv"
+        csv_file.write_text("Wavelength,Intensity\n380,0.5\n\n381\nbad,row\n382,0.8,extra\n")
+
+        wavelengths, values = read_spectral_csv(str(csv_file))
+        np.testing.assert_array_equal(wavelengths, [380, 382])
+        np.testing.assert_array_equal(values, [0.5, 0.8])
+
+        assert import_spectral_csv(str(csv_file)) == {380: 0.5, 382: 0.8}
+
+    def test_empty(self, tmp_path):
+        csv_file = tmp_path / "empty.csv"
+        csv_file.write_text("")
+        wavelengths, values = read_spectral_csv(str(csv_file))
+        assert wavelengths.size == 0 and values.size == 0
+
+        wavelengths, values = parse_spectral_csv("just,a header\n")
+        assert wavelengths.size == 0 and values.size == 0
+
+    def test_truncate_wavelengths(self):
+        wavelengths, values = truncate_wavelengths(
+            np.array([380.0, 380.5, 381.0, 381.0, 381.7]), np.array([1.0, 2.0, 3.0, 4.0, 5.0])
+        )
+        np.testing.assert_array_equal(wavelengths, [380, 381])
+        np.testing.assert_array_equal(values, [1.0, 4.0])
+
+    def test_half_nm_matches_dict_importer(self, tmp_path):
+        # 1 at whole wavelengths and 5 at the half wavelengths between them. The
+        # original importer skipped the x.5 rows, as int('400.5') raises
+        csv_file = tmp_path / "half_nm.csv"
+        rows = ['{},1'.format(w // 2) if w % 2 == 0 else '{}.5,5'.format(w // 2) for w in range(760, 1561)]
+        csv_file.write_text('\n'.join(rows) + '\n')
+
+        spd_dict = import_spectral_csv(str(csv_file))
+        assert spd_dict == {w: 1.0 for w in range(380, 781)}
+        spd = import_spd(str(csv_file), method='linear')
+        assert spd[400] == 1.0
+        np.testing.assert_array_equal(spd.values[20:], 1.0)
+
+
+@pytest.fixture
+def spd_tree(tmp_path):
+    """A nested directory of SPD CSVs, with one unreadable file."""
+    wavelengths = np.arange(380, 781, 5)
+    for i, path in enumerate(['b.csv', 'a.csv', '2019_lightfair/c.csv', '2020_nightmodes/d.csv',
+                              '2020_nightmodes/notes.txt', '.hidden/e.csv']):
+        path = tmp_path / path
+        path.parent.mkdir(exist_ok=True)
+        np.savetxt(path, np.column_stack([wavelengths, np.linspace(1, i + 2, len(wavelengths))]),
+                   delimiter=',')
+    (tmp_path / 'bad.csv').write_text('no,data\n')
+    return tmp_path
+
+
+class TestImportSpdBatch:
+    """Test importing directories of SPD files."""
+
+    def test_find_files(self, spd_tree):
+        assert find_spectral_files(str(spd_tree)) == ['a.csv', 'b.csv', 'bad.csv']
+        assert find_spectral_files(str(spd_tree), recursive=True, include='*.csv', exclude='bad*') == [
+            '2019_lightfair/c.csv', '2020_nightmodes/d.csv', 'a.csv', 'b.csv']
+        assert find_spectral_files(str(spd_tree), True, include=['2020_*/*']) == [
+            '2020_nightmodes/d.csv', '2020_nightmodes/notes.txt']
+
+    def test_top_level(self, spd_tree):
+        errors = {}
+        spds = import_spd_batch(str(spd_tree), printNames=False, errors=errors)
+        assert list(spds) == ['a', 'b']
+        assert spds['a'].name == 'a'
+        assert max(spds['a'].values) == pytest.approx(1.0)
+        assert list(errors) == ['bad.csv']
+
+    def test_recursive(self, spd_tree):
+        spds = import_spd_batch(str(spd_tree), printNames=False, recursive=True, include='*.csv')
+        assert list(spds) == ['2019_lightfair/c', '2020_nightmodes/d', 'a', 'b']
+
+    def test_workers_match_serial(self, spd_tree):
+        serial = import_spd_batch(str(spd_tree), printNames=False, recursive=True)
+        errors = {}
+        parallel = import_spd_batch(str(spd_tree), printNames=False, recursive=True, workers=2,
+                                    errors=errors)
+        assert list(parallel) == list(serial) == [
+            '2019_lightfair/c', '2020_nightmodes/d', '2020_nightmodes/notes', 'a', 'b']
+        assert list(errors) == ['bad.csv']
+        for name in serial:
+            np.testing.assert_array_equal(parallel[name].values, serial[name].values)
+
+
+class TestStreamingImport:
+    """Test the generator import API."""
+
+    def test_iter_spds_matches_batch(self, spd_tree):
+        expected = import_spd_batch(str(spd_tree), printNames=False, recursive=True)
+        errors = {}
+        spds = iter_spds(str(spd_tree), recursive=True, errors=errors)
+        assert not isinstance(spds, (list, dict))
+
+        spds = list(spds)
+        assert [spd.name for spd in spds] == list(expected)
+        for spd in spds:
+            np.testing.assert_array_equal(spd.values, expected[spd.name].values)
+        assert list(errors) == ['bad.csv']
+
+    @pytest.mark.parametrize('workers', [None, 2])
+    def test_chunks(self, spd_tree, workers):
+        expected = import_spd_batch(str(spd_tree), printNames=False, recursive=True)
+        chunks = list(iter_spd_chunks(str(spd_tree), chunk_size=2, recursive=True, workers=workers))
+
+        assert [len(names) for names, values in chunks] == [2, 2, 1]
+        assert [name for names, values in chunks for name in names] == list(expected)
+        for names, values in chunks:
+            assert values.shape == (len(names), len(reshape_wavelengths()))
+            for name, row in zip(names, values):
+                np.testing.assert_array_equal(row, expected[name].values)
+
+        # chunks feed the batch metric functions directly
+        responses = np.concatenate([melanopic_response_batch(values) for names, values in chunks])
+        assert responses.shape == (5,)
+
+    def test_invalid_chunk_size(self, spd_tree):
+        with pytest.raises(ValueError):
+            next(iter_spd_chunks(str(spd_tree), chunk_size=0))
+
+
 class TestSpectrumIntegration:
     """Integration tests for spectrum processing."""
     
@@ -120,4 +269,45 @@ class TestSpectrumIntegration:
         assert spd.strict_name == "Test SPD"
         assert max(spd.values) == 1.5  # 1.0 * 1.5
         assert min(spd.wavelengths) == 360
-        assert max(spd.wavelengths) == 780 
\ No newline at end of file
+        assert max(spd.wavelengths) == 780 
+
+class TestReferenceSpectrumRegistry:
+    """Test the reference spectrum registry."""
+
+    @pytest.fixture(autouse=True)
+    def cache_dir(self, tmp_path, monkeypatch):
+        monkeypatch.setenv('BEAUTIFUL_PHOTOMETRY_CACHE', str(tmp_path / 'cache'))
+
+    def test_load_keeps_working_directory(self):
+        cwd = os.getcwd()
+        registry = ReferenceSpectrumRegistry()
+        registry.load()
+        assert os.getcwd() == cwd
+
+    def test_lookup(self):
+        registry = ReferenceSpectrumRegistry()
+        assert 'Melanopic' in registry
+        assert registry.get('Not A Spectrum') is None
+
+        melanopic = registry.get('Melanopic')
+        assert melanopic['name'] == 'Melanopic'
+        assert melanopic['values'].shape == (421,)
+        assert not melanopic['values'].flags.writeable
+        np.testing.assert_array_equal(melanopic['values'], melanopic['curve'].values)
+
+        with pytest.raises(KeyError):
+            registry.values('Not A Spectrum')
+
+    def test_concurrent_load(self):
+        registry = ReferenceSpectrumRegistry()
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(registry.load())) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert all(result is results[0] for result in results)
+
+    def test_get_reference_spectrum(self):
+        assert get_reference_spectrum('Photopic')['name'] == 'Photopic'
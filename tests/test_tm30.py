@@ -0,0 +1,69 @@
+"""
+Tests for the tm30 module.
+"""
+
+import warnings
+
+import numpy as np
+import pytest
+from colour import SDS_ILLUMINANTS
+from colour.quality import colour_fidelity_index_ANSIIESTM3018
+
+from beautiful_photometry.batch import SpectrumBatch
+from beautiful_photometry.metrics import compute_all_metrics
+from beautiful_photometry.spectrum import reshape
+from beautiful_photometry.tm30 import HUE_BINS, SAMPLES, tm30_batch, tm30_rf, tm30_rg
+
+# A (blackbody reference), FL2 and LED-B3 (mixed references) and FL1 (daylight reference)
+ILLUMINANTS = ['A', 'FL2', 'LED-B3', 'FL1']
+
+
+@pytest.fixture
+def spds():
+    return [reshape(SDS_ILLUMINANTS[name].copy()) for name in ILLUMINANTS]
+
+
+class TestTM30:
+    """tm30_batch must match colour's single-spectrum implementation."""
+
+    def test_matches_colour(self, spds):
+        results = tm30_batch(SpectrumBatch.from_spds(spds))
+        assert results['Rf_h'].shape == (len(spds), HUE_BINS)
+        assert results['Rf_ces'].shape == (len(spds), SAMPLES)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            expected = [colour_fidelity_index_ANSIIESTM3018(spd, True) for spd in spds]
+
+        for result, specification in zip(results, expected):
+            assert result['Rf'] == pytest.approx(specification.R_f, abs=1e-3)
+            assert result['Rg'] == pytest.approx(specification.R_g, abs=1e-3)
+            np.testing.assert_allclose(result['Rf_h'], specification.R_fs, atol=5e-3)
+            np.testing.assert_allclose(result['Rcs_h'], specification.R_cs, atol=5e-3)
+            np.testing.assert_allclose(result['Rhs_h'], specification.R_hs, atol=1e-4)
+            np.testing.assert_allclose(result['Rf_ces'], specification.R_s, atol=5e-3)
+
+    def test_chunks(self, spds, monkeypatch):
+        batch = SpectrumBatch.from_spds(spds)
+        expected = tm30_batch(batch)
+        monkeypatch.setattr('beautiful_photometry.tm30.CHUNK_SIZE', 3)
+        chunked = tm30_batch(batch)
+        for field in expected.dtype.names:
+            np.testing.assert_allclose(chunked[field], expected[field])
+
+    def test_single_spd(self, spds):
+        results = tm30_batch(spds[1], toround=True)
+        assert tm30_rf(spds[1]) == results['Rf'][0]
+        assert tm30_rg(spds[1]) == results['Rg'][0]
+
+    def test_undefined(self, spds):
+        values = np.vstack([np.zeros(421), SpectrumBatch.from_spds(spds[:1]).values[0]])
+        results = tm30_batch(values)
+        assert np.isnan(results['Rf'][0]) and np.isnan(results['Rg'][0])
+        assert results['Rf'][1] == pytest.approx(100, abs=0.01)
+
+    def test_metrics(self, spds):
+        results = compute_all_metrics(spds, ['tm30_rf', 'tm30_rg'])
+        expected = tm30_batch(SpectrumBatch.from_spds(spds), toround=True)
+        np.testing.assert_allclose(results['tm30_rf'], expected['Rf'])
+        np.testing.assert_allclose(results['tm30_rg'], expected['Rg'])
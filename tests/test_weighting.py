@@ -0,0 +1,51 @@
+"""
+Tests for the weighting module.
+"""
+
+import numpy as np
+
+from beautiful_photometry.batch import SpectrumBatch
+from beautiful_photometry.spectrum import get_reference_spectrum
+from beautiful_photometry.weighting import (
+    CHANNELS,
+    PHOTOPIC,
+    MELANOPIC,
+    get_weighting_matrix,
+    channel_response,
+    channel_responses,
+)
+from beautiful_photometry.human_circadian import melanopic_ratio_batch
+
+
+def make_batch(n=4):
+    rng = np.random.default_rng(7)
+    return SpectrumBatch(rng.random((n, 421)) + 0.1)
+
+
+class TestWeightingMatrix:
+    """Test the compiled weighting matrix."""
+
+    def test_rows_match_reference_curves(self):
+        weights = get_weighting_matrix()
+        assert weights.shape == (len(CHANNELS), 421)
+        for row, name in zip(weights, CHANNELS):
+            np.testing.assert_array_equal(row, get_reference_spectrum(name)['curve'].values)
+
+    def test_channel_responses(self):
+        batch = make_batch()
+        responses = channel_responses(batch)
+        assert responses.shape == (4, len(CHANNELS))
+
+        for i, name in enumerate(CHANNELS):
+            curve = get_reference_spectrum(name)['curve'].values
+            expected = [np.sum(curve * values) for values in batch.values]
+            np.testing.assert_allclose(responses[:, i], expected)
+            np.testing.assert_allclose(channel_response(batch, i), expected)
+
+    def test_precomputed_responses(self):
+        batch = make_batch()
+        responses = channel_responses(batch)
+        np.testing.assert_array_equal(
+            melanopic_ratio_batch(batch, False, responses=responses),
+            responses[:, MELANOPIC] / responses[:, PHOTOPIC] * 1.218,
+        )